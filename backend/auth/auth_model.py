@@ -2,9 +2,19 @@ import uuid
 
 from fastapi_users import schemas
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID
+from sqlalchemy import MetaData
 from sqlalchemy.orm import declarative_base
 
-Base = declarative_base()
+# Predictable constraint names, repositories map IntegrityErrors by them and migrations refer to them
+NAMING_CONVENTION = {
+    "ix": "ix_%(column_0_label)s",
+    "uq": "uq_%(table_name)s_%(column_0_N_name)s",
+    "ck": "ck_%(table_name)s_%(constraint_name)s",
+    "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
+    "pk": "pk_%(table_name)s",
+}
+
+Base = declarative_base(metadata=MetaData(naming_convention=NAMING_CONVENTION))
 
 
 class User(SQLAlchemyBaseUserTableUUID, Base):
@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+import config
+from auth.auth_model import User
+
+
+class UserCache:
+    """
+    In-process LRU of verified token -> user, entries expire after ttl_seconds or when the
+    token does, whichever comes first. Tokens are also indexed by user id so every token of a
+    user can be dropped when the user changes.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._tokens_by_user: Dict[UUID, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            values, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+        return _to_user(values)
+
+    def put(self, token: str, user: User, token_expires_at: Optional[float] = None):
+        """token_expires_at is the token's exp claim as a unix timestamp"""
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+        # Only column values are kept, every hit gets its own instance so requests never share one
+        values = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (values, time.monotonic() + ttl)
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: UUID):
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_id = entry[0]["id"]
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+def _to_user(values: dict) -> User:
+    # Detached with an identity, so the users router can still update or delete it through a session
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+user_cache = UserCache(config.AUTH_CACHE_TTL_SECONDS, config.AUTH_CACHE_MAX_SIZE)
@@ -0,0 +1,36 @@
+"""Comparison of benchmark results against a baseline saved by an earlier run"""
+import sys
+from typing import Dict
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, noise_ms: float,
+            metric: str = "median_ms"):
+    """
+    Rows of (name, baseline value, value, change) for the names in both runs, and the names that
+    regressed: slower by more than threshold (a fraction) and by more than noise_ms
+    """
+    rows, regressions = [], []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name][metric], result[metric]
+        change = (after - before) / before if before else 0.0
+        rows.append((name, before, after, change))
+        if change > threshold and after - before > noise_ms:
+            regressions.append(name)
+    return rows, regressions
+
+
+def report(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, noise_ms: float,
+           metric: str = "median_ms") -> bool:
+    """Print the comparison table, True when nothing regressed"""
+    rows, regressions = compare(results, baseline, threshold, noise_ms, metric)
+    width = max([len(name) for name, *_ in rows] + [6]) + 2
+    print(f"{'name':<{width}}{'baseline':>10}{'now':>10}{'change':>9}")
+    for name, before, after, change in rows:
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<{width}}{before:>10.2f}{after:>10.2f}{change:>+9.0%}{flag}")
+    missing = sorted(set(baseline) - set(results))
+    if missing:
+        print(f"Not in this run: {', '.join(missing)}", file=sys.stderr)
+    return not regressions
@@ -0,0 +1,166 @@
+"""
+Deterministic synthetic school data: the same size and seed always give the same rows, ids
+included, so benchmark runs on different machines or commits work on identical data.
+
+Sizes multiply: years x classes per year x sections per class x students per section, each
+student paying for the first `months` months of the school year (April onwards), and about half
+of the students riding one of the autos. Loads into the database DATABASE_URL points at:
+
+    cd backend && python -m benchmarks.data_generator --years 2 --classes 12 --sections 3 --students 30
+"""
+import argparse
+import asyncio
+import itertools
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_session_maker, init_db
+from models import AcademicYear, AutoManagement, AutoStudentMapping, Class, FeePayment, Month, Section, Student
+from repositories.fee_ledger_repository import FeeLedgerRepository
+from utils.bulk_insert import bulk_insert
+from utils.uuid_generator import uuid7_at
+
+# The school year runs April to March
+SCHOOL_MONTHS = [Month.APR, Month.MAY, Month.JUN, Month.JUL, Month.AUG, Month.SEP,
+                 Month.OCT, Month.NOV, Month.DEC, Month.JAN, Month.FEB, Month.MAR]
+LATEST_YEAR = 2024
+
+# Insert order, parents before children
+MODELS = {
+    "academic_years": AcademicYear,
+    "classes": Class,
+    "sections": Section,
+    "students": Student,
+    "fee_payments": FeePayment,
+    "auto_management": AutoManagement,
+    "auto_student_mapping": AutoStudentMapping,
+}
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    years: int = 1
+    classes: int = 12  # per academic year
+    sections: int = 2  # per class
+    students: int = 30  # per section
+    months: int = 3  # payments per student, one per month
+    autos: int = 10
+    seed: int = 1
+
+    @property
+    def student_count(self) -> int:
+        return self.years * self.classes * self.sections * self.students
+
+
+def generate(size: DatasetSize) -> Dict[str, List[dict]]:
+    """Rows per table name, in insert order"""
+    rng = random.Random(size.seed)
+    # Time-ordered like the ids the app makes, a millisecond apart from the first school year on
+    first_year = datetime(LATEST_YEAR - size.years + 1, 4, 1, tzinfo=timezone.utc)
+    clock = itertools.count(int(first_year.timestamp() * 1000))
+
+    def new_id():
+        return uuid7_at(next(clock), rng.getrandbits(74))
+
+    rows = {table_name: [] for table_name in MODELS}
+    autos = [{"id": new_id(), "name": f"Route {number}"} for number in range(1, size.autos + 1)]
+    rows["auto_management"] = autos
+
+    for year_number in range(size.years):
+        start_year = LATEST_YEAR - size.years + 1 + year_number
+        year = {"id": new_id(), "year": f"{start_year}-{start_year + 1}", "is_active": year_number == size.years - 1}
+        rows["academic_years"].append(year)
+
+        for class_number in range(1, size.classes + 1):
+            class_ = {"id": new_id(), "name": f"Class {class_number}", "academic_year_id": year["id"]}
+            rows["classes"].append(class_)
+            roll_number = 0
+
+            for section_number in range(size.sections):
+                section = {"id": new_id(), "name": chr(ord("A") + section_number), "class_id": class_["id"]}
+                rows["sections"].append(section)
+
+                for _ in range(size.students):
+                    roll_number += 1
+                    auto = rng.choice(autos) if autos and rng.random() < 0.5 else None
+                    student = {
+                        "id": new_id(),
+                        "name": f"Student {len(rows['students']) + 1}",
+                        "roll_number": str(roll_number),
+                        "father_name": "Father Name",
+                        "mother_name": "Mother Name",
+                        "date_of_birth": f"{start_year - 5 - class_number}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                        "contact": f"9{rng.randrange(10 ** 9):09d}",
+                        "address": f"{rng.randint(1, 999)} School Road",
+                        "enrollment_date": f"{start_year}-04-01",
+                        "tuition_fees": Decimal(rng.randrange(800, 2100, 100)),
+                        "auto_fees": Decimal(300 if auto else 0),
+                        "day_boarding_fees": Decimal(rng.choice([0, 0, 500])),
+                        "class_id": class_["id"],
+                        "section_id": section["id"],
+                        "academic_year_id": year["id"],
+                    }
+                    rows["students"].append(student)
+                    if auto:
+                        rows["auto_student_mapping"].append(
+                            {"id": new_id(), "auto_id": auto["id"], "student_id": student["id"]}
+                        )
+
+                    for month_index, month in enumerate(SCHOOL_MONTHS[:size.months]):
+                        calendar_month = (month_index + 3) % 12 + 1
+                        rows["fee_payments"].append({
+                            "id": new_id(),
+                            "student_id": student["id"],
+                            "month": month,
+                            "tuition_fees": student["tuition_fees"],
+                            "auto_fees": student["auto_fees"],
+                            "day_boarding_fees": student["day_boarding_fees"],
+                            "total_amount": student["tuition_fees"] + student["auto_fees"] + student["day_boarding_fees"],
+                            "transaction_date": datetime(
+                                start_year + (month_index + 3) // 12, calendar_month,
+                                rng.randint(1, 28), rng.randint(8, 16), rng.randrange(60)
+                            ),
+                        })
+    return rows
+
+
+async def load(db: AsyncSession, size: DatasetSize) -> Dict[str, List[dict]]:
+    """Insert the generated rows and build their fee ledger, in one transaction"""
+    rows = generate(size)
+    for table_name, model in MODELS.items():
+        await bulk_insert(db, model, rows[table_name])
+    await FeeLedgerRepository(db).rebuild()
+    await db.commit()
+    return rows
+
+
+def add_size_arguments(parser: argparse.ArgumentParser):
+    defaults = DatasetSize()
+    for field, value in asdict(defaults).items():
+        parser.add_argument(f"--{field}", type=int, default=value)
+
+
+def size_from_args(args) -> DatasetSize:
+    return DatasetSize(**{field: getattr(args, field) for field in asdict(DatasetSize())})
+
+
+async def _main(size: DatasetSize):
+    await init_db()
+    async with async_session_maker() as db:
+        rows = await load(db, size)
+    print(", ".join(f"{len(table_rows)} {table_name}" for table_name, table_rows in rows.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_size_arguments(parser)
+    asyncio.run(_main(size_from_args(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+"""
+End-to-end load test: concurrent clerks log in and then click through weighted scenarios of
+API calls, the same calls the frontend pages make. Reports throughput and p50/p95/p99 latency per
+route. Drives main.app in-process over ASGI on a generated dataset (same size options as the
+data generator, in a throwaway SQLite file or the emptied BENCHMARK_DATABASE_URL database), or
+a running server given --url:
+
+    cd backend && python -m benchmarks.load_test --clerks 20 --duration 30
+    python -m benchmarks.load_test --url http://localhost:8000 --scenarios benchmarks/scenarios/admission_day.json
+
+A scenario file is JSON:
+
+    {
+      "clerks": 10,                      # concurrent logged-in users, --clerks overrides
+      "duration_seconds": 30,            # --duration overrides
+      "think_time_ms": [200, 1000],      # pause between steps, uniform in this range
+      "scenarios": [
+        {"name": "Fees page", "weight": 5, "steps": [
+          {"parallel": [{"method": "GET", "path": "/fee_payments/"}, {"method": "GET", "path": "/students/"}]},
+          {"method": "POST", "path": "/fee_payments/", "json": {"student_id": "{student_id}", ...},
+           "save": {"payment_id": "id"}},
+          {"method": "PUT", "path": "/fee_payments/{payment_id}", "json": {...}}
+        ]}
+      ]
+    }
+
+Each clerk repeatedly picks a scenario by weight and runs its steps in order; a "parallel" step
+sends its requests at once like a page mounting. Placeholders in paths and bodies are filled per
+request: {student_id}, {class_id}, {section_id} with its {section_class_id} and
+{section_academic_year_id}, {academic_year_id}, {auto_id}, {student_ids} (a list of 5), {month},
+{n} (unique number) and anything an earlier step saved. Routes are reported by their template.
+"""
+import os
+import tempfile
+
+# In-process runs use a throwaway database, never the one DATABASE_URL points at
+os.environ["DATABASE_URL"] = os.getenv(
+    "BENCHMARK_DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/load_test.db"
+)
+# A log line per request would slow the clerks down, REQUEST_LOG=true turns it back on
+os.environ.setdefault("REQUEST_LOG", "false")
+
+import argparse  # noqa: E402
+import asyncio  # noqa: E402
+import itertools  # noqa: E402
+import json  # noqa: E402
+import random  # noqa: E402
+import re  # noqa: E402
+import statistics  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+from collections import defaultdict  # noqa: E402
+from dataclasses import dataclass, field  # noqa: E402
+from datetime import datetime, timezone  # noqa: E402
+from pathlib import Path  # noqa: E402
+from typing import Any, Dict, List  # noqa: E402
+
+import httpx  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from auth.auth_model import Base  # noqa: E402
+from benchmarks.baseline import report  # noqa: E402
+from benchmarks.data_generator import DatasetSize, add_size_arguments, load, size_from_args  # noqa: E402
+from database import async_session_maker, engine, init_db  # noqa: E402
+from main import app  # noqa: E402
+from models import Month  # noqa: E402
+from services.reference_data_cache import reference_data  # noqa: E402
+
+SCENARIOS_DIR = Path(__file__).parent / "scenarios"
+LOGIN_ROUTE = "POST /auth/jwt/login"
+# A whole placeholder keeps its value's type, so "{student_ids}" becomes a JSON list
+WHOLE_PLACEHOLDER = re.compile(r"^\{(\w+)\}$")
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: float
+    steps: List[Any]
+
+
+@dataclass
+class LoadPlan:
+    scenarios: List[Scenario]
+    clerks: int = 10
+    duration_seconds: float = 30
+    think_time_ms: List[float] = field(default_factory=lambda: [200, 1000])
+
+
+def load_plan(path) -> LoadPlan:
+    with open(path) as file:
+        data = json.load(file)
+    scenarios = [Scenario(item["name"], item.get("weight", 1), item["steps"]) for item in data["scenarios"]]
+    options = {key: data[key] for key in ("clerks", "duration_seconds", "think_time_ms") if key in data}
+    return LoadPlan(scenarios=scenarios, **options)
+
+
+class Fixtures:
+    """Ids the placeholders are filled from, read through the API so --url works on any data"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.numbers = itertools.count(int(time.time()))
+        self.students: List[str] = []
+        self.sections: List[dict] = []
+        self.class_years: Dict[str, str] = {}
+        self.academic_years: List[str] = []
+        self.autos: List[str] = []
+
+    async def discover(self, http: httpx.AsyncClient, headers: dict):
+        async def get(path):
+            response = await http.get(path, headers=headers)
+            response.raise_for_status()
+            return response.json()
+
+        self.students = [student["id"] for student in (await get("/students/page?limit=500"))["items"]]
+        self.sections = await get("/sections/")
+        self.class_years = {class_["id"]: class_["academic_year_id"] for class_ in await get("/classes/")}
+        self.academic_years = [year["id"] for year in await get("/academic-years/")]
+        self.autos = [auto["id"] for auto in await get("/auto-management/autos/")]
+        if not self.students or not self.sections:
+            raise SystemExit("The database has no students or sections to run the scenarios on")
+
+    def values(self, saved: Dict[str, Any]) -> Dict[str, Any]:
+        section = self.rng.choice(self.sections)
+        return {
+            "student_id": self.rng.choice(self.students),
+            "student_ids": self.rng.sample(self.students, min(5, len(self.students))),
+            "section_id": section["id"],
+            "section_class_id": section["class_id"],
+            "section_academic_year_id": self.class_years.get(section["class_id"]),
+            "class_id": self.rng.choice(list(self.class_years) or [None]),
+            "academic_year_id": self.rng.choice(self.academic_years or [None]),
+            "auto_id": self.rng.choice(self.autos or [None]),
+            "month": self.rng.choice(list(Month)).value,
+            "n": next(self.numbers),
+            **saved,
+        }
+
+
+def fill(template, values: Dict[str, Any]):
+    if isinstance(template, dict):
+        return {key: fill(value, values) for key, value in template.items()}
+    if isinstance(template, list):
+        return [fill(value, values) for value in template]
+    if isinstance(template, str):
+        whole = WHOLE_PLACEHOLDER.match(template)
+        if whole and whole.group(1) in values:
+            return values[whole.group(1)]
+        return template.format_map(values)
+    return template
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, route: str, seconds: float, ok: bool):
+        self.latencies[route].append(seconds * 1000)
+        if not ok:
+            self.errors[route] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, dict]:
+        routes = {}
+        for route, latencies in sorted(self.latencies.items()):
+            routes[route] = _stats(latencies, self.errors[route], elapsed)
+        everything = [latency for latencies in self.latencies.values() for latency in latencies]
+        if everything:
+            routes["ALL"] = _stats(everything, sum(self.errors.values()), elapsed)
+        return routes
+
+
+def _stats(latencies: List[float], errors: int, elapsed: float) -> dict:
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+    }
+
+
+class Clerk:
+    """One logged-in user, keeps the ETags it was sent and revalidates with them like a browser"""
+
+    def __init__(self, http: httpx.AsyncClient, fixtures: Fixtures, recorder: Recorder, rng: random.Random,
+                 revalidate: bool):
+        self.http = http
+        self.fixtures = fixtures
+        self.recorder = recorder
+        self.rng = rng
+        self.revalidate = revalidate
+        self.headers: Dict[str, str] = {}
+        self.etags: Dict[str, str] = {}
+        self.saved: Dict[str, Any] = {}
+
+    async def login(self, email: str, password: str):
+        started = time.perf_counter()
+        response = await self.http.post("/auth/jwt/login", data={"username": email, "password": password})
+        self.recorder.add(LOGIN_ROUTE, time.perf_counter() - started, response.status_code == 200)
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    async def request(self, step: dict):
+        method = step.get("method", "GET").upper()
+        values = self.fixtures.values(self.saved)
+        path = fill(step["path"], values)
+        headers = dict(self.headers)
+        if method == "GET" and self.revalidate and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(
+                method, path, headers=headers, json=fill(step["json"], values) if "json" in step else None
+            )
+        except httpx.HTTPError:
+            self.recorder.add(f"{method} {step['path']}", time.perf_counter() - started, False)
+            return
+        self.recorder.add(f"{method} {step['path']}", time.perf_counter() - started, response.status_code < 400)
+
+        if method == "GET" and "etag" in response.headers:
+            self.etags[path] = response.headers["etag"]
+        if response.status_code < 400 and step.get("save"):
+            body = response.json()
+            for name, key in step["save"].items():
+                self.saved[name] = body[key]
+
+    async def run_scenario(self, scenario: Scenario, think_time_ms: List[float]):
+        for step in scenario.steps:
+            if "parallel" in step:
+                await asyncio.gather(*(self.request(request) for request in step["parallel"]))
+            else:
+                await self.request(step)
+            await asyncio.sleep(self.rng.uniform(*think_time_ms) / 1000)
+
+
+async def ensure_user(http: httpx.AsyncClient, email: str, password: str):
+    response = await http.post("/auth/register", json={"email": email, "password": password})
+    if response.status_code not in (201, 400):
+        response.raise_for_status()
+
+
+async def run(http: httpx.AsyncClient, plan: LoadPlan, email: str, password: str, seed: int = 1,
+              revalidate: bool = True) -> dict:
+    """Run the plan's clerks for its duration, returns the per-route summary"""
+    rng = random.Random(seed)
+    recorder = Recorder()
+    fixtures = Fixtures(rng)
+    await ensure_user(http, email, password)
+    setup = Clerk(http, fixtures, Recorder(), rng, revalidate)
+    await setup.login(email, password)
+    await fixtures.discover(http, setup.headers)
+
+    started = time.perf_counter()
+    deadline = started + plan.duration_seconds
+    weights = [scenario.weight for scenario in plan.scenarios]
+
+    async def clerk_loop(number: int):
+        clerk_rng = random.Random(seed * 1000 + number)
+        clerk = Clerk(http, fixtures, recorder, clerk_rng, revalidate)
+        # Clerks don't all arrive in the same millisecond
+        await asyncio.sleep(clerk_rng.uniform(0, plan.think_time_ms[1]) / 1000)
+        await clerk.login(email, password)
+        while time.perf_counter() < deadline:
+            scenario = clerk_rng.choices(plan.scenarios, weights)[0]
+            await clerk.run_scenario(scenario, plan.think_time_ms)
+
+    await asyncio.gather(*(clerk_loop(number) for number in range(plan.clerks)))
+    return recorder.summary(time.perf_counter() - started)
+
+
+async def _prepare_in_process(size: DatasetSize):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    await init_db()
+    reference_data.clear()
+    async with async_session_maker() as db:
+        await load(db, size)
+        await reference_data.warm(db)
+
+
+async def _main(args, plan: LoadPlan) -> dict:
+    if args.url:
+        http = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        await _prepare_in_process(size_from_args(args))
+        http = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load-test", timeout=60)
+    async with http:
+        routes = await run(http, plan, args.email, args.password, args.seed, revalidate=not args.no_revalidate)
+    if not args.url:
+        await engine.dispose()
+    return routes
+
+
+def print_summary(routes: Dict[str, dict]):
+    width = max(len(route) for route in routes) + 2
+    print(f"{'route':<{width}}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for route, stats in routes.items():
+        print(
+            f"{route:<{width}}{stats['requests']:>9}{stats['errors']:>8}{stats['rps']:>9.1f}"
+            f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=str(SCENARIOS_DIR / "peak.json"), help="scenario file")
+    parser.add_argument("--url", help="load a running server instead of main.app in-process")
+    parser.add_argument("--clerks", type=int, help="concurrent users, overrides the scenario file")
+    parser.add_argument("--duration", type=float, help="seconds to run, overrides the scenario file")
+    parser.add_argument("--email", default="load-test@example.com", help="registered on first use")
+    parser.add_argument("--password", default="load-test-password")
+    parser.add_argument("--no-revalidate", action="store_true", help="don't send If-None-Match")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare p95 latencies with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 slowdown flagged as a regression")
+    parser.add_argument("--noise-ms", type=float, default=2.0, help="ignore slowdowns smaller than this")
+    add_size_arguments(parser)
+    args = parser.parse_args()
+
+    plan = load_plan(args.scenarios)
+    if args.clerks:
+        plan.clerks = args.clerks
+    if args.duration:
+        plan.duration_seconds = args.duration
+
+    routes = asyncio.run(_main(args, plan))
+    print_summary(routes)
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.url or f"in-process ({engine.dialect.name})",
+        "scenarios": Path(args.scenarios).name,
+        "clerks": plan.clerks,
+        "duration_seconds": plan.duration_seconds,
+        "results": routes,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if not report(routes, baseline["results"], args.threshold, args.noise_ms, metric="p95_ms"):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Serialization cost and response size of the student list, FastAPI's response_model path
+against the orjson fast path the list routes use. Each path starts from what its repository
+returns (ORM instances before, column dicts now), the query itself is not part of the timing.
+
+    cd backend && python -m benchmarks.serialization --rows 5000
+"""
+import argparse
+import gzip
+import statistics
+import time
+import uuid
+from decimal import Decimal
+from typing import List
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import config
+from models import Student
+from schemas import StudentResponse
+from utils.fast_json import FastJSONResponse
+
+
+def make_students(count: int) -> List[Student]:
+    class_id, section_id, academic_year_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    return [
+        Student(
+            id=uuid.uuid4(),
+            name=f"Student {number}",
+            roll_number=str(number),
+            father_name="Father Name",
+            mother_name="Mother Name",
+            date_of_birth="2015-06-01",
+            contact="9876543210",
+            address=f"{number} School Road, Springfield",
+            enrollment_date="2024-04-01",
+            tuition_fees=Decimal("1000.00"),
+            auto_fees=Decimal("300.00"),
+            day_boarding_fees=Decimal("0.00"),
+            class_id=class_id,
+            section_id=section_id,
+            academic_year_id=academic_year_id,
+        )
+        for number in range(count)
+    ]
+
+
+def response_model_body(students: List[Student]) -> bytes:
+    # What FastAPI does with response_model=list[StudentResponse]: validate, dump to JSON types, json.dumps
+    adapter = TypeAdapter(List[StudentResponse])
+    content = adapter.dump_python(adapter.validate_python(students, from_attributes=True), mode="json")
+    return JSONResponse(content).body
+
+
+def fast_path_body(rows: List[dict]) -> bytes:
+    return FastJSONResponse(rows).body
+
+
+def timed(function, content, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = function(content)
+        timings.append(time.perf_counter() - started)
+    return body, statistics.median(timings)
+
+
+def compressed_sizes(body: bytes):
+    sizes = {"gzip": len(gzip.compress(body, compresslevel=config.COMPRESSION_LEVEL))}
+    try:
+        import brotli
+    except ImportError:
+        return sizes
+    sizes["brotli"] = len(brotli.compress(body, quality=config.COMPRESSION_LEVEL))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    students = make_students(args.rows)
+    columns = [column.key for column in Student.__table__.columns]
+    rows = [{column: getattr(student, column) for column in columns} for student in students]
+    model_body, model_seconds = timed(response_model_body, students, args.repeat)
+    fast_body, fast_seconds = timed(fast_path_body, rows, args.repeat)
+
+    print(f"{args.rows} students, median of {args.repeat} runs")
+    print(f"{'path':<16}{'ms':>10}{'bytes':>12}")
+    print(f"{'response_model':<16}{model_seconds * 1000:>10.1f}{len(model_body):>12}")
+    print(f"{'orjson':<16}{fast_seconds * 1000:>10.1f}{len(fast_body):>12}")
+    print(f"speedup {model_seconds / fast_seconds:.1f}x")
+    for encoding, size in compressed_sizes(fast_body).items():
+        print(f"{encoding} level {config.COMPRESSION_LEVEL}: {size} bytes ({size / len(fast_body):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Maintenance commands, run from the backend directory:
+
+    python cli.py rebuild-ledger
+    python cli.py import-students students.csv
+"""
+import argparse
+import asyncio
+import json
+
+from database import async_session_maker, init_db
+from repositories.fee_ledger_repository import FeeLedgerRepository
+from services.student_import_service import StudentImportService
+from utils.tabular_reader import detect_format, iter_rows
+
+
+async def rebuild_ledger():
+    await init_db()
+    async with async_session_maker() as db:
+        await FeeLedgerRepository(db).rebuild()
+        await db.commit()
+    print("Fee ledger rebuilt.")
+
+
+async def import_students(path: str):
+    file_format = detect_format(path)
+    await init_db()
+    with open(path, "rb") as file:
+        async with async_session_maker() as db:
+            report = await StudentImportService(db).import_rows(iter_rows(file, file_format))
+    print(json.dumps(report, indent=2))
+
+
+COMMANDS = {
+    "rebuild-ledger": rebuild_ledger,
+    "import-students": import_students,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="School Management System maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-ledger", help="Recompute the per-student fee ledger from all payments")
+    import_parser = subparsers.add_parser("import-students", help="Bulk import students from a .csv or .xlsx file")
+    import_parser.add_argument("path")
+    args = parser.parse_args()
+    arguments = {key: value for key, value in vars(args).items() if key != "command"}
+    asyncio.run(COMMANDS[args.command](**arguments))
+
+
+if __name__ == "__main__":
+    main()
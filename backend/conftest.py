@@ -0,0 +1,143 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# Tests always run against a throwaway database, never the one DATABASE_URL points at
+os.environ["DATABASE_URL"] = os.getenv(
+    "TEST_DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/test.db"
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, text  # noqa: E402
+
+from auth.auth_model import Base, User  # noqa: E402
+from auth.auth_service import current_active_user  # noqa: E402
+from auth.user_cache import user_cache  # noqa: E402
+from database import engine  # noqa: E402
+from main import app  # noqa: E402
+from services.reference_data_cache import reference_data  # noqa: E402
+
+TEST_USER = User(
+    id=uuid.uuid4(),
+    email="clerk@example.com",
+    hashed_password="not-used",
+    is_active=True,
+    is_superuser=False,
+    is_verified=True,
+)
+
+
+async def _drop_all():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    # Pooled connections belong to this test's event loop
+    await engine.dispose()
+    reference_data.clear()
+
+
+@pytest.fixture
+def client():
+    """Authenticated client on a freshly created schema"""
+    app.dependency_overrides[current_active_user] = lambda: TEST_USER
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(_drop_all)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Real JWT auth for a freshly registered user instead of the overridden test user"""
+    app.dependency_overrides.pop(current_active_user, None)
+    user_cache.clear()
+    credentials = {"email": "teacher@example.com", "password": "secret-password"}
+    assert client.post("/auth/register", json=credentials).status_code == 201
+    login = client.post(
+        "/auth/jwt/login", data={"username": credentials["email"], "password": credentials["password"]}
+    )
+    yield {"Authorization": f"Bearer {login.json()['access_token']}"}
+    user_cache.clear()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+class StatementCounter(QueryCounter):
+    def __init__(self):
+        super().__init__()
+        self.keywords = []
+
+    def __call__(self, conn, cursor, statement, *args):
+        super().__call__()
+        self.keywords.append(statement.split()[0].upper())
+
+
+@pytest.fixture
+def query_counter():
+    """Counts SQL statements sent to the database while the test runs, keeping each one's first keyword"""
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def commit_counter():
+    """Counts database transactions committed while the test runs"""
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "commit", counter)
+    yield counter
+    event.remove(engine.sync_engine, "commit", counter)
+
+
+@pytest.fixture
+def checkout_counter():
+    """Counts connections handed out by the primary pool while the test runs"""
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "checkout", counter)
+    yield counter
+    event.remove(engine.sync_engine, "checkout", counter)
+
+
+@pytest.fixture
+def school(client):
+    """Creates an academic year with classes, sections and students through the API"""
+
+    def create(classes=1, students_per_class=1, year="2024-2025"):
+        year = client.post("/academic-years/", json={"year": year}).json()
+        students = []
+        for class_number in range(1, classes + 1):
+            class_ = client.post(
+                "/classes/", json={"name": f"Class {class_number}", "academic_year_id": year["id"]}
+            ).json()
+            section = client.post("/sections/", json={"name": "A", "class_id": class_["id"]}).json()
+            for roll_number in range(1, students_per_class + 1):
+                response = client.post("/students/", json={
+                    "name": f"Student {class_number}-{roll_number}",
+                    "roll_number": str(roll_number),
+                    "father_name": "Father",
+                    "mother_name": "Mother",
+                    "date_of_birth": "2015-06-01",
+                    "contact": "9876543210",
+                    "address": "1 School Road",
+                    "enrollment_date": "2024-04-01",
+                    "tuition_fees": "1000.00",
+                    "auto_fees": "300.00",
+                    "day_boarding_fees": "0.00",
+                    "class_id": class_["id"],
+                    "section_id": section["id"],
+                    "academic_year_id": year["id"],
+                })
+                assert response.status_code == 200, response.text
+                students.append(response.json())
+        return {"year": year, "students": students}
+
+    return create
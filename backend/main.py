@@ -1,11 +1,23 @@
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+
+import config
 
 from auth import auth_router
-from database import init_db
-from routers import dashboard, students, classes, sections, fee_payments, academic_years, auto_management
+from database import ReadYourWritesMiddleware, async_session_maker, init_db
+from routers import (
+    dashboard, students, classes, sections, fee_payments, academic_years, auto_management, health, metrics
+)
+from services.reference_data_cache import reference_data
+from utils.metrics import mark_worker_stopped
+from utils.request_timing import RequestTimingMiddleware, TimedJSONResponse
 
-app = FastAPI(title="School Management System API")
+logger = logging.getLogger("school.compression")
+
+app = FastAPI(title="School Management System API", default_response_class=TimedJSONResponse)
 
 # Enable CORS for frontend at http://localhost:5173
 app.add_middleware(
@@ -16,10 +28,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Gives clients that just wrote the cookie that keeps their next reads on the primary
+app.add_middleware(ReadYourWritesMiddleware)
+
+
+def add_compression(app: FastAPI):
+    """Compress responses above COMPRESSION_MINIMUM_SIZE, with brotli when configured and installed"""
+    if config.COMPRESSION == "off":
+        return
+    if config.COMPRESSION == "brotli":
+        try:
+            from brotli_asgi import BrotliMiddleware
+        except ImportError:
+            logger.warning("COMPRESSION=brotli but brotli-asgi is not installed, using gzip")
+        else:
+            # Clients that don't accept br still get gzip
+            app.add_middleware(
+                BrotliMiddleware, quality=config.COMPRESSION_LEVEL, minimum_size=config.COMPRESSION_MINIMUM_SIZE
+            )
+            return
+    app.add_middleware(
+        GZipMiddleware, minimum_size=config.COMPRESSION_MINIMUM_SIZE, compresslevel=config.COMPRESSION_LEVEL
+    )
+
+
+add_compression(app)
+# Added last so it wraps every other middleware
+app.add_middleware(RequestTimingMiddleware)
+
 
 @app.on_event("startup")
 async def on_startup():
     await init_db()
+    async with async_session_maker() as db:
+        await reference_data.warm(db)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    mark_worker_stopped()
 
 
 # Include routers
@@ -31,6 +78,8 @@ app.include_router(sections.router, prefix="/sections", tags=["Sections"])
 app.include_router(fee_payments.router, prefix="/fee_payments", tags=["Fee Payments"])
 app.include_router(academic_years.router, prefix="/academic-years", tags=["Academic Years"])
 app.include_router(auto_management.router, prefix="/auto-management", tags=["Auto Management"])
+app.include_router(health.router, prefix="/health", tags=["Health"])
+app.include_router(metrics.router, tags=["Metrics"])
 
 
 @app.get("/")
@@ -0,0 +1,128 @@
+"""initial schema
+
+The tables as init_db's create_all made them before migrations existed. Databases created that
+way are stamped at this revision by init_db and upgraded from here.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 06:31:46.212179
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from fastapi_users_db_sqlalchemy.generics import GUID
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('academic_years',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('year', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_academic_years'))
+    )
+    op.create_index(op.f('ix_academic_years_year'), 'academic_years', ['year'], unique=True)
+
+    op.create_table('auto_management',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_auto_management'))
+    )
+    op.create_table('user',
+    sa.Column('id', GUID(), nullable=False),
+    sa.Column('email', sa.String(length=320), nullable=False),
+    sa.Column('hashed_password', sa.String(length=1024), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_superuser', sa.Boolean(), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_user'))
+    )
+    op.create_index(op.f('ix_user_email'), 'user', ['email'], unique=True)
+
+    op.create_table('classes',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('academic_year_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['academic_year_id'], ['academic_years.id'], name=op.f('fk_classes_academic_year_id_academic_years')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_classes'))
+    )
+    op.create_index(op.f('ix_classes_name'), 'classes', ['name'], unique=False)
+
+    op.create_table('sections',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('class_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], name=op.f('fk_sections_class_id_classes')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_sections'))
+    )
+    op.create_index(op.f('ix_sections_name'), 'sections', ['name'], unique=False)
+
+    op.create_table('students',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('roll_number', sa.String(), nullable=True),
+    sa.Column('father_name', sa.String(), nullable=True),
+    sa.Column('mother_name', sa.String(), nullable=True),
+    sa.Column('date_of_birth', sa.String(), nullable=True),
+    sa.Column('contact', sa.String(), nullable=True),
+    sa.Column('address', sa.String(), nullable=True),
+    sa.Column('enrollment_date', sa.String(), nullable=True),
+    sa.Column('tuition_fees', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('auto_fees', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('day_boarding_fees', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('class_id', sa.UUID(), nullable=True),
+    sa.Column('section_id', sa.UUID(), nullable=True),
+    sa.Column('academic_year_id', sa.UUID(), nullable=True),
+    sa.ForeignKeyConstraint(['academic_year_id'], ['academic_years.id'], name=op.f('fk_students_academic_year_id_academic_years')),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], name=op.f('fk_students_class_id_classes')),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], name=op.f('fk_students_section_id_sections')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_students'))
+    )
+    op.create_index(op.f('ix_students_name'), 'students', ['name'], unique=False)
+    op.create_index(op.f('ix_students_roll_number'), 'students', ['roll_number'], unique=False)
+
+    op.create_table('auto_student_mapping',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('auto_id', sa.UUID(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['auto_id'], ['auto_management.id'], name=op.f('fk_auto_student_mapping_auto_id_auto_management')),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], name=op.f('fk_auto_student_mapping_student_id_students')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_auto_student_mapping'))
+    )
+    op.create_table('fee_payments',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=True),
+    sa.Column('month', sa.Enum('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC', name='month'), nullable=True),
+    sa.Column('tuition_fees', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('auto_fees', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('day_boarding_fees', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('total_amount', sa.DECIMAL(precision=10, scale=2), nullable=True),
+    sa.Column('transaction_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], name=op.f('fk_fee_payments_student_id_students')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_fee_payments'))
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('fee_payments')
+    op.drop_table('auto_student_mapping')
+    op.drop_index(op.f('ix_students_roll_number'), table_name='students')
+    op.drop_index(op.f('ix_students_name'), table_name='students')
+    op.drop_table('students')
+    op.drop_index(op.f('ix_sections_name'), table_name='sections')
+    op.drop_table('sections')
+    op.drop_index(op.f('ix_classes_name'), table_name='classes')
+    op.drop_table('classes')
+    op.drop_index(op.f('ix_user_email'), table_name='user')
+    op.drop_table('user')
+    op.drop_table('auto_management')
+    op.drop_index(op.f('ix_academic_years_year'), table_name='academic_years')
+    op.drop_table('academic_years')
+    sa.Enum(name='month').drop(op.get_bind(), checkfirst=True)
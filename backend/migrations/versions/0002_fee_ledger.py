@@ -0,0 +1,89 @@
+"""fee ledger
+
+Tables the app added after the baseline schema: student_fee_ledger, the running fee balance of
+each student, and table_versions, the change counters behind ETags and the reference data cache.
+The ledger is filled from the students and their payment history so far, the same rows
+FeeLedgerRepository.rebuild would write.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 06:35:02.118463
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+Amount = sa.Numeric(14, 2)
+
+
+def _backfill_ledger():
+    students = sa.table(
+        'students', sa.column('id', sa.UUID()), sa.column('academic_year_id', sa.UUID()),
+        sa.column('tuition_fees', Amount), sa.column('auto_fees', Amount), sa.column('day_boarding_fees', Amount),
+    )
+    payments = sa.table(
+        'fee_payments', sa.column('student_id', sa.UUID()), sa.column('total_amount', Amount),
+        sa.column('transaction_date', sa.DateTime()),
+    )
+    ledger = sa.table(
+        'student_fee_ledger', sa.column('student_id'), sa.column('academic_year_id'), sa.column('expected_amount'),
+        sa.column('paid_amount'), sa.column('balance'), sa.column('last_payment_date'),
+    )
+    paid = (
+        sa.select(
+            payments.c.student_id,
+            sa.func.sum(payments.c.total_amount).label('paid_amount'),
+            sa.func.max(payments.c.transaction_date).label('last_payment_date'),
+        )
+        .group_by(payments.c.student_id)
+        .subquery()
+    )
+    expected = sa.type_coerce(
+        sa.func.coalesce(students.c.tuition_fees, 0) +
+        sa.func.coalesce(students.c.auto_fees, 0) +
+        sa.func.coalesce(students.c.day_boarding_fees, 0),
+        Amount
+    )
+    paid_amount = sa.type_coerce(sa.func.coalesce(paid.c.paid_amount, 0), Amount)
+    op.execute(
+        ledger.insert().from_select(
+            ['student_id', 'academic_year_id', 'expected_amount', 'paid_amount', 'balance', 'last_payment_date'],
+            sa.select(
+                students.c.id, students.c.academic_year_id, expected, paid_amount, expected - paid_amount,
+                paid.c.last_payment_date,
+            ).outerjoin(paid, paid.c.student_id == students.c.id)
+        )
+    )
+
+
+def upgrade() -> None:
+    op.create_table('table_versions',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name', name=op.f('pk_table_versions'))
+    )
+    op.create_table('student_fee_ledger',
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('academic_year_id', sa.UUID(), nullable=True),
+    sa.Column('expected_amount', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('paid_amount', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('balance', sa.DECIMAL(precision=10, scale=2), nullable=False),
+    sa.Column('last_payment_date', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['academic_year_id'], ['academic_years.id'], name=op.f('fk_student_fee_ledger_academic_year_id_academic_years')),
+    sa.ForeignKeyConstraint(['student_id'], ['students.id'], name=op.f('fk_student_fee_ledger_student_id_students')),
+    sa.PrimaryKeyConstraint('student_id', name=op.f('pk_student_fee_ledger'))
+    )
+    _backfill_ledger()
+
+
+def downgrade() -> None:
+    op.drop_table('student_fee_ledger')
+    op.drop_table('table_versions')
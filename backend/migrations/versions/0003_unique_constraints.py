@@ -0,0 +1,64 @@
+"""unique constraints
+
+Roll numbers per class, class names per academic year and section names per class become unique,
+and foreign keys created before the naming convention get the names repositories look them up by.
+Fails if existing data already has duplicates, clean those up first.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 06:40:12.518304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNIQUE_CONSTRAINTS = [
+    ('uq_students_class_id_roll_number', 'students', ['class_id', 'roll_number']),
+    ('uq_classes_academic_year_id_name', 'classes', ['academic_year_id', 'name']),
+    ('uq_sections_class_id_name', 'sections', ['class_id', 'name']),
+]
+
+# PostgreSQL's default names, what create_all gave foreign keys before the naming convention
+LEGACY_FOREIGN_KEYS = [
+    ('students', 'students_class_id_fkey', 'fk_students_class_id_classes'),
+    ('students', 'students_section_id_fkey', 'fk_students_section_id_sections'),
+    ('students', 'students_academic_year_id_fkey', 'fk_students_academic_year_id_academic_years'),
+    ('classes', 'classes_academic_year_id_fkey', 'fk_classes_academic_year_id_academic_years'),
+    ('sections', 'sections_class_id_fkey', 'fk_sections_class_id_classes'),
+    ('fee_payments', 'fee_payments_student_id_fkey', 'fk_fee_payments_student_id_students'),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        # SQLite can't add a constraint without rebuilding the table, which foreign keys to it
+        # prevent. A unique index enforces the same and fails with the same message.
+        for name, table, columns in UNIQUE_CONSTRAINTS:
+            op.create_index(name, table, columns, unique=True)
+        return
+
+    for name, table, columns in UNIQUE_CONSTRAINTS:
+        op.create_unique_constraint(name, table, columns)
+
+    inspector = sa.inspect(bind)
+    for table, legacy_name, name in LEGACY_FOREIGN_KEYS:
+        if any(foreign_key['name'] == legacy_name for foreign_key in inspector.get_foreign_keys(table)):
+            op.execute(f'ALTER TABLE {table} RENAME CONSTRAINT {legacy_name} TO {name}')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for name, table, _ in UNIQUE_CONSTRAINTS:
+            op.drop_index(name, table_name=table)
+        return
+    for name, table, _ in UNIQUE_CONSTRAINTS:
+        op.drop_constraint(name, table, type_='unique')
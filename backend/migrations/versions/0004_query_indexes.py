@@ -0,0 +1,45 @@
+"""query indexes
+
+Composite indexes shaped after the repository queries: equality column first, then the column the
+query orders or ranges on. sections.class_id and classes.academic_year_id are already the leading
+columns of their unique constraints from 0003.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 06:52:37.104816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # Keyset pages and exports filtered by class, section or academic year, ordered by id
+    ('ix_students_class_id_id', 'students', ['class_id', 'id']),
+    ('ix_students_section_id_id', 'students', ['section_id', 'id']),
+    ('ix_students_academic_year_id_id', 'students', ['academic_year_id', 'id']),
+    # Ledger: latest and summed payments of a student
+    ('ix_fee_payments_student_id_transaction_date', 'fee_payments', ['student_id', 'transaction_date']),
+    # Payment exports ordered by (transaction_date, id), optionally for one month or a date range
+    ('ix_fee_payments_transaction_date_id', 'fee_payments', ['transaction_date', 'id']),
+    ('ix_fee_payments_month_transaction_date_id', 'fee_payments', ['month', 'transaction_date', 'id']),
+    # Students of an auto and autos of a student
+    ('ix_auto_student_mapping_auto_id_student_id', 'auto_student_mapping', ['auto_id', 'student_id']),
+    ('ix_auto_student_mapping_student_id', 'auto_student_mapping', ['student_id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,70 @@
+"""on delete actions
+
+Deletes handled by the database instead of loading dependents into Python: an auto's or a
+student's mappings and a student's ledger row go with them (CASCADE), while students, sections,
+classes and fee payments outlive what they point at with the reference cleared (SET NULL), the
+same result the ORM deletes gave.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 10:12:44.381920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from auth.auth_model import NAMING_CONVENTION
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite rebuilds each table, with foreign keys off while it does, see init_db
+FOREIGN_KEYS = [
+    ('classes', 'academic_year_id', 'academic_years', 'SET NULL'),
+    ('sections', 'class_id', 'classes', 'SET NULL'),
+    ('students', 'class_id', 'classes', 'SET NULL'),
+    ('students', 'section_id', 'sections', 'SET NULL'),
+    ('students', 'academic_year_id', 'academic_years', 'SET NULL'),
+    ('fee_payments', 'student_id', 'students', 'SET NULL'),
+    ('student_fee_ledger', 'student_id', 'students', 'CASCADE'),
+    ('student_fee_ledger', 'academic_year_id', 'academic_years', 'SET NULL'),
+    ('auto_student_mapping', 'auto_id', 'auto_management', 'CASCADE'),
+    ('auto_student_mapping', 'student_id', 'students', 'CASCADE'),
+]
+TABLES = list(dict.fromkeys(table for table, _, _, _ in FOREIGN_KEYS))
+
+
+def _foreign_key_name(table, column, referred_table):
+    return f'fk_{table}_{column}_{referred_table}'
+
+
+def _set_on_delete(actions):
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table in TABLES:
+        # PostgreSQL databases created before the naming convention may keep the default
+        # <table>_<column>_fkey names, SQLite ones have unnamed keys the convention names
+        existing = {
+            tuple(foreign_key['constrained_columns']): foreign_key['name']
+            for foreign_key in inspector.get_foreign_keys(table)
+        }
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for fk_table, column, referred_table, on_delete in FOREIGN_KEYS:
+                if fk_table != table:
+                    continue
+                name = _foreign_key_name(table, column, referred_table)
+                batch_op.drop_constraint(existing.get((column,)) or name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referred_table, [column], ['id'], ondelete=actions[on_delete])
+
+
+def upgrade() -> None:
+    _set_on_delete({'SET NULL': 'SET NULL', 'CASCADE': 'CASCADE'})
+
+
+def downgrade() -> None:
+    _set_on_delete({'SET NULL': None, 'CASCADE': None})
@@ -0,0 +1,113 @@
+"""uuid7 primary keys
+
+New rows get time-ordered UUID v7 ids. Rows keyed by the UUID v1 ids of before are given a v7 id
+carrying the same creation time, so the whole table sorts by age and its index fills in order.
+References follow through a mapping table, one set-based UPDATE per column. Downgrading keeps the
+new ids, both are valid UUIDs.
+
+Ids are part of URLs the frontend builds, so bookmarks to a single record from before the upgrade
+stop resolving. The table versions are bumped so no cached list keeps the old ids.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 11:40:05.512734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+from utils.uuid_generator import uuid7_at
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Each table keyed by an id, with the columns pointing at it and their ON DELETE action
+REFERENCES = {
+    'academic_years': [
+        ('classes', 'academic_year_id', 'SET NULL'),
+        ('students', 'academic_year_id', 'SET NULL'),
+        ('student_fee_ledger', 'academic_year_id', 'SET NULL'),
+    ],
+    'classes': [('sections', 'class_id', 'SET NULL'), ('students', 'class_id', 'SET NULL')],
+    'sections': [('students', 'section_id', 'SET NULL')],
+    'students': [
+        ('fee_payments', 'student_id', 'SET NULL'),
+        ('student_fee_ledger', 'student_id', 'CASCADE'),
+        ('auto_student_mapping', 'student_id', 'CASCADE'),
+    ],
+    'fee_payments': [],
+    'auto_management': [('auto_student_mapping', 'auto_id', 'CASCADE')],
+    'auto_student_mapping': [],
+}
+FOREIGN_KEYS = [
+    (table, column, referred_table, on_delete)
+    for referred_table, references in REFERENCES.items()
+    for table, column, on_delete in references
+]
+# Offset of the Unix epoch in UUID v1 time, 100 ns intervals since 1582-10-15
+UUID1_EPOCH = 0x01B21DD213814000
+
+id_map = sa.table('uuid7_id_map', sa.column('old_id', UUID(as_uuid=True)), sa.column('new_id', UUID(as_uuid=True)))
+
+
+def _foreign_key_name(table, column, referred_table):
+    return f'fk_{table}_{column}_{referred_table}'
+
+
+def _remap(table_name, column_name):
+    table = sa.table(table_name, sa.column(column_name, UUID(as_uuid=True)))
+    column = table.c[column_name]
+    op.execute(
+        table.update()
+        .where(column.in_(sa.select(id_map.c.old_id)))
+        .values({column_name: sa.select(id_map.c.new_id).where(id_map.c.old_id == column).scalar_subquery()})
+    )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    mapping = []
+    for table_name in REFERENCES:
+        table = sa.table(table_name, sa.column('id', UUID(as_uuid=True)))
+        for old_id in bind.execute(sa.select(table.c.id)).scalars():
+            if old_id.version == 1:
+                mapping.append({'old_id': old_id, 'new_id': uuid7_at((old_id.time - UUID1_EPOCH) // 10_000)})
+    if not mapping:
+        return
+
+    op.create_table(
+        'uuid7_id_map',
+        sa.Column('old_id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('new_id', UUID(as_uuid=True), nullable=False),
+    )
+    op.bulk_insert(id_map, mapping)
+    # SQLite runs migrations with foreign keys off (see init_db), PostgreSQL would check each
+    # reference as soon as its parent's id changes
+    postgresql = bind.dialect.name == 'postgresql'
+    if postgresql:
+        for table, column, referred_table, _ in FOREIGN_KEYS:
+            op.drop_constraint(_foreign_key_name(table, column, referred_table), table, type_='foreignkey')
+    for table_name, references in REFERENCES.items():
+        _remap(table_name, 'id')
+        for referencing_table, column_name, _ in references:
+            _remap(referencing_table, column_name)
+    if postgresql:
+        for table, column, referred_table, on_delete in FOREIGN_KEYS:
+            op.create_foreign_key(
+                _foreign_key_name(table, column, referred_table), table, referred_table, [column], ['id'],
+                ondelete=on_delete,
+            )
+    op.drop_table('uuid7_id_map')
+
+    table_versions = sa.table('table_versions', sa.column('table_name', sa.String), sa.column('version', sa.BigInteger))
+    op.execute(table_versions.update().values(version=table_versions.c.version + 1))
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,36 @@
+"""fee payment page index
+
+A student's payments page by (transaction_date, id), so the student's index carries id as well and
+serves the page in order. It still covers the ledger's latest and summed payments of a student.
+Month and date range pages walk the indexes from 0004. Class, section and year pages look their
+students up by the students indexes, then each student's payments by this one, and sort what a
+class paid rather than walk every payment in date order.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 12:31:17.862204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_fee_payments_student_id_transaction_date_id', 'fee_payments', ['student_id', 'transaction_date', 'id']
+    )
+    op.drop_index('ix_fee_payments_student_id_transaction_date', table_name='fee_payments')
+
+
+def downgrade() -> None:
+    op.create_index(
+        'ix_fee_payments_student_id_transaction_date', 'fee_payments', ['student_id', 'transaction_date']
+    )
+    op.drop_index('ix_fee_payments_student_id_transaction_date_id', table_name='fee_payments')
@@ -1,13 +1,13 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, BigInteger, Index, UniqueConstraint
 from sqlalchemy import ForeignKey, Enum, DECIMAL, DateTime
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import backref, relationship
 
 from database import Base
-from utils.uuid_generator import generate_time_based_uuid
+from utils.uuid_generator import generate_uuid7
 
 
 class Month(str, enum.Enum):
@@ -27,18 +27,25 @@ class Month(str, enum.Enum):
 
 class AcademicYear(Base):
     __tablename__ = "academic_years"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_time_based_uuid)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid7)
     year = Column(String, unique=True, index=True)
     is_active = Column(Boolean, default=False)
 
-    # Relationships
-    students = relationship("Student", back_populates="academic_year")
-    classes = relationship("Class", back_populates="academic_year")
+    # Relationships, passive_deletes leaves clearing the references to ON DELETE SET NULL
+    students = relationship("Student", back_populates="academic_year", passive_deletes=True)
+    classes = relationship("Class", back_populates="academic_year", passive_deletes=True)
+    fee_ledgers = relationship("StudentFeeLedger", back_populates="academic_year", passive_deletes=True)
 
 
 class Student(Base):
     __tablename__ = "students"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_time_based_uuid)
+    __table_args__ = (
+        UniqueConstraint("class_id", "roll_number"),
+        Index("ix_students_class_id_id", "class_id", "id"),
+        Index("ix_students_section_id_id", "section_id", "id"),
+        Index("ix_students_academic_year_id_id", "academic_year_id", "id"),
+    )
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid7)
     name = Column(String, index=True)
     roll_number = Column(String, index=True)
     father_name = Column(String)
@@ -50,42 +57,50 @@ class Student(Base):
     tuition_fees = Column(DECIMAL(10, 2))
     auto_fees = Column(DECIMAL(10, 2))
     day_boarding_fees = Column(DECIMAL(10, 2))
-    class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id"))
-    section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id"))
-    academic_year_id = Column(UUID(as_uuid=True), ForeignKey("academic_years.id"))
+    class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id", ondelete="SET NULL"))
+    section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id", ondelete="SET NULL"))
+    academic_year_id = Column(UUID(as_uuid=True), ForeignKey("academic_years.id", ondelete="SET NULL"))
 
     # Relationships
     class_ = relationship("Class", back_populates="students")
     section = relationship("Section", back_populates="students")
-    fee_payments = relationship("FeePayment", back_populates="student")
+    # Payments are kept with the student cleared, ON DELETE SET NULL
+    fee_payments = relationship("FeePayment", back_populates="student", passive_deletes=True)
     academic_year = relationship("AcademicYear", back_populates="students")
 
 
 class Class(Base):
     __tablename__ = "classes"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_time_based_uuid)
+    __table_args__ = (UniqueConstraint("academic_year_id", "name"),)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid7)
     name = Column(String, index=True)
-    academic_year_id = Column(UUID(as_uuid=True), ForeignKey("academic_years.id"))
+    academic_year_id = Column(UUID(as_uuid=True), ForeignKey("academic_years.id", ondelete="SET NULL"))
 
     # Relationships
     academic_year = relationship("AcademicYear", back_populates="classes")
-    students = relationship("Student", back_populates="class_")
-    sections = relationship("Section", back_populates="class_")
+    students = relationship("Student", back_populates="class_", passive_deletes=True)
+    sections = relationship("Section", back_populates="class_", passive_deletes=True)
 
 
 class Section(Base):
     __tablename__ = "sections"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_time_based_uuid)
+    __table_args__ = (UniqueConstraint("class_id", "name"),)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid7)
     name = Column(String, index=True)
-    class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id"))
+    class_id = Column(UUID(as_uuid=True), ForeignKey("classes.id", ondelete="SET NULL"))
     class_ = relationship("Class", back_populates="sections")
-    students = relationship("Student", back_populates="section")
+    students = relationship("Student", back_populates="section", passive_deletes=True)
 
 
 class FeePayment(Base):
     __tablename__ = "fee_payments"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_time_based_uuid)
-    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id"))
+    __table_args__ = (
+        Index("ix_fee_payments_student_id_transaction_date_id", "student_id", "transaction_date", "id"),
+        Index("ix_fee_payments_transaction_date_id", "transaction_date", "id"),
+        Index("ix_fee_payments_month_transaction_date_id", "month", "transaction_date", "id"),
+    )
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid7)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="SET NULL"))
     month = Column(Enum(Month))
     tuition_fees = Column(DECIMAL(10, 2))
     auto_fees = Column(DECIMAL(10, 2))
@@ -97,24 +112,55 @@ class FeePayment(Base):
     student = relationship("Student", back_populates="fee_payments")
 
 
+class StudentFeeLedger(Base):
+    """
+    Running fee balance of a student for their current academic year.
+    Payments carry no academic year, so every payment of the student counts towards it.
+    """
+    __tablename__ = "student_fee_ledger"
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), primary_key=True)
+    academic_year_id = Column(UUID(as_uuid=True), ForeignKey("academic_years.id", ondelete="SET NULL"))
+    expected_amount = Column(DECIMAL(10, 2), nullable=False, default=0)
+    paid_amount = Column(DECIMAL(10, 2), nullable=False, default=0)
+    balance = Column(DECIMAL(10, 2), nullable=False, default=0)
+    last_payment_date = Column(DateTime)
+
+    # Relationships
+    academic_year = relationship("AcademicYear", back_populates="fee_ledgers")
+
+
 class AutoManagement(Base):
     __tablename__ = "auto_management"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_time_based_uuid)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid7)
     name = Column(String, nullable=False)
 
-    # Relationship
-    students = relationship("AutoStudentMapping", back_populates="auto")
+    # Relationship, the mappings go with the auto through ON DELETE CASCADE
+    students = relationship("AutoStudentMapping", back_populates="auto", passive_deletes=True)
 
 
 class AutoStudentMapping(Base):
     __tablename__ = "auto_student_mapping"
-    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_time_based_uuid)
-    auto_id = Column(UUID(as_uuid=True), ForeignKey("auto_management.id"), nullable=False)
-    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id"), nullable=False)
+    __table_args__ = (
+        Index("ix_auto_student_mapping_auto_id_student_id", "auto_id", "student_id"),
+        Index("ix_auto_student_mapping_student_id", "student_id"),
+    )
+    id = Column(UUID(as_uuid=True), primary_key=True, default=generate_uuid7)
+    auto_id = Column(UUID(as_uuid=True), ForeignKey("auto_management.id", ondelete="CASCADE"), nullable=False)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("students.id", ondelete="CASCADE"), nullable=False)
 
     # Relationships
     auto = relationship("AutoManagement", back_populates="students")
-    student = relationship("Student", backref="auto_mappings")
+    student = relationship("Student", backref=backref("auto_mappings", passive_deletes=True))
+
+
 
 
 
+class TableVersion(Base):
+    """
+    Change counter per table, bumped in the same transaction as the write. Workers compare it
+    with the version their cached copy was loaded at.
+    """
+    __tablename__ = "table_versions"
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -1,14 +1,17 @@
 from uuid import UUID
 
 from fastapi import HTTPException
-from sqlalchemy import select, update
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models import AcademicYear
 from schemas import AcademicYearCreate, AcademicYearUpdate
+from utils.integrity import integrity_http_error
+from utils.metrics import instrument_repository
 
 
+@instrument_repository
 class AcademicYearRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -26,76 +29,80 @@ class AcademicYearRepository:
         return result.scalar_one_or_none()
 
     async def create(self, academic_year: AcademicYearCreate):
-        existing_year = await self.get_by_year(academic_year.year)
-        if existing_year:
-            raise HTTPException(status_code=400, detail=f"Academic year '{academic_year.year}' already exists")
-
+        # The year is unique through ix_academic_years_year
         try:
-            db_academic_year = AcademicYear(**academic_year.dict(), is_active=True)
             await self.deactivate_all_years()
-            self.db.add(db_academic_year)
-            await self.db.commit()
-            await self.db.refresh(db_academic_year)
+            result = await self.db.execute(
+                insert(AcademicYear).values(**academic_year.dict(), is_active=True).returning(AcademicYear)
+            )
+            db_academic_year = result.scalar_one()
+            await self.db.flush()
             return db_academic_year
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(status_code=400, detail="Error creating academic year.")
+            raise integrity_http_error(
+                e,
+                {"ix_academic_years_year": (400, f"Academic year '{academic_year.year}' already exists")},
+                default=(400, "Error creating academic year.")
+            )
 
     async def update(self, year_id: UUID, academic_year: AcademicYearUpdate):
-        db_academic_year = await self.get_by_id(year_id)
-        if not db_academic_year:
-            return None
+        update_data = academic_year.dict(exclude_unset=True)
+        if not update_data:
+            return await self.get_by_id(year_id)
 
-        if academic_year.year and academic_year.year != db_academic_year.year:
+        try:
+            # The updated row comes back from the UPDATE itself, no row means no such year
             result = await self.db.execute(
-                select(AcademicYear).where(
-                    AcademicYear.year == academic_year.year,
-                    AcademicYear.id != year_id
-                )
+                update(AcademicYear).where(AcademicYear.id == year_id).values(**update_data).returning(AcademicYear)
             )
-            existing_year = result.scalar_one_or_none()
-            if existing_year:
-                raise HTTPException(status_code=400, detail=f"Academic year '{academic_year.year}' already exists")
-
-        try:
-            for key, value in academic_year.dict(exclude_unset=True).items():
-                setattr(db_academic_year, key, value)
-            await self.db.commit()
-            await self.db.refresh(db_academic_year)
+            db_academic_year = result.scalar_one_or_none()
+            if not db_academic_year:
+                return None
+            await self.db.flush()
             return db_academic_year
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(status_code=400, detail="Error updating academic year.")
+            raise integrity_http_error(
+                e,
+                {"ix_academic_years_year": (400, f"Academic year '{academic_year.year}' already exists")},
+                default=(400, "Error updating academic year.")
+            )
 
     async def delete(self, year_id: UUID):
-        db_academic_year = await self.get_by_id(year_id)
-        if not db_academic_year:
-            return None
-        await self.db.delete(db_academic_year)
-        await self.db.commit()
-        return db_academic_year
+        """One DELETE, its classes, students and ledger rows are detached by ON DELETE SET NULL"""
+        result = await self.db.execute(
+            delete(AcademicYear).where(AcademicYear.id == year_id).returning(AcademicYear)
+        )
+        return result.scalar_one_or_none()
 
     async def deactivate_all_years(self):
+        """Part of the caller's unit of work, a failed create or activate leaves the active year in place"""
         await self.db.execute(update(AcademicYear).values(is_active=False))
-        await self.db.commit()
 
     async def activate_year(self, year_id: UUID):
-        db_academic_year = await self.get_by_id(year_id)
+        await self.deactivate_all_years()
+        result = await self.db.execute(
+            update(AcademicYear).where(AcademicYear.id == year_id).values(is_active=True).returning(AcademicYear)
+        )
+        db_academic_year = result.scalar_one_or_none()
         if not db_academic_year:
             raise HTTPException(status_code=404, detail="Academic year not found")
-        await self.deactivate_all_years()
-        db_academic_year.is_active = True
-        await self.db.commit()
-        await self.db.refresh(db_academic_year)
+        await self.db.flush()
         return db_academic_year
 
     async def deactivate_year(self, year_id: UUID):
-        db_academic_year = await self.get_by_id(year_id)
+        result = await self.db.execute(
+            update(AcademicYear)
+            .where(AcademicYear.id == year_id, AcademicYear.is_active.is_(True))
+            .values(is_active=False)
+            .returning(AcademicYear)
+        )
+        db_academic_year = result.scalar_one_or_none()
         if not db_academic_year:
-            raise HTTPException(status_code=404, detail="Academic year not found")
-        if not db_academic_year.is_active:
+            # Only the failure path needs to tell a missing year from an inactive one
+            if not await self.get_by_id(year_id):
+                raise HTTPException(status_code=404, detail="Academic year not found")
             raise HTTPException(status_code=400, detail="Academic year is already inactive")
-        db_academic_year.is_active = False
-        await self.db.commit()
-        await self.db.refresh(db_academic_year)
+        await self.db.flush()
         return db_academic_year
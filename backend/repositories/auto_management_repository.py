@@ -1,11 +1,15 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from models import AutoManagement, AutoStudentMapping
+from models import AutoManagement, AutoStudentMapping, Student, Class, Section
 from schemas import AutoManagementCreate, AutoManagementUpdate, AutoStudentMappingCreate
 from fastapi import HTTPException
+from typing import List
 from uuid import UUID
-from sqlalchemy import delete
+from sqlalchemy import delete, func, insert, update
+from utils.metrics import instrument_repository
 
+
+@instrument_repository
 class AutoManagementRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -14,33 +18,65 @@ class AutoManagementRepository:
         result = await self.db.execute(select(AutoManagement))
         return result.scalars().all()
 
+    async def get_all_with_students(self):
+        """
+        One row per auto and mapped student (student columns are NULL for autos without students),
+        with the auto's total auto fees computed per auto by a window sum.
+        """
+        total_fees = func.coalesce(func.sum(Student.auto_fees).over(partition_by=AutoManagement.id), 0)
+        result = await self.db.execute(
+            select(
+                AutoManagement.id.label("auto_id"),
+                AutoManagement.name.label("auto_name"),
+                total_fees.label("total_fees"),
+                AutoStudentMapping.student_id.label("mapped_student_id"),
+                Student.id.label("student_id"),
+                Student.name.label("student_name"),
+                Student.roll_number,
+                Student.contact,
+                Student.address,
+                Student.auto_fees,
+                Class.name.label("class_name"),
+                Section.name.label("section_name")
+            )
+            .outerjoin(AutoStudentMapping, AutoStudentMapping.auto_id == AutoManagement.id)
+            .outerjoin(Student, Student.id == AutoStudentMapping.student_id)
+            .outerjoin(Class, Class.id == Student.class_id)
+            .outerjoin(Section, Section.id == Student.section_id)
+            .order_by(AutoManagement.id)
+        )
+        return result.all()
+
     async def delete(self, auto_id: UUID):
         # Use the `delete` method from SQLAlchemy
         stmt = delete(AutoStudentMapping).where(AutoStudentMapping.auto_id == auto_id)
         await self.db.execute(stmt)
-        await self.db.commit()
+        await self.db.flush()
 
     async def get_by_id(self, auto_id: UUID):
         result = await self.db.execute(select(AutoManagement).filter(AutoManagement.id == auto_id))
         return result.scalar_one_or_none()
 
     async def create(self, auto: AutoManagementCreate):
-        db_auto = AutoManagement(**auto.dict())
-        self.db.add(db_auto)
-        await self.db.commit()
-        await self.db.refresh(db_auto)
+        result = await self.db.execute(insert(AutoManagement).values(**auto.dict()).returning(AutoManagement))
+        db_auto = result.scalar_one()
+        await self.db.flush()
         return db_auto
 
     async def update(self, auto_id: UUID, auto: AutoManagementUpdate):
-        db_auto = await self.get_by_id(auto_id)
+        update_data = auto.dict(exclude_unset=True)
+        if not update_data:
+            return await self.get_by_id(auto_id)
+
+        # The updated row comes back from the UPDATE itself, no row means no such auto
+        result = await self.db.execute(
+            update(AutoManagement).where(AutoManagement.id == auto_id).values(**update_data).returning(AutoManagement)
+        )
+        db_auto = result.scalar_one_or_none()
         if not db_auto:
             return None
 
-        for key, value in auto.dict(exclude_unset=True).items():
-            setattr(db_auto, key, value)
-
-        await self.db.commit()
-        await self.db.refresh(db_auto)
+        await self.db.flush()
         return db_auto
 
     # async def delete(self, auto_id: UUID):
@@ -48,35 +84,20 @@ class AutoManagementRepository:
     #     if not db_auto:
     #         return None
     #     await self.db.delete(db_auto)
-    #     await self.db.commit()
+    #     await self.db.flush()
     #     return db_auto
 
     async def delete_auto(self, auto_id: UUID):
-        try:
-            # First, delete all student mappings for this auto
-            mappings = await self.db.execute(
-                select(AutoStudentMapping).filter(AutoStudentMapping.auto_id == auto_id)
-            )
-            mappings_list = mappings.scalars().all()  # Get the list of mappings
-
-            if mappings_list:
-                for mapping in mappings_list:
-                    await self.db.delete(mapping)
-
-            # Then, delete the auto
-            auto = await self.get_by_id(auto_id)
-            if not auto:
-                raise HTTPException(status_code=404, detail="Auto not found")
-
-            await self.db.delete(auto)
-            await self.db.commit()
-
-            return {"message": "Auto and its mappings deleted successfully"}
-        except Exception as e:
-            await self.db.rollback()
-            raise HTTPException(status_code=500, detail=str(e))
+        """One DELETE, the auto's student mappings go with it through ON DELETE CASCADE"""
+        result = await self.db.execute(
+            delete(AutoManagement).where(AutoManagement.id == auto_id).returning(AutoManagement.id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Auto not found")
+        return {"message": "Auto and its mappings deleted successfully"}
 
 
+@instrument_repository
 class AutoStudentMappingRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -90,22 +111,53 @@ class AutoStudentMappingRepository:
         return result.scalars().all()
 
     async def create(self, mapping: AutoStudentMappingCreate):
-        db_mapping = AutoStudentMapping(**mapping.dict())
-        self.db.add(db_mapping)
-        await self.db.commit()
-        await self.db.refresh(db_mapping)
+        result = await self.db.execute(
+            insert(AutoStudentMapping).values(**mapping.dict()).returning(AutoStudentMapping)
+        )
+        db_mapping = result.scalar_one()
+        await self.db.flush()
         return db_mapping
 
     async def delete_by_student(self, student_id: UUID):
         stmt = delete(AutoStudentMapping).where(AutoStudentMapping.student_id == student_id)
         await self.db.execute(stmt)
-        await self.db.commit()
+        await self.db.flush()
 
     async def delete_by_auto(self, auto_id: UUID):
         """Delete all mappings for a specific auto"""
         stmt = delete(AutoStudentMapping).where(AutoStudentMapping.auto_id == auto_id)
         await self.db.execute(stmt)
-        await self.db.commit()
+        await self.db.flush()
+
+    async def replace_students(self, auto_id: UUID, student_ids: List[UUID]):
+        """
+        Make student_ids the exact set of students mapped to the auto in one transaction:
+        one DELETE for the students dropped and one multi-row INSERT for the new ones.
+        Returns the (added, removed) student ids.
+        """
+        try:
+            current_ids = set(await self.get_students_by_auto(auto_id))
+            wanted_ids = set(student_ids)
+            added = [student_id for student_id in student_ids if student_id not in current_ids]
+            removed = [student_id for student_id in current_ids if student_id not in wanted_ids]
+
+            if removed:
+                await self.db.execute(
+                    delete(AutoStudentMapping).where(
+                        AutoStudentMapping.auto_id == auto_id,
+                        AutoStudentMapping.student_id.in_(removed)
+                    )
+                )
+            if added:
+                await self.db.execute(
+                    insert(AutoStudentMapping),
+                    [{"auto_id": auto_id, "student_id": student_id} for student_id in added]
+                )
+            await self.db.flush()
+            return added, removed
+        except Exception:
+            await self.db.rollback()
+            raise
 
     async def get_students_by_auto(self, auto_id: UUID):
         """Get all student IDs mapped to an auto"""
@@ -1,12 +1,16 @@
+from sqlalchemy import delete, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from models import Class
+from utils.integrity import integrity_http_error
+from utils.metrics import instrument_repository
 from schemas import ClassCreate, ClassUpdate
 from uuid import UUID
 
 
+@instrument_repository
 class ClassRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -28,66 +32,53 @@ class ClassRepository:
         )
         return result.scalar_one_or_none()
 
-    async def create(self, class_: ClassCreate):
-        # Check if class with the same name exists in the same academic year
-        existing_class = await self.get_by_name_and_year(class_.name, class_.academic_year_id)
-        if existing_class:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Class with name '{class_.name}' already exists in this academic year"
-            )
+    def _integrity_error(self, error: IntegrityError, class_name, default: str) -> HTTPException:
+        return integrity_http_error(
+            error,
+            {
+                "uq_classes_academic_year_id_name": (
+                    400, f"Class with name '{class_name}' already exists in this academic year"
+                ),
+                "fk_classes_academic_year_id_academic_years": (
+                    400, "Invalid academic_year_id: Academic year does not exist"
+                ),
+            },
+            default=(400, default)
+        )
 
+    async def create(self, class_: ClassCreate):
+        # Duplicate names and unknown academic years are rejected by the table's constraints
         try:
-            db_class = Class(**class_.dict())
-            self.db.add(db_class)
-            await self.db.commit()
-            await self.db.refresh(db_class)
+            result = await self.db.execute(insert(Class).values(**class_.dict()).returning(Class))
+            db_class = result.scalar_one()
+            await self.db.flush()
             return db_class
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail="Error creating class. Please check your input."
-            )
+            raise self._integrity_error(e, class_.name, "Error creating class. Please check your input.")
 
     async def update(self, class_id: UUID, class_: ClassUpdate):
-        db_class = await self.get_by_id(class_id)
-        if not db_class:
-            return None
-
-        # If either name or academic_year_id is being updated, check for duplicates
-        if class_.name or class_.academic_year_id:
-            # Use new values if provided, otherwise use existing values
-            check_name = class_.name if class_.name else db_class.name
-            check_year_id = class_.academic_year_id if class_.academic_year_id else db_class.academic_year_id
-
-            # Check for existing class with the same name in the same academic year (excluding current class)
-            existing_class = await self.get_by_name_and_year(check_name, check_year_id)
-            if existing_class and existing_class.id != class_id:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Class with name '{check_name}' already exists in this academic year"
-                )
+        update_data = class_.dict(exclude_unset=True)
+        if not update_data:
+            return await self.get_by_id(class_id)
 
         try:
-            update_data = class_.dict(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(db_class, key, value)
-
-            await self.db.commit()
-            await self.db.refresh(db_class)
+            # The updated row comes back from the UPDATE itself, no row means no such class
+            result = await self.db.execute(
+                update(Class).where(Class.id == class_id).values(**update_data).returning(Class)
+            )
+            db_class = result.scalar_one_or_none()
+            if not db_class:
+                return None
+            await self.db.flush()
             return db_class
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail="Error updating class. Please check your input."
-            )
+            # Without a new name the clash is with the class's current name, which the failed UPDATE can't return
+            class_name = class_.name or (await self.get_by_id(class_id)).name
+            raise self._integrity_error(e, class_name, "Error updating class. Please check your input.")
 
     async def delete(self, class_id: UUID):
-        db_class = await self.get_by_id(class_id)
-        if not db_class:
-            return None
-        await self.db.delete(db_class)
-        await self.db.commit()
-        return db_class
\ No newline at end of file
+        """One DELETE, its sections and students are detached by ON DELETE SET NULL"""
+        result = await self.db.execute(delete(Class).where(Class.id == class_id).returning(Class))
+        return result.scalar_one_or_none()
\ No newline at end of file
@@ -0,0 +1,195 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import Numeric, case, delete, func, insert, select, type_coerce, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import FeePayment, Student, StudentFeeLedger
+from utils.bulk_insert import bulk_insert
+from utils.metrics import instrument_repository
+
+# Aggregates keep the two decimal places of the fee columns on every backend
+Amount = Numeric(14, 2)
+
+
+def expected_fees(student: Student) -> Decimal:
+    return (student.tuition_fees or 0) + (student.auto_fees or 0) + (student.day_boarding_fees or 0)
+
+
+@instrument_repository
+class FeeLedgerRepository:
+    """
+    Keeps student_fee_ledger in step with students and fee payments.
+    None of these methods commit, callers run them inside their own write so both land together.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_student(self, student_id: UUID):
+        result = await self.db.execute(select(StudentFeeLedger).filter(StudentFeeLedger.student_id == student_id))
+        return result.scalar_one_or_none()
+
+    async def get_totals(self):
+        """Collected amount and outstanding dues over all students"""
+        result = await self.db.execute(
+            select(
+                type_coerce(func.coalesce(func.sum(StudentFeeLedger.paid_amount), 0), Amount).label("total_paid"),
+                type_coerce(func.coalesce(func.sum(
+                    case((StudentFeeLedger.balance > 0, StudentFeeLedger.balance), else_=0)
+                ), 0), Amount).label("total_dues")
+            )
+        )
+        return result.one()
+
+    async def get_top_balances(self, limit: int):
+        """Ledger rows of students that have paid something, largest balance first"""
+        result = await self.db.execute(
+            select(
+                Student.id,
+                Student.name,
+                StudentFeeLedger.expected_amount,
+                StudentFeeLedger.paid_amount,
+                StudentFeeLedger.balance
+            )
+            .join(StudentFeeLedger, StudentFeeLedger.student_id == Student.id)
+            .filter(StudentFeeLedger.paid_amount > 0)
+            .order_by(StudentFeeLedger.balance.desc(), Student.id)
+            .limit(limit)
+        )
+        return result.all()
+
+    async def create_for_student(self, student: Student):
+        expected = expected_fees(student)
+        self.db.add(StudentFeeLedger(
+            student_id=student.id,
+            academic_year_id=student.academic_year_id,
+            expected_amount=expected,
+            paid_amount=Decimal("0.00"),
+            balance=expected
+        ))
+
+    async def bulk_create_for_students(self, students: List[dict]):
+        rows = []
+        for student in students:
+            expected = student["tuition_fees"] + student["auto_fees"] + student["day_boarding_fees"]
+            rows.append({
+                "student_id": student["id"],
+                "academic_year_id": student["academic_year_id"],
+                "expected_amount": expected,
+                "paid_amount": Decimal("0.00"),
+                "balance": expected,
+                "last_payment_date": None
+            })
+        await bulk_insert(self.db, StudentFeeLedger, rows)
+
+    async def sync_student(self, student: Student):
+        """Pick up changed fees or academic year of a student"""
+        expected = expected_fees(student)
+        result = await self.db.execute(
+            update(StudentFeeLedger)
+            .where(StudentFeeLedger.student_id == student.id)
+            .values(
+                academic_year_id=student.academic_year_id,
+                expected_amount=expected,
+                balance=expected - StudentFeeLedger.paid_amount
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            await self.rebuild_student(student.id)
+
+    async def apply_payment(self, student_id: Optional[UUID], amount: Decimal,
+                            payment_date: Optional[datetime] = None):
+        """Add a (possibly negative) payment amount to the student's running totals"""
+        if not student_id:
+            return
+        values = {
+            "paid_amount": StudentFeeLedger.paid_amount + amount,
+            "balance": StudentFeeLedger.balance - amount
+        }
+        if payment_date:
+            values["last_payment_date"] = case(
+                (StudentFeeLedger.last_payment_date > payment_date, StudentFeeLedger.last_payment_date),
+                else_=payment_date
+            )
+        result = await self.db.execute(
+            update(StudentFeeLedger)
+            .where(StudentFeeLedger.student_id == student_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            # Student predates the ledger and was never backfilled
+            await self.rebuild_student(student_id)
+
+    async def refresh_last_payment_date(self, student_id: Optional[UUID]):
+        """Needed when a payment leaves the student, the latest remaining one can't be derived incrementally"""
+        if not student_id:
+            return
+        latest = (
+            select(func.max(FeePayment.transaction_date))
+            .where(FeePayment.student_id == student_id)
+            .scalar_subquery()
+        )
+        await self.db.execute(
+            update(StudentFeeLedger)
+            .where(StudentFeeLedger.student_id == student_id)
+            .values(last_payment_date=latest)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def delete_for_student(self, student_id: UUID):
+        await self.db.execute(
+            delete(StudentFeeLedger)
+            .where(StudentFeeLedger.student_id == student_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def rebuild_student(self, student_id: UUID):
+        await self.delete_for_student(student_id)
+        await self._insert_from_payments(Student.id == student_id)
+
+    async def rebuild(self):
+        """Recompute every ledger row from students and the full payment history"""
+        await self.db.execute(delete(StudentFeeLedger).execution_options(synchronize_session=False))
+        await self._insert_from_payments()
+
+    async def _insert_from_payments(self, *criteria):
+        paid = (
+            select(
+                FeePayment.student_id,
+                func.sum(FeePayment.total_amount).label("paid_amount"),
+                func.max(FeePayment.transaction_date).label("last_payment_date")
+            )
+            .group_by(FeePayment.student_id)
+            .subquery()
+        )
+        expected = type_coerce(
+            func.coalesce(Student.tuition_fees, 0) +
+            func.coalesce(Student.auto_fees, 0) +
+            func.coalesce(Student.day_boarding_fees, 0),
+            Amount
+        )
+        paid_amount = type_coerce(func.coalesce(paid.c.paid_amount, 0), Amount)
+        rows = (
+            select(
+                Student.id,
+                Student.academic_year_id,
+                expected,
+                paid_amount,
+                expected - paid_amount,
+                paid.c.last_payment_date
+            )
+            .outerjoin(paid, paid.c.student_id == Student.id)
+            .filter(*criteria)
+        )
+        await self.db.execute(
+            insert(StudentFeeLedger).from_select(
+                ["student_id", "academic_year_id", "expected_amount", "paid_amount", "balance",
+                 "last_payment_date"],
+                rows
+            )
+        )
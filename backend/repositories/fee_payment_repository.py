@@ -1,23 +1,118 @@
+from typing import Optional
 from uuid import UUID
 
+from sqlalchemy import delete, insert, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
-from models import FeePayment
+from models import FeePayment, Month, Student
+from repositories.fee_ledger_repository import FeeLedgerRepository
 from schemas import FeePaymentCreate, FeePaymentUpdate
-from fastapi import HTTPException
-from datetime import datetime
-from sqlalchemy.orm import joinedload
+from datetime import date, datetime, time, timedelta
+from utils.export import EXPORT_BATCH_SIZE
+from utils.integrity import integrity_http_error
+from utils.metrics import instrument_repository
 
+# Payments reference their student through fk_fee_payments_student_id_students
+INTEGRITY_MESSAGES = {
+    "fk_fee_payments_student_id_students": (400, "Invalid student_id: Student does not exist"),
+}
+# The columns of FeePaymentResponse
+PAGE_COLUMNS = (
+    FeePayment.id, FeePayment.student_id, FeePayment.month, FeePayment.tuition_fees, FeePayment.auto_fees,
+    FeePayment.day_boarding_fees, FeePayment.total_amount, FeePayment.transaction_date,
+)
+
+
+@instrument_repository
 class FeePaymentRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.ledger_repo = FeeLedgerRepository(db)
 
     async def get_all(self):
-        result = await self.db.execute(
-            select(FeePayment).options(joinedload(FeePayment.student))
+        """Plain column dicts, listing doesn't need ORM instances"""
+        result = await self.db.execute(select(*FeePayment.__table__.columns))
+        return [dict(row) for row in result.mappings()]
+
+    async def get_page(
+            self,
+            limit: int,
+            after: Optional[tuple] = None,
+            descending: bool = False,
+            student_id: Optional[UUID] = None,
+            class_id: Optional[UUID] = None,
+            section_id: Optional[UUID] = None,
+            academic_year_id: Optional[UUID] = None,
+            month: Optional[Month] = None,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None
+    ):
+        """
+        Up to limit + 1 payments ordered by (transaction_date, id), those after the
+        (transaction_date, id) key `after` in that order. One row beyond the limit tells the
+        caller a next page exists. Class, section and year filters select the students' ids
+        without loading the students.
+        """
+        query = select(*PAGE_COLUMNS)
+        if student_id:
+            query = query.filter(FeePayment.student_id == student_id)
+        student_filters = [
+            column == value
+            for column, value in (
+                (Student.class_id, class_id),
+                (Student.section_id, section_id),
+                (Student.academic_year_id, academic_year_id),
+            )
+            if value
+        ]
+        if student_filters:
+            query = query.filter(FeePayment.student_id.in_(select(Student.id).filter(*student_filters)))
+        if month:
+            query = query.filter(FeePayment.month == month)
+        if date_from:
+            query = query.filter(FeePayment.transaction_date >= datetime.combine(date_from, time.min))
+        if date_to:
+            # date_to is inclusive
+            query = query.filter(FeePayment.transaction_date < datetime.combine(date_to + timedelta(days=1), time.min))
+        key = tuple_(FeePayment.transaction_date, FeePayment.id)
+        if after:
+            query = query.filter(key < after if descending else key > after)
+        if descending:
+            query = query.order_by(FeePayment.transaction_date.desc(), FeePayment.id.desc())
+        else:
+            query = query.order_by(FeePayment.transaction_date, FeePayment.id)
+        result = await self.db.execute(query.limit(limit + 1))
+        return [dict(row) for row in result.mappings()]
+
+    async def stream(
+            self,
+            academic_year_id: Optional[UUID] = None,
+            class_id: Optional[UUID] = None,
+            month: Optional[Month] = None,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None
+    ):
+        """Yield payment rows in batches read through a server-side cursor, oldest first"""
+        query = select(*FeePayment.__table__.columns)
+        if academic_year_id or class_id:
+            query = query.join(Student, Student.id == FeePayment.student_id)
+            if academic_year_id:
+                query = query.filter(Student.academic_year_id == academic_year_id)
+            if class_id:
+                query = query.filter(Student.class_id == class_id)
+        if month:
+            query = query.filter(FeePayment.month == month)
+        if date_from:
+            query = query.filter(FeePayment.transaction_date >= datetime.combine(date_from, time.min))
+        if date_to:
+            # date_to is inclusive
+            query = query.filter(FeePayment.transaction_date < datetime.combine(date_to + timedelta(days=1), time.min))
+        result = await self.db.stream(
+            query.order_by(FeePayment.transaction_date, FeePayment.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
         )
-        return result.scalars().all()
+        async for batch in result.mappings().partitions():
+            yield batch
 
     async def get_by_id(self, payment_id: UUID):
         result = await self.db.execute(select(FeePayment).filter(FeePayment.id == payment_id))
@@ -32,28 +127,32 @@ class FeePaymentRepository:
                 fee_payment.day_boarding_fees
             )
 
-            db_fee_payment = FeePayment(
-                **fee_payment.dict(),
-                total_amount=total_amount,
-                transaction_date=datetime.utcnow()
+            result = await self.db.execute(
+                insert(FeePayment)
+                .values(**fee_payment.dict(), total_amount=total_amount, transaction_date=datetime.utcnow())
+                .returning(FeePayment)
             )
-            self.db.add(db_fee_payment)
-            await self.db.commit()
-            await self.db.refresh(db_fee_payment)
+            db_fee_payment = result.scalar_one()
+            await self.ledger_repo.apply_payment(
+                db_fee_payment.student_id, total_amount, db_fee_payment.transaction_date
+            )
+            await self.db.flush()
             return db_fee_payment
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail="Error creating fee payment. Please check your input."
+            raise integrity_http_error(
+                e, INTEGRITY_MESSAGES, default=(400, "Error creating fee payment. Please check your input.")
             )
 
     async def update(self, payment_id: UUID, fee_payment: FeePaymentUpdate):
+        # Read first: the ledger needs the previous student and amount, which RETURNING can't give
         db_fee_payment = await self.get_by_id(payment_id)
         if not db_fee_payment:
             return None
 
         try:
+            previous_student_id = db_fee_payment.student_id
+            previous_total = db_fee_payment.total_amount
             update_data = fee_payment.dict(exclude_unset=True)
 
             # If any fee is updated, recalculate total
@@ -68,20 +167,33 @@ class FeePaymentRepository:
             for key, value in update_data.items():
                 setattr(db_fee_payment, key, value)
 
-            await self.db.commit()
-            await self.db.refresh(db_fee_payment)
+            if db_fee_payment.student_id == previous_student_id:
+                await self.ledger_repo.apply_payment(
+                    previous_student_id, db_fee_payment.total_amount - previous_total
+                )
+            else:
+                await self.ledger_repo.apply_payment(previous_student_id, -previous_total)
+                await self.ledger_repo.refresh_last_payment_date(previous_student_id)
+                await self.ledger_repo.apply_payment(
+                    db_fee_payment.student_id, db_fee_payment.total_amount, db_fee_payment.transaction_date
+                )
+
+            await self.db.flush()
             return db_fee_payment
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail="Error updating fee payment. Please check your input."
+            raise integrity_http_error(
+                e, INTEGRITY_MESSAGES, default=(400, "Error updating fee payment. Please check your input.")
             )
 
     async def delete(self, payment_id: UUID):
-        db_payment = await self.get_by_id(payment_id)
+        result = await self.db.execute(
+            delete(FeePayment).where(FeePayment.id == payment_id).returning(FeePayment)
+        )
+        db_payment = result.scalar_one_or_none()
         if not db_payment:
             return None
-        await self.db.delete(db_payment)
-        await self.db.commit()
+        await self.ledger_repo.apply_payment(db_payment.student_id, -db_payment.total_amount)
+        await self.ledger_repo.refresh_last_payment_date(db_payment.student_id)
+        await self.db.flush()
         return db_payment
\ No newline at end of file
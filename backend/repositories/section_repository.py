@@ -1,12 +1,16 @@
+from sqlalchemy import delete, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
-from models import Section
+from models import AcademicYear, Class, Section
 from schemas import SectionCreate, SectionUpdate
 from fastapi import HTTPException
+from utils.integrity import integrity_http_error
+from utils.metrics import instrument_repository
 from uuid import UUID
 
 
+@instrument_repository
 class SectionRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -23,6 +27,33 @@ class SectionRepository:
         result = await self.db.execute(select(Section).filter(Section.class_id == class_id))
         return result.scalars().all()
 
+    async def get_ids_by_names(self, years, class_names, section_names):
+        """
+        Map (academic year, class name, section name) to their ids for every combination
+        that exists among the given names, in one query
+        """
+        result = await self.db.execute(
+            select(
+                AcademicYear.year,
+                Class.name.label("class_name"),
+                Section.name.label("section_name"),
+                AcademicYear.id.label("academic_year_id"),
+                Class.id.label("class_id"),
+                Section.id.label("section_id")
+            )
+            .join(Class, Class.academic_year_id == AcademicYear.id)
+            .join(Section, Section.class_id == Class.id)
+            .filter(
+                AcademicYear.year.in_(years),
+                Class.name.in_(class_names),
+                Section.name.in_(section_names)
+            )
+        )
+        return {
+            (row.year, row.class_name, row.section_name): (row.academic_year_id, row.class_id, row.section_id)
+            for row in result.all()
+        }
+
     async def get_by_name_and_class(self, name: str, class_id: UUID):
         result = await self.db.execute(
             select(Section).filter(
@@ -32,63 +63,57 @@ class SectionRepository:
         )
         return result.scalar_one_or_none()
 
-    async def create(self, section: SectionCreate):
-        # Check if section with the same name exists in the same class
-        existing_section = await self.get_by_name_and_class(section.name, section.class_id)
-        if existing_section:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Section with name '{section.name}' already exists in this class"
-            )
+    def _integrity_error(self, error: IntegrityError, section_name, class_id, default: str) -> HTTPException:
+        return integrity_http_error(
+            error,
+            {
+                "uq_sections_class_id_name": (
+                    400, f"Section with name '{section_name}' already exists in this class"
+                ),
+                "fk_sections_class_id_classes": (
+                    400, f"Invalid class_id: Class with id {class_id} does not exist"
+                ),
+            },
+            default=(400, default)
+        )
 
+    async def create(self, section: SectionCreate):
+        # Duplicate names and unknown classes are rejected by the table's constraints
         try:
-            db_section = Section(**section.dict())
-            self.db.add(db_section)
-            await self.db.commit()
-            await self.db.refresh(db_section)
+            result = await self.db.execute(insert(Section).values(**section.dict()).returning(Section))
+            db_section = result.scalar_one()
+            await self.db.flush()
             return db_section
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail="Error creating section. Please check your input."
+            raise self._integrity_error(
+                e, section.name, section.class_id, "Error creating section. Please check your input."
             )
 
     async def update(self, section_id: UUID, section: SectionUpdate):
-        db_section = await self.get_by_id(section_id)
-        if not db_section:
-            return None
-
-        # If name or class_id is being updated, check for duplicates
-        if section.name or section.class_id:
-            check_name = section.name if section.name else db_section.name
-            check_class = section.class_id if section.class_id else db_section.class_id
-
-            # Check for existing section with the same name in the same class (excluding current section)
-            existing_section = await self.get_by_name_and_class(check_name, check_class)
-            if existing_section and existing_section.id != section_id:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Section with name '{check_name}' already exists in this class"
-                )
+        update_data = section.dict(exclude_unset=True)
+        if not update_data:
+            return await self.get_by_id(section_id)
 
         try:
-            for key, value in section.dict(exclude_unset=True).items():
-                setattr(db_section, key, value)
-            await self.db.commit()
-            await self.db.refresh(db_section)
+            # The updated row comes back from the UPDATE itself, no row means no such section
+            result = await self.db.execute(
+                update(Section).where(Section.id == section_id).values(**update_data).returning(Section)
+            )
+            db_section = result.scalar_one_or_none()
+            if not db_section:
+                return None
+            await self.db.flush()
             return db_section
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail="Error updating section. Please check your input."
+            # Without a new name the clash is with the section's current name, which the failed UPDATE can't return
+            section_name = section.name or (await self.get_by_id(section_id)).name
+            raise self._integrity_error(
+                e, section_name, section.class_id, "Error updating section. Please check your input."
             )
 
     async def delete(self, section_id: UUID):
-        db_section = await self.get_by_id(section_id)
-        if not db_section:
-            return None
-        await self.db.delete(db_section)
-        await self.db.commit()
-        return db_section
\ No newline at end of file
+        """One DELETE, its students are detached by ON DELETE SET NULL"""
+        result = await self.db.execute(delete(Section).where(Section.id == section_id).returning(Section))
+        return result.scalar_one_or_none()
\ No newline at end of file
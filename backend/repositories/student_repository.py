@@ -1,24 +1,49 @@
+from sqlalchemy import delete, func, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
 from models import Student
+from repositories.fee_ledger_repository import FeeLedgerRepository
+from utils.bulk_insert import bulk_insert
+from utils.export import EXPORT_BATCH_SIZE
+from utils.integrity import integrity_http_error
+from utils.uuid_generator import generate_uuid7
 from schemas import StudentCreate, StudentUpdate
 from fastapi import HTTPException
+from typing import List, Optional
 from uuid import UUID
+from utils.metrics import instrument_repository
 
 
+LEDGER_FIELDS = {"tuition_fees", "auto_fees", "day_boarding_fees", "academic_year_id"}
+
+
+@instrument_repository
 class StudentRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.ledger_repo = FeeLedgerRepository(db)
 
     async def get_all(self):
-        result = await self.db.execute(select(Student))
-        return result.scalars().all()
+        """Plain column dicts, listing doesn't need ORM instances"""
+        result = await self.db.execute(select(*Student.__table__.columns))
+        return [dict(row) for row in result.mappings()]
+
+    async def count(self):
+        result = await self.db.execute(select(func.count(Student.id)))
+        return result.scalar_one()
 
     async def get_by_id(self, student_id: UUID):
         result = await self.db.execute(select(Student).filter(Student.id == student_id))
         return result.scalar_one_or_none()
 
+    async def get_existing_ids(self, student_ids: List[UUID]):
+        """Subset of student_ids that exist, checked with a single IN query"""
+        if not student_ids:
+            return set()
+        result = await self.db.execute(select(Student.id).filter(Student.id.in_(student_ids)))
+        return set(result.scalars().all())
+
     async def get_by_roll_number(self, roll_number: str):
         result = await self.db.execute(select(Student).filter(Student.roll_number == roll_number))
         return result.scalar_one_or_none()
@@ -32,75 +57,128 @@ class StudentRepository:
         )
         return result.scalar_one_or_none()
 
-    async def create(self, student: StudentCreate):
-        # Check for duplicate roll number only if one is provided
-        if student.roll_number:
-            existing_student = await self.get_by_roll_number_in_class(student.roll_number, student.class_id)
-            if existing_student:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Student with roll number '{student.roll_number}' already exists in this class"
-                )
+    def _integrity_error(self, error: IntegrityError, roll_number, default: str) -> HTTPException:
+        return integrity_http_error(
+            error,
+            {"uq_students_class_id_roll_number": (
+                400, f"Student with roll number '{roll_number}' already exists in this class"
+            )},
+            default=(400, default)
+        )
 
+    async def create(self, student: StudentCreate):
+        # Roll numbers are unique per class through uq_students_class_id_roll_number, a missing one is allowed
         try:
-            db_student = Student(**student.dict())
-            self.db.add(db_student)
-            await self.db.commit()
-            await self.db.refresh(db_student)
+            result = await self.db.execute(insert(Student).values(**student.dict()).returning(Student))
+            db_student = result.scalar_one()
+            await self.ledger_repo.create_for_student(db_student)
+            await self.db.flush()
             return db_student
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail="Error creating student. Please check your input."
+            raise self._integrity_error(e, student.roll_number, "Error creating student. Please check your input.")
+
+    async def get_taken_roll_numbers(self, class_ids, roll_numbers):
+        """(class_id, roll_number) pairs already used among the given classes and roll numbers"""
+        if not class_ids or not roll_numbers:
+            return set()
+        result = await self.db.execute(
+            select(Student.class_id, Student.roll_number).filter(
+                Student.class_id.in_(class_ids),
+                Student.roll_number.in_(roll_numbers)
             )
+        )
+        return {(row.class_id, row.roll_number) for row in result.all()}
+
+    async def bulk_create(self, students: List[StudentCreate]):
+        """Insert validated students and their ledger rows in one transaction"""
+        rows = [{"id": generate_uuid7(), **student.dict()} for student in students]
+        try:
+            await bulk_insert(self.db, Student, rows)
+            await self.ledger_repo.bulk_create_for_students(rows)
+            await self.db.flush()
+            return len(rows)
+        except IntegrityError as e:
+            await self.db.rollback()
+            # The database doesn't say which row clashed, only a single row can be named
+            if len(students) > 1:
+                raise HTTPException(status_code=400, detail="Error importing students. Please check your input.")
+            raise self._integrity_error(e, students[0].roll_number, "Error importing student. Please check your input.")
 
     async def update(self, student_id: UUID, student: StudentUpdate):
-        db_student = await self.get_by_id(student_id)
-        if not db_student:
-            return None
-
-        # Check for duplicate roll number only if it's being updated
-        if student.roll_number:
-            # If class is also being updated, use new class_id, otherwise use existing
-            check_class = student.class_id if student.class_id else db_student.class_id
-
-            # Check for duplicates only if roll number is different
-            if student.roll_number != db_student.roll_number:
-                existing_student = await self.get_by_roll_number_in_class(student.roll_number, check_class)
-                if existing_student and existing_student.id != student_id:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Student with roll number '{student.roll_number}' already exists in this class"
-                    )
+        update_data = student.dict(exclude_unset=True)
+        if not update_data:
+            return await self.get_by_id(student_id)
 
         try:
-            update_data = student.dict(exclude_unset=True)
-            for key, value in update_data.items():
-                setattr(db_student, key, value)
+            # The updated row comes back from the UPDATE itself, no row means no such student
+            result = await self.db.execute(
+                update(Student).where(Student.id == student_id).values(**update_data).returning(Student)
+            )
+            db_student = result.scalar_one_or_none()
+            if not db_student:
+                return None
 
-            await self.db.commit()
-            await self.db.refresh(db_student)
+            if LEDGER_FIELDS.intersection(update_data):
+                await self.ledger_repo.sync_student(db_student)
+
+            await self.db.flush()
             return db_student
-        except IntegrityError:
+        except IntegrityError as e:
             await self.db.rollback()
-            raise HTTPException(
-                status_code=400,
-                detail="Error updating student. Please check your input."
-            )
+            # Moving class without a new roll number clashes on the current one, which the failed UPDATE can't return
+            roll_number = student.roll_number or (await self.get_by_id(student_id)).roll_number
+            raise self._integrity_error(e, roll_number, "Error updating student. Please check your input.")
 
     async def delete(self, student_id: UUID):
-        db_student = await self.get_by_id(student_id)
-        if not db_student:
-            return None
-        await self.db.delete(db_student)
-        await self.db.commit()
-        return db_student
-
-    async def get_by_class(self, class_id: UUID):
-        result = await self.db.execute(select(Student).filter(Student.class_id == class_id))
-        return result.scalars().all()
-
-    async def get_by_section(self, section_id: UUID):
-        result = await self.db.execute(select(Student).filter(Student.section_id == section_id))
-        return result.scalars().all()
\ No newline at end of file
+        """
+        One DELETE: the ledger row and auto mappings go with the student (ON DELETE CASCADE),
+        payments are kept with their student cleared (ON DELETE SET NULL)
+        """
+        result = await self.db.execute(delete(Student).where(Student.id == student_id).returning(Student))
+        return result.scalar_one_or_none()
+
+    async def get_page(
+            self,
+            limit: int,
+            after: Optional[UUID] = None,
+            class_id: Optional[UUID] = None,
+            section_id: Optional[UUID] = None,
+            academic_year_id: Optional[UUID] = None,
+            name_prefix: Optional[str] = None
+    ):
+        """
+        Keyset page of column dicts ordered by id; fetches one extra row so callers can tell
+        if a next page exists
+        """
+        query = select(*Student.__table__.columns)
+        if class_id:
+            query = query.filter(Student.class_id == class_id)
+        if section_id:
+            query = query.filter(Student.section_id == section_id)
+        if academic_year_id:
+            query = query.filter(Student.academic_year_id == academic_year_id)
+        if name_prefix:
+            query = query.filter(Student.name.startswith(name_prefix, autoescape=True))
+        if after:
+            query = query.filter(Student.id > after)
+        result = await self.db.execute(query.order_by(Student.id).limit(limit + 1))
+        return [dict(row) for row in result.mappings()]
+
+    async def stream(
+            self,
+            academic_year_id: Optional[UUID] = None,
+            class_id: Optional[UUID] = None,
+            section_id: Optional[UUID] = None
+    ):
+        """Yield student rows in batches read through a server-side cursor"""
+        query = select(*Student.__table__.columns)
+        if academic_year_id:
+            query = query.filter(Student.academic_year_id == academic_year_id)
+        if class_id:
+            query = query.filter(Student.class_id == class_id)
+        if section_id:
+            query = query.filter(Student.section_id == section_id)
+        result = await self.db.stream(query.order_by(Student.id).execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for batch in result.mappings().partitions():
+            yield batch
@@ -0,0 +1,56 @@
+from typing import Dict, Iterable
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import TableVersion
+from utils.metrics import instrument_repository
+
+
+@instrument_repository
+class TableVersionRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_versions(self, table_names: Iterable[str]) -> Dict[str, int]:
+        result = await self.db.execute(
+            select(TableVersion.table_name, TableVersion.version)
+            .filter(TableVersion.table_name.in_(list(table_names)))
+        )
+        return {table_name: version for table_name, version in result.all()}
+
+    async def bump(self, *table_names: str) -> Dict[str, int]:
+        """
+        Increment the tables' versions without committing, so they land with the caller's write.
+        Call it last before the commit: each version row stays locked until then, and every write
+        to the table waits for it. Returns the new versions.
+        """
+        versions = {}
+        for table_name in table_names:
+            result = await self.db.execute(
+                update(TableVersion)
+                .where(TableVersion.table_name == table_name)
+                .values(version=TableVersion.version + 1)
+                .returning(TableVersion.version)
+                .execution_options(synchronize_session=False)
+            )
+            version = result.scalar_one_or_none()
+            if version is None:
+                await self.db.execute(insert(TableVersion).values(table_name=table_name, version=1))
+                version = 1
+            versions[table_name] = version
+        return versions
+
+    async def ensure(self, table_names: Iterable[str]):
+        """Create missing version rows, another worker starting at the same time may win the insert"""
+        missing = set(table_names) - set(await self.get_versions(table_names))
+        if not missing:
+            return
+        try:
+            await self.db.execute(
+                insert(TableVersion), [{"table_name": name, "version": 0} for name in sorted(missing)]
+            )
+            await self.db.flush()
+        except IntegrityError:
+            await self.db.rollback()
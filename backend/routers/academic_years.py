@@ -4,20 +4,21 @@ from auth.auth_model import User
 from auth.auth_service import current_active_user
 from services.academic_year_service import AcademicYearService
 from schemas import AcademicYearCreate, AcademicYearUpdate, AcademicYear
-from database import get_db
+from database import get_db, get_read_db
+from utils.etag import etag
 from uuid import UUID
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[AcademicYear])
-async def get_academic_years(db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get("/", response_model=list[AcademicYear], dependencies=[Depends(etag("academic_years"))])
+async def get_academic_years(db=Depends(get_read_db), user: User = Depends(current_active_user)):
     service = AcademicYearService(db)
     return await service.get_all_academic_years()
 
 
-@router.get("/{year_id}", response_model=AcademicYear)
-async def get_academic_year(year_id: UUID, db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get("/{year_id}", response_model=AcademicYear, dependencies=[Depends(etag("academic_years"))])
+async def get_academic_year(year_id: UUID, db=Depends(get_read_db), user: User = Depends(current_active_user)):
     service = AcademicYearService(db)
     return await service.get_academic_year_by_id(year_id)
 
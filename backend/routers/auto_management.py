@@ -1,17 +1,19 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Body
+from fastapi import APIRouter, Depends, Body, Response
 
 from auth.auth_model import User
 from auth.auth_service import current_active_user
-from database import get_db
+from database import get_db, get_read_db
+from utils.etag import etag
 
 from schemas import (
     AutoManagementCreate, AutoManagementUpdate, AutoManagementResponse,
-    AutoStudentMappingCreate, AutoStudentMappingResponse, AutoWithStudentsResponse
+    AutoStudentMappingCreate, AutoStudentMappingResponse, AutoWithStudentsResponse, AutoStudentBulkAssignResponse
 )
 from services.auto_management_service import AutoManagementService
+from utils.fast_json import FastJSONResponse
 
 router = APIRouter(
     prefix="/autos",
@@ -19,14 +21,17 @@ router = APIRouter(
 )
 
 
-@router.get("/", response_model=list[AutoManagementResponse])
-async def get_autos(user: User = Depends(current_active_user), db=Depends(get_db)):
+@router.get("/", response_model=list[AutoManagementResponse], dependencies=[Depends(etag("auto_management"))])
+async def get_autos(user: User = Depends(current_active_user), db=Depends(get_read_db)):
     service = AutoManagementService(db)
     return await service.get_all_autos()
 
 
-@router.get("/{auto_id}/students", response_model=AutoWithStudentsResponse)
-async def get_auto_with_students(auto_id: UUID, db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get(
+    "/{auto_id}/students", response_model=AutoWithStudentsResponse,
+    dependencies=[Depends(etag("auto_management", "auto_student_mapping"))]
+)
+async def get_auto_with_students(auto_id: UUID, db=Depends(get_read_db), user: User = Depends(current_active_user)):
     service = AutoManagementService(db)
     return await service.get_auto_with_students(auto_id)
 
@@ -57,22 +62,26 @@ async def assign_student(mapping: AutoStudentMappingCreate, db=Depends(get_db),
     return await service.assign_student(mapping)
 
 
-@router.post("/{auto_id}/assign-students")
+@router.post("/{auto_id}/assign-students", response_model=AutoStudentBulkAssignResponse)
 async def assign_students_bulk(
         auto_id: UUID,
         student_ids: List[UUID] = Body(...),
         db=Depends(get_db),
         user: User = Depends(current_active_user)
 ):
-    """Assign multiple students to an auto"""
+    """Replace the students assigned to an auto, returning which students were added and removed"""
     service = AutoManagementService(db)
     return await service.assign_students_bulk(auto_id, student_ids)
 
 
-@router.get("/with-students", response_model=List[AutoWithStudentsResponse])
-async def get_all_autos_with_students(db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get(
+    "/with-students", response_model=List[AutoWithStudentsResponse],
+    dependencies=[Depends(etag("auto_management", "auto_student_mapping", "students", "classes", "sections"))]
+)
+async def get_all_autos_with_students(response: Response, db=Depends(get_read_db),
+                                      user: User = Depends(current_active_user)):
     """
     Get all autos with their student details and fees
     """
     service = AutoManagementService(db)
-    return await service.get_all_autos_with_students()
+    return FastJSONResponse(await service.get_all_autos_with_students(), headers=response.headers)
@@ -4,14 +4,15 @@ from auth.auth_model import User
 from auth.auth_service import current_active_user
 from services.class_service import ClassService
 from schemas import ClassCreate, ClassUpdate, ClassResponse
-from database import get_db
+from database import get_db, get_read_db
+from utils.etag import etag
 from uuid import UUID
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[ClassResponse])
-async def get_classes(db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get("/", response_model=list[ClassResponse], dependencies=[Depends(etag("classes"))])
+async def get_classes(db=Depends(get_read_db), user: User = Depends(current_active_user)):
     service = ClassService(db)
     return await service.get_all_classes()
 
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from auth.auth_model import User
 from auth.auth_service import current_active_user
 from services.dashboard_service import DashboardService
-from database import get_db
+from schemas import DashboardResponse, DASHBOARD_TOP_STUDENTS, MAX_PAGE_SIZE
+from database import get_read_db
+from utils.etag import etag
 
 router = APIRouter()
 
 
-@router.get("/")
-async def get_dashboard(db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get("/", response_model=DashboardResponse, dependencies=[Depends(etag("students", "fee_payments"))])
+async def get_dashboard(limit: int = Query(DASHBOARD_TOP_STUDENTS, ge=1, le=MAX_PAGE_SIZE), db=Depends(get_read_db),
+                        user: User = Depends(current_active_user)):
+    """
+    Dashboard totals plus the students with the largest outstanding balances
+    """
     service = DashboardService(db)
-    return await service.get_dashboard()
+    return await service.get_dashboard(limit)
@@ -1,19 +1,100 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from auth.auth_model import User
 from auth.auth_service import current_active_user
+from models import Month
+from services.export_service import ExportService
 from services.fee_payment_service import FeePaymentService
-from schemas import FeePaymentCreate, FeePaymentUpdate, FeePaymentResponse
-from database import get_db
+from schemas import (
+    FeePaymentCreate, FeePaymentUpdate, FeePaymentResponse, FeePaymentPage, ExportFormat, SortOrder,
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
+from database import get_db, get_read_db, read_session_maker_for
+from utils.etag import etag
+from utils.export import MEDIA_TYPES
+from utils.fast_json import FastJSONResponse
 from uuid import UUID
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[FeePaymentResponse])
-async def get_fee_payments(db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get("/", response_model=list[FeePaymentResponse], dependencies=[Depends(etag("fee_payments"))])
+async def get_fee_payments(response: Response, db=Depends(get_read_db), user: User = Depends(current_active_user)):
+    service = FeePaymentService(db)
+    return FastJSONResponse(await service.get_all_payments(), headers=response.headers)
+
+
+@router.get(
+    "/page", response_model=FeePaymentPage, dependencies=[Depends(etag("fee_payments", "students"))]
+)
+async def get_fee_payments_page(
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        order: SortOrder = SortOrder.desc,
+        student_id: Optional[UUID] = None,
+        class_id: Optional[UUID] = None,
+        section_id: Optional[UUID] = None,
+        academic_year_id: Optional[UUID] = None,
+        month: Optional[Month] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        db=Depends(get_read_db),
+        user: User = Depends(current_active_user)
+):
+    """
+    Keyset-paginated fee payments, newest first unless order=asc. Class, section and academic year
+    filter on the student's current placement, date_from and date_to on the transaction date, both
+    inclusive. Pass the returned next_cursor back as cursor, with the same filters and order, to
+    fetch the next page.
+    """
     service = FeePaymentService(db)
-    return await service.get_all_payments()
+    return FastJSONResponse(await service.get_payments_page(
+        limit,
+        cursor=cursor,
+        order=order,
+        student_id=student_id,
+        class_id=class_id,
+        section_id=section_id,
+        academic_year_id=academic_year_id,
+        month=month,
+        date_from=date_from,
+        date_to=date_to
+    ), headers=response.headers)
+
+
+@router.get("/export")
+async def export_fee_payments(
+        request: Request,
+        export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+        academic_year_id: Optional[UUID] = None,
+        class_id: Optional[UUID] = None,
+        month: Optional[Month] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        user: User = Depends(current_active_user)
+):
+    """
+    Stream fee payments as NDJSON or CSV, oldest first. date_from and date_to filter the
+    transaction date and are both inclusive.
+    """
+    service = ExportService(read_session_maker_for(request))
+    return StreamingResponse(
+        service.export_fee_payments(
+            export_format.value,
+            academic_year_id=academic_year_id,
+            class_id=class_id,
+            month=month,
+            date_from=date_from,
+            date_to=date_to
+        ),
+        media_type=MEDIA_TYPES[export_format.value],
+        headers={"Content-Disposition": f'attachment; filename="fee_payments.{export_format.value}"'}
+    )
 
 
 @router.post("/", response_model=FeePaymentResponse)
@@ -0,0 +1,59 @@
+import logging
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from database import engine, read_engine
+from utils.pool_metrics import pool_snapshot
+
+router = APIRouter()
+logger = logging.getLogger("school.health")
+
+
+def _pools():
+    pools = {"primary": pool_snapshot(engine)}
+    if read_engine is not engine:
+        pools["replica"] = pool_snapshot(read_engine)
+    return pools
+
+
+@router.get("/live")
+async def live():
+    """The process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    The databases answer a query through their pools, the pool states are included to spot saturation.
+    The route is public, so why a database is down goes to the log, not the response.
+    """
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception:
+        logger.exception("Readiness check: primary database unavailable")
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "database": "unavailable", "pools": _pools()}
+        )
+    if read_engine is not engine:
+        try:
+            async with read_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except Exception:
+            logger.exception("Readiness check: read replica unavailable")
+            return JSONResponse(
+                status_code=503,
+                content={"status": "unavailable", "database": "ok", "read_database": "unavailable",
+                         "pools": _pools()}
+            )
+    return {"status": "ready", "database": "ok", "pools": _pools()}
+
+
+@router.get("/pool")
+async def pool():
+    """Checked-out, idle and overflow connections plus checkout wait times of each pool in this worker"""
+    return _pools()
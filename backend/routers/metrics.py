@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from utils.metrics import metrics_response
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text format, unauthenticated like /health so the scraper needs no token"""
+    return metrics_response()
@@ -4,20 +4,24 @@ from auth.auth_model import User
 from auth.auth_service import current_active_user
 from services.section_service import SectionService
 from schemas import SectionCreate, SectionUpdate, SectionResponse
-from database import get_db
+from database import get_db, get_read_db
+from utils.etag import etag
 from uuid import UUID
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[SectionResponse])
-async def get_sections(db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get("/", response_model=list[SectionResponse], dependencies=[Depends(etag("sections"))])
+async def get_sections(db=Depends(get_read_db), user: User = Depends(current_active_user)):
     service = SectionService(db)
     return await service.get_all_sections()
 
 
-@router.get("/by-class/{class_id}", response_model=list[SectionResponse])
-async def get_sections_by_class_id(class_id: UUID, db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get(
+    "/by-class/{class_id}", response_model=list[SectionResponse],
+    dependencies=[Depends(etag("classes", "sections"))]
+)
+async def get_sections_by_class_id(class_id: UUID, db=Depends(get_read_db), user: User = Depends(current_active_user)):
     service = SectionService(db)
     return await service.get_sections_by_class_id(class_id)
 
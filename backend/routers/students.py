@@ -1,19 +1,109 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 
 from auth.auth_model import User
 from auth.auth_service import current_active_user
+from services.export_service import ExportService
+from services.student_import_service import StudentImportService
 from services.student_service import StudentService
-from schemas import StudentCreate, StudentUpdate, StudentResponse
-from database import get_db
+from schemas import (
+    StudentCreate, StudentUpdate, StudentResponse, StudentPage, FeeLedgerResponse, StudentImportReport,
+    ExportFormat, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
+from database import get_db, get_read_db, read_session_maker_for
+from utils.etag import etag
+from utils.export import MEDIA_TYPES
+from utils.fast_json import FastJSONResponse
+from utils.tabular_reader import detect_format, iter_rows
 from uuid import UUID
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[StudentResponse])
-async def get_students(db=Depends(get_db), user: User = Depends(current_active_user)):
+@router.get("/", response_model=list[StudentResponse], dependencies=[Depends(etag("students"))])
+async def get_students(response: Response, db=Depends(get_read_db), user: User = Depends(current_active_user)):
+    service = StudentService(db)
+    return FastJSONResponse(await service.get_all_students(), headers=response.headers)
+
+
+@router.get("/page", response_model=StudentPage, dependencies=[Depends(etag("students"))])
+async def get_students_page(
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[UUID] = None,
+        class_id: Optional[UUID] = None,
+        section_id: Optional[UUID] = None,
+        academic_year_id: Optional[UUID] = None,
+        name_prefix: Optional[str] = Query(None, min_length=1, max_length=100),
+        db=Depends(get_read_db),
+        user: User = Depends(current_active_user)
+):
+    """
+    Keyset-paginated student listing. Pass the returned next_cursor back as cursor to fetch the next page.
+    """
+    service = StudentService(db)
+    return FastJSONResponse(await service.get_students_page(
+        limit,
+        cursor=cursor,
+        class_id=class_id,
+        section_id=section_id,
+        academic_year_id=academic_year_id,
+        name_prefix=name_prefix
+    ), headers=response.headers)
+
+
+@router.get("/export")
+async def export_students(
+        request: Request,
+        export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+        academic_year_id: Optional[UUID] = None,
+        class_id: Optional[UUID] = None,
+        section_id: Optional[UUID] = None,
+        user: User = Depends(current_active_user)
+):
+    """
+    Stream students as NDJSON or CSV without loading the whole result set
+    """
+    service = ExportService(read_session_maker_for(request))
+    return StreamingResponse(
+        service.export_students(
+            export_format.value, academic_year_id=academic_year_id, class_id=class_id, section_id=section_id
+        ),
+        media_type=MEDIA_TYPES[export_format.value],
+        headers={"Content-Disposition": f'attachment; filename="students.{export_format.value}"'}
+    )
+
+
+@router.get("/by-class/{class_id}", response_model=StudentPage, dependencies=[Depends(etag("students"))])
+async def get_students_by_class(class_id: UUID, response: Response,
+                                limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                                cursor: Optional[UUID] = None, db=Depends(get_read_db),
+                                user: User = Depends(current_active_user)):
     service = StudentService(db)
-    return await service.get_all_students()
+    return FastJSONResponse(await service.get_students_by_class(class_id, limit, cursor), headers=response.headers)
+
+
+@router.get("/by-section/{section_id}", response_model=StudentPage, dependencies=[Depends(etag("students"))])
+async def get_students_by_section(section_id: UUID, response: Response,
+                                  limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+                                  cursor: Optional[UUID] = None, db=Depends(get_read_db),
+                                  user: User = Depends(current_active_user)):
+    service = StudentService(db)
+    return FastJSONResponse(await service.get_students_by_section(section_id, limit, cursor), headers=response.headers)
+
+
+@router.get(
+    "/{student_id}/ledger", response_model=FeeLedgerResponse,
+    dependencies=[Depends(etag("students", "fee_payments"))]
+)
+async def get_student_ledger(student_id: UUID, db=Depends(get_read_db), user: User = Depends(current_active_user)):
+    """
+    Expected, paid and outstanding fees of a student
+    """
+    service = StudentService(db)
+    return await service.get_student_ledger(student_id)
 
 
 @router.post("/", response_model=StudentResponse)
@@ -22,6 +112,18 @@ async def create_student(student: StudentCreate, db=Depends(get_db), user: User
     return await service.create_student(student)
 
 
+@router.post("/import", response_model=StudentImportReport)
+async def import_students(file: UploadFile = File(...), db=Depends(get_db),
+                          user: User = Depends(current_active_user)):
+    """
+    Bulk import students from a .csv or .xlsx file with a header row. Columns are the student fields
+    plus academic_year, class_name and section_name. Returns the rows that could not be imported.
+    """
+    file_format = detect_format(file.filename)
+    service = StudentImportService(db)
+    return await service.import_rows(iter_rows(file.file, file_format))
+
+
 @router.put("/{student_id}", response_model=StudentResponse)
 async def update_student(student_id: UUID, student: StudentUpdate, db=Depends(get_db),
                          user: User = Depends(current_active_user)):
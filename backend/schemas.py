@@ -1,3 +1,4 @@
+import enum
 import re
 from datetime import datetime
 from decimal import Decimal
@@ -10,6 +11,20 @@ from pydantic import BaseModel, Field, validator
 
 from models import Month
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+DASHBOARD_TOP_STUDENTS = 100
+
+
+class ExportFormat(str, enum.Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class SortOrder(str, enum.Enum):
+    asc = "asc"
+    desc = "desc"
+
 
 # Base Models
 class AcademicYearBase(BaseModel):
@@ -92,6 +107,11 @@ class StudentResponse(StudentBase):
         orm_mode = True
 
 
+class StudentPage(BaseModel):
+    items: List[StudentResponse]
+    next_cursor: Optional[UUID] = None
+
+
 class ClassBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=50)
 
@@ -155,7 +175,8 @@ class FeePaymentUpdate(BaseModel):
 
 class FeePaymentResponse(FeePaymentBase):
     id: UUID
-    student_id: UUID
+    # None once the student is deleted, the payment itself is kept
+    student_id: Optional[UUID]
     total_amount: Decimal
     transaction_date: datetime
 
@@ -163,9 +184,40 @@ class FeePaymentResponse(FeePaymentBase):
         orm_mode = True
 
 
+class FeePaymentPage(BaseModel):
+    items: List[FeePaymentResponse]
+    next_cursor: Optional[str] = None
+
+
+class StudentImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+
+class StudentImportReport(BaseModel):
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[StudentImportRowError]
+    errors_truncated: bool
+
+
+class FeeLedgerResponse(BaseModel):
+    student_id: UUID
+    academic_year_id: Optional[UUID]
+    expected_amount: Decimal
+    paid_amount: Decimal
+    balance: Decimal
+    last_payment_date: Optional[datetime]
+
+    class Config:
+        orm_mode = True
+
+
 class StudentPaymentInfo(BaseModel):
     id: UUID
     name: str
+    total_expected: Decimal
     total_paid: Decimal
     total_balance: Decimal
     payment_status: str
@@ -256,6 +308,14 @@ class AutoStudentBulkAssignRequest(BaseModel):
     student_ids: List[UUID]
 
 
+class AutoStudentBulkAssignResponse(BaseModel):
+    auto_id: UUID
+    assigned_students: int
+    student_ids: List[UUID]
+    added_student_ids: List[UUID]
+    removed_student_ids: List[UUID]
+
+
 class AutoWithStudentsListResponse(BaseModel):
     autos: List[AutoWithStudentsResponse]
 
@@ -1,15 +1,18 @@
 from fastapi import HTTPException
 from repositories.academic_year_repository import AcademicYearRepository
 from schemas import AcademicYearCreate, AcademicYearUpdate
+from services.reference_data_cache import reference_data
+from utils.unit_of_work import unit_of_work
 from uuid import UUID
 
 
 class AcademicYearService:
     def __init__(self, db):
+        self.db = db
         self.academic_year_repo = AcademicYearRepository(db)
 
     async def get_all_academic_years(self):
-        all_years = await self.academic_year_repo.get_all()
+        all_years = await reference_data.get(self.db, "academic_years")
         active_years = [year for year in all_years if year.is_active]
         return active_years
 
@@ -20,24 +23,43 @@ class AcademicYearService:
         return academic_year
 
     async def create_academic_year(self, academic_year: AcademicYearCreate):
-        return await self.academic_year_repo.create(academic_year)
+        async with unit_of_work(self.db):
+            created_year = await self.academic_year_repo.create(academic_year)
+            versions = await reference_data.bump(self.db, "academic_years")
+        reference_data.invalidate(versions)
+        return created_year
 
     async def update_academic_year(self, year_id: UUID, academic_year: AcademicYearUpdate):
-        updated_year = await self.academic_year_repo.update(year_id, academic_year)
-        if not updated_year:
-            raise HTTPException(status_code=404, detail="Academic year not found")
+        async with unit_of_work(self.db):
+            updated_year = await self.academic_year_repo.update(year_id, academic_year)
+            if not updated_year:
+                raise HTTPException(status_code=404, detail="Academic year not found")
+            versions = await reference_data.bump(self.db, "academic_years")
+        reference_data.invalidate(versions)
         return updated_year
 
     async def delete_academic_year(self, year_id: UUID):
-        deleted_year = await self.academic_year_repo.delete(year_id)
-        if not deleted_year:
-            raise HTTPException(status_code=404, detail="Academic year not found")
+        # Deleting a year detaches its classes and students
+        async with unit_of_work(self.db):
+            deleted_year = await self.academic_year_repo.delete(year_id)
+            if not deleted_year:
+                raise HTTPException(status_code=404, detail="Academic year not found")
+            versions = await reference_data.bump(self.db, "academic_years", "classes", "students")
+        reference_data.invalidate(versions)
         return {"message": "Academic year deleted"}
 
     async def activate_academic_year(self, year_id: UUID):
         """Activate an academic year and deactivate others"""
-        return await self.academic_year_repo.activate_year(year_id)
+        async with unit_of_work(self.db):
+            activated_year = await self.academic_year_repo.activate_year(year_id)
+            versions = await reference_data.bump(self.db, "academic_years")
+        reference_data.invalidate(versions)
+        return activated_year
 
     async def deactivate_academic_year(self, year_id: UUID):
         """Deactivate an academic year"""
-        return await self.academic_year_repo.deactivate_year(year_id)
+        async with unit_of_work(self.db):
+            deactivated_year = await self.academic_year_repo.deactivate_year(year_id)
+            versions = await reference_data.bump(self.db, "academic_years")
+        reference_data.invalidate(versions)
+        return deactivated_year
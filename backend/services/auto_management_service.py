@@ -1,20 +1,20 @@
 from fastapi import HTTPException
 from repositories.auto_management_repository import AutoManagementRepository, AutoStudentMappingRepository
 from repositories.student_repository import StudentRepository
-from repositories.class_repository import ClassRepository
-from repositories.section_repository import SectionRepository
+from repositories.table_version_repository import TableVersionRepository
 from schemas import AutoManagementCreate, AutoManagementUpdate, AutoStudentMappingCreate
+from utils.unit_of_work import unit_of_work
 from typing import List
 from uuid import UUID
 
 
 class AutoManagementService:
     def __init__(self, db):
+        self.db = db
         self.auto_repo = AutoManagementRepository(db)
         self.mapping_repo = AutoStudentMappingRepository(db)
         self.student_repo = StudentRepository(db)
-        self.class_repo = ClassRepository(db)
-        self.section_repo = SectionRepository(db)
+        self.versions = TableVersionRepository(db)
 
     async def get_all_autos(self):
         return await self.auto_repo.get_all()
@@ -31,18 +31,26 @@ class AutoManagementService:
         }
 
     async def create_auto(self, auto: AutoManagementCreate):
-        return await self.auto_repo.create(auto)
+        async with unit_of_work(self.db):
+            created_auto = await self.auto_repo.create(auto)
+            await self.versions.bump("auto_management")
+        return created_auto
 
     async def update_auto(self, auto_id, auto: AutoManagementUpdate):
-        updated_auto = await self.auto_repo.update(auto_id, auto)
-        if not updated_auto:
-            raise HTTPException(status_code=404, detail="Auto not found")
+        async with unit_of_work(self.db):
+            updated_auto = await self.auto_repo.update(auto_id, auto)
+            if not updated_auto:
+                raise HTTPException(status_code=404, detail="Auto not found")
+            await self.versions.bump("auto_management")
         return updated_auto
 
     async def delete_auto(self, auto_id: UUID):
         """Delete an auto and all its student mappings"""
         try:
-            return await self.auto_repo.delete_auto(auto_id)
+            async with unit_of_work(self.db):
+                deleted = await self.auto_repo.delete_auto(auto_id)
+                await self.versions.bump("auto_management", "auto_student_mapping")
+            return deleted
         except HTTPException as e:
             raise e
         except Exception as e:
@@ -53,7 +61,10 @@ class AutoManagementService:
             raise HTTPException(status_code=404, detail="Auto not found")
         if not await self.student_repo.get_by_id(mapping.student_id):
             raise HTTPException(status_code=404, detail="Student not found")
-        return await self.mapping_repo.create(mapping)
+        async with unit_of_work(self.db):
+            created_mapping = await self.mapping_repo.create(mapping)
+            await self.versions.bump("auto_student_mapping")
+        return created_mapping
 
     async def assign_students_bulk(self, auto_id: UUID, student_ids: List[UUID]):
         # Verify auto exists
@@ -61,66 +72,57 @@ class AutoManagementService:
         if not auto:
             raise HTTPException(status_code=404, detail="Auto not found")
 
-        # Verify all students exist
-        for student_id in student_ids:
-            if not await self.student_repo.get_by_id(student_id):
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Student with id {student_id} not found"
-                )
-
-        # Remove existing mappings for this auto
-        await self.mapping_repo.delete_by_auto(auto_id)
-
-        # Create new mappings
-        mappings = []
-        for student_id in student_ids:
-            mapping = AutoStudentMappingCreate(
-                auto_id=auto_id,
-                student_id=student_id
+        # Verify all students exist with one query
+        student_ids = list(dict.fromkeys(student_ids))
+        existing_ids = await self.student_repo.get_existing_ids(student_ids)
+        missing_ids = [student_id for student_id in student_ids if student_id not in existing_ids]
+        if len(missing_ids) == 1:
+            raise HTTPException(status_code=404, detail=f"Student with id {missing_ids[0]} not found")
+        if missing_ids:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Students with ids {', '.join(str(student_id) for student_id in missing_ids)} not found"
             )
-            mappings.append(await self.mapping_repo.create(mapping))
+
+        async with unit_of_work(self.db):
+            added, removed = await self.mapping_repo.replace_students(auto_id, student_ids)
+            await self.versions.bump("auto_student_mapping")
 
         return {
             "auto_id": auto_id,
-            "assigned_students": len(mappings),
-            "student_ids": student_ids
+            "assigned_students": len(student_ids),
+            "student_ids": student_ids,
+            "added_student_ids": added,
+            "removed_student_ids": removed
         }
 
     async def get_all_autos_with_students(self):
         """Get all autos with their mapped students and fees"""
-        autos = await self.auto_repo.get_all()
-        result = []
-
-        for auto in autos:
-            mappings = await self.mapping_repo.get_by_auto_id(auto.id)
-            total_fees = 0
-            student_details = []
-
-            for mapping in mappings:
-                student = await self.student_repo.get_by_id(mapping.student_id)
-                if student:
-                    class_info = await self.class_repo.get_by_id(student.class_id) if student.class_id else None
-                    section_info = await self.section_repo.get_by_id(student.section_id) if student.section_id else None
-
-                    student_details.append({
-                        "id": student.id,
-                        "name": student.name,
-                        "roll_number": student.roll_number,
-                        "class_name": class_info.name if class_info else "Unassigned",
-                        "section_name": section_info.name if section_info else "Unassigned",
-                        "contact_number": student.contact,
-                        "address": student.address,
-                        "auto_fees": float(student.auto_fees or 0)
-                    })
-                    total_fees += student.auto_fees or 0
-
-            result.append({
-                "id": auto.id,
-                "name": auto.name,
-                "students": [mapping.student_id for mapping in mappings],
-                "total_fees": float(total_fees),
-                "student_details": student_details
-            })
-
-        return result
\ No newline at end of file
+        autos = {}
+        for row in await self.auto_repo.get_all_with_students():
+            auto = autos.get(row.auto_id)
+            if auto is None:
+                auto = autos[row.auto_id] = {
+                    "id": row.auto_id,
+                    "name": row.auto_name,
+                    "students": [],
+                    "total_fees": float(row.total_fees),
+                    "student_details": []
+                }
+            if row.mapped_student_id is None:
+                continue
+
+            auto["students"].append(row.mapped_student_id)
+            if row.student_id:
+                auto["student_details"].append({
+                    "id": row.student_id,
+                    "name": row.student_name,
+                    "roll_number": row.roll_number,
+                    "class_name": row.class_name or "Unassigned",
+                    "section_name": row.section_name or "Unassigned",
+                    "contact_number": row.contact,
+                    "address": row.address,
+                    "auto_fees": float(row.auto_fees or 0)
+                })
+
+        return list(autos.values())
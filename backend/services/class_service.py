@@ -1,17 +1,18 @@
 from uuid import UUID
 from fastapi import HTTPException
-from repositories.academic_year_repository import AcademicYearRepository
 from repositories.class_repository import ClassRepository
 from schemas import ClassCreate, ClassUpdate
+from services.reference_data_cache import reference_data
+from utils.unit_of_work import unit_of_work
 
 
 class ClassService:
     def __init__(self, db):
+        self.db = db
         self.class_repo = ClassRepository(db)
-        self.academic_year_repo = AcademicYearRepository(db)
 
     async def get_all_classes(self):
-        return await self.class_repo.get_all()
+        return await reference_data.get(self.db, "classes")
 
     async def get_class(self, class_id: UUID):
         class_ = await self.class_repo.get_by_id(class_id)
@@ -20,32 +21,27 @@ class ClassService:
         return class_
 
     async def create_class(self, class_: ClassCreate):
-        # Validate academic year exists
-        academic_year = await self.academic_year_repo.get_by_id(class_.academic_year_id)
-        if not academic_year:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid academic_year_id: Academic year does not exist"
-            )
-        return await self.class_repo.create(class_)
+        async with unit_of_work(self.db):
+            created_class = await self.class_repo.create(class_)
+            versions = await reference_data.bump(self.db, "classes")
+        reference_data.invalidate(versions)
+        return created_class
 
     async def update_class(self, class_id: UUID, class_: ClassUpdate):
-        # Validate academic year if provided
-        if class_.academic_year_id:
-            academic_year = await self.academic_year_repo.get_by_id(class_.academic_year_id)
-            if not academic_year:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Invalid academic_year_id: Academic year does not exist"
-                )
-
-        updated_class = await self.class_repo.update(class_id, class_)
-        if not updated_class:
-            raise HTTPException(status_code=404, detail="Class not found")
+        async with unit_of_work(self.db):
+            updated_class = await self.class_repo.update(class_id, class_)
+            if not updated_class:
+                raise HTTPException(status_code=404, detail="Class not found")
+            versions = await reference_data.bump(self.db, "classes")
+        reference_data.invalidate(versions)
         return updated_class
 
     async def delete_class(self, class_id: UUID):
-        deleted_class = await self.class_repo.delete(class_id)
-        if not deleted_class:
-            raise HTTPException(status_code=404, detail="Class not found")
+        # Deleting a class detaches its sections and students
+        async with unit_of_work(self.db):
+            deleted_class = await self.class_repo.delete(class_id)
+            if not deleted_class:
+                raise HTTPException(status_code=404, detail="Class not found")
+            versions = await reference_data.bump(self.db, "classes", "sections", "students")
+        reference_data.invalidate(versions)
         return deleted_class
\ No newline at end of file
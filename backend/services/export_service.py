@@ -0,0 +1,31 @@
+from database import read_session_maker
+from repositories.fee_payment_repository import FeePaymentRepository
+from repositories.student_repository import StudentRepository
+from schemas import FeePaymentResponse, StudentResponse
+from utils.export import encode_rows
+
+# The response schemas' fields, id first
+STUDENT_EXPORT_COLUMNS = ["id"] + [field for field in StudentResponse.__fields__ if field != "id"]
+FEE_PAYMENT_EXPORT_COLUMNS = ["id"] + [field for field in FeePaymentResponse.__fields__ if field != "id"]
+
+
+class ExportService:
+    """
+    Streams exports batch by batch. Each export opens its own session because a streamed
+    body is still being sent after the request's get_db session has been closed.
+    """
+
+    def __init__(self, session_maker=read_session_maker):
+        self.session_maker = session_maker
+
+    async def export_students(self, export_format: str, **filters):
+        async with self.session_maker() as db:
+            batches = StudentRepository(db).stream(**filters)
+            async for chunk in encode_rows(batches, export_format, STUDENT_EXPORT_COLUMNS):
+                yield chunk
+
+    async def export_fee_payments(self, export_format: str, **filters):
+        async with self.session_maker() as db:
+            batches = FeePaymentRepository(db).stream(**filters)
+            async for chunk in encode_rows(batches, export_format, FEE_PAYMENT_EXPORT_COLUMNS):
+                yield chunk
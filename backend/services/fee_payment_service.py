@@ -1,20 +1,59 @@
+import base64
+from datetime import date, datetime
+from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException
 
+from models import Month
 from repositories.fee_payment_repository import FeePaymentRepository
-from repositories.student_repository import StudentRepository
-from schemas import FeePaymentCreate, FeePaymentUpdate
+from repositories.table_version_repository import TableVersionRepository
+from schemas import FeePaymentCreate, FeePaymentUpdate, SortOrder
+from utils.metrics import fee_payment_amount, fee_payments_created
+from utils.unit_of_work import unit_of_work
 
 
 class FeePaymentService:
     def __init__(self, db):
+        self.db = db
         self.payment_repo = FeePaymentRepository(db)
-        self.student_repo = StudentRepository(db)
+        self.versions = TableVersionRepository(db)
 
     async def get_all_payments(self):
         return await self.payment_repo.get_all()
 
+    async def get_payments_page(
+            self,
+            limit: int,
+            cursor: Optional[str] = None,
+            order: SortOrder = SortOrder.desc,
+            student_id: Optional[UUID] = None,
+            class_id: Optional[UUID] = None,
+            section_id: Optional[UUID] = None,
+            academic_year_id: Optional[UUID] = None,
+            month: Optional[Month] = None,
+            date_from: Optional[date] = None,
+            date_to: Optional[date] = None
+    ):
+        payments = await self.payment_repo.get_page(
+            limit,
+            after=_decode_cursor(cursor) if cursor else None,
+            descending=order == SortOrder.desc,
+            student_id=student_id,
+            class_id=class_id,
+            section_id=section_id,
+            academic_year_id=academic_year_id,
+            month=month,
+            date_from=date_from,
+            date_to=date_to
+        )
+        has_more = len(payments) > limit
+        payments = payments[:limit]
+        return {
+            "items": payments,
+            "next_cursor": _encode_cursor(payments[-1]) if has_more else None
+        }
+
     async def get_payment_by_id(self, payment_id: UUID):
         payment = await self.payment_repo.get_by_id(payment_id)
         if not payment:
@@ -22,20 +61,39 @@ class FeePaymentService:
         return payment
 
     async def create_payment(self, payment: FeePaymentCreate):
-        if not await self.student_repo.get_by_id(payment.student_id):
-            raise HTTPException(status_code=400, detail="Invalid student_id: Student does not exist")
-        return await self.payment_repo.create(payment)
+        async with unit_of_work(self.db):
+            created_payment = await self.payment_repo.create(payment)
+            await self.versions.bump("fee_payments")
+        fee_payments_created.inc()
+        fee_payment_amount.inc(float(created_payment.total_amount))
+        return created_payment
 
     async def update_payment(self, payment_id: UUID, payment: FeePaymentUpdate):
-        if payment.student_id and not await self.student_repo.get_by_id(payment.student_id):
-            raise HTTPException(status_code=400, detail="Invalid student_id: Student does not exist")
-        updated_payment = await self.payment_repo.update(payment_id, payment)
-        if not updated_payment:
-            raise HTTPException(status_code=404, detail="Fee payment not found")
+        async with unit_of_work(self.db):
+            updated_payment = await self.payment_repo.update(payment_id, payment)
+            if not updated_payment:
+                raise HTTPException(status_code=404, detail="Fee payment not found")
+            await self.versions.bump("fee_payments")
         return updated_payment
 
     async def delete_payment(self, payment_id: UUID):
-        deleted_payment = await self.payment_repo.delete(payment_id)
-        if not deleted_payment:
-            raise HTTPException(status_code=404, detail="Fee payment not found")
-        return {"message": "Fee payment deleted"}
\ No newline at end of file
+        async with unit_of_work(self.db):
+            deleted_payment = await self.payment_repo.delete(payment_id)
+            if not deleted_payment:
+                raise HTTPException(status_code=404, detail="Fee payment not found")
+            await self.versions.bump("fee_payments")
+        return {"message": "Fee payment deleted"}
+
+
+def _encode_cursor(payment: dict) -> str:
+    """The (transaction_date, id) key of the last payment on a page, opaque to clients"""
+    key = f"{payment['transaction_date'].isoformat()}|{payment['id']}"
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        transaction_date, payment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(transaction_date), UUID(payment_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,92 @@
+import time
+from typing import Dict, List, Tuple
+
+import config
+from repositories.academic_year_repository import AcademicYearRepository
+from repositories.class_repository import ClassRepository
+from repositories.section_repository import SectionRepository
+from repositories.table_version_repository import TableVersionRepository
+from schemas import AcademicYear, ClassResponse, SectionResponse
+from utils.unit_of_work import unit_of_work
+
+# table name -> (repository, response schema the rows are cached as)
+REFERENCE_TABLES = {
+    "academic_years": (AcademicYearRepository, AcademicYear),
+    "classes": (ClassRepository, ClassResponse),
+    "sections": (SectionRepository, SectionResponse),
+}
+
+
+class ReferenceDataCache:
+    """
+    Per-process copy of the small reference tables, served to every list request.
+
+    Each copy remembers the table_versions value it was loaded at. A worker that writes drops
+    its copy right away, the others notice the bumped version within check_interval seconds.
+    Rows are cached as response schemas, so no ORM instance is shared between requests.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._tables: Dict[str, Tuple[int, List]] = {}
+        # Version a write of this worker committed, copies loaded at an older one (say from a
+        # lagging replica) are served once but not kept
+        self._min_versions: Dict[str, int] = {}
+        self._checked_at = 0.0
+
+    async def get(self, db, table_name: str) -> List:
+        if self.check_interval <= 0:
+            return await self._load_rows(db, table_name)
+        await self._drop_stale(db)
+        cached = self._tables.get(table_name)
+        if cached is not None:
+            return cached[1]
+
+        versions = await TableVersionRepository(db).get_versions([table_name])
+        version = versions.get(table_name, 0)
+        rows = await self._load_rows(db, table_name)
+        if version >= self._min_versions.get(table_name, 0):
+            self._tables[table_name] = (version, rows)
+        return rows
+
+    async def bump(self, db, *table_names: str) -> Dict[str, int]:
+        """
+        Bump the tables' versions inside the caller's transaction, as its last statement before the commit.
+        Pass the result to invalidate once the write has committed.
+        """
+        return await TableVersionRepository(db).bump(*table_names)
+
+    def invalidate(self, versions: Dict[str, int]):
+        for table_name, version in versions.items():
+            self._min_versions[table_name] = max(version, self._min_versions.get(table_name, 0))
+            self._tables.pop(table_name, None)
+
+    def clear(self):
+        self._tables.clear()
+        self._min_versions.clear()
+        self._checked_at = 0.0
+
+    async def warm(self, db):
+        self.clear()
+        async with unit_of_work(db):
+            await TableVersionRepository(db).ensure(REFERENCE_TABLES)
+        for table_name in REFERENCE_TABLES:
+            await self.get(db, table_name)
+
+    async def _drop_stale(self, db):
+        now = time.monotonic()
+        if not self._tables or now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        versions = await TableVersionRepository(db).get_versions(self._tables)
+        for table_name, (version, _) in list(self._tables.items()):
+            if versions.get(table_name, 0) != version:
+                del self._tables[table_name]
+
+    @staticmethod
+    async def _load_rows(db, table_name: str) -> List:
+        repository, schema = REFERENCE_TABLES[table_name]
+        return [schema.model_validate(row, from_attributes=True) for row in await repository(db).get_all()]
+
+
+reference_data = ReferenceDataCache(config.REFERENCE_CACHE_CHECK_SECONDS)
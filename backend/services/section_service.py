@@ -1,24 +1,26 @@
 from fastapi import HTTPException
-from repositories.class_repository import ClassRepository
 from repositories.section_repository import SectionRepository
 from schemas import SectionCreate, SectionUpdate
+from services.reference_data_cache import reference_data
+from utils.unit_of_work import unit_of_work
 from uuid import UUID
 
 
 class SectionService:
     def __init__(self, db):
+        self.db = db
         self.section_repo = SectionRepository(db)
-        self.class_repo = ClassRepository(db)
 
     async def get_all_sections(self):
-        return await self.section_repo.get_all()
+        return await reference_data.get(self.db, "sections")
 
     async def get_sections_by_class_id(self, class_id: UUID):
         # First validate if class exists
-        class_exists = await self.class_repo.get_by_id(class_id)
-        if not class_exists:
+        classes = await reference_data.get(self.db, "classes")
+        if not any(class_.id == class_id for class_ in classes):
             raise HTTPException(status_code=404, detail=f"Class with id {class_id} not found")
-        return await self.section_repo.get_sections_by_class_id(class_id)
+        sections = await reference_data.get(self.db, "sections")
+        return [section for section in sections if section.class_id == class_id]
 
     async def get_section_by_id(self, section_id: UUID):
         section = await self.section_repo.get_by_id(section_id)
@@ -27,32 +29,27 @@ class SectionService:
         return section
 
     async def create_section(self, section: SectionCreate):
-        # Validate if class exists
-        class_exists = await self.class_repo.get_by_id(section.class_id)
-        if not class_exists:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid class_id: Class with id {section.class_id} does not exist"
-            )
-        return await self.section_repo.create(section)
+        async with unit_of_work(self.db):
+            created_section = await self.section_repo.create(section)
+            versions = await reference_data.bump(self.db, "sections")
+        reference_data.invalidate(versions)
+        return created_section
 
     async def update_section(self, section_id: UUID, section: SectionUpdate):
-        # If class_id is being updated, validate if new class exists
-        if section.class_id:
-            class_exists = await self.class_repo.get_by_id(section.class_id)
-            if not class_exists:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid class_id: Class with id {section.class_id} does not exist"
-                )
-
-        updated_section = await self.section_repo.update(section_id, section)
-        if not updated_section:
-            raise HTTPException(status_code=404, detail="Section not found")
+        async with unit_of_work(self.db):
+            updated_section = await self.section_repo.update(section_id, section)
+            if not updated_section:
+                raise HTTPException(status_code=404, detail="Section not found")
+            versions = await reference_data.bump(self.db, "sections")
+        reference_data.invalidate(versions)
         return updated_section
 
     async def delete_section(self, section_id: UUID):
-        deleted_section = await self.section_repo.delete(section_id)
-        if not deleted_section:
-            raise HTTPException(status_code=404, detail="Section not found")
+        # Deleting a section detaches its students
+        async with unit_of_work(self.db):
+            deleted_section = await self.section_repo.delete(section_id)
+            if not deleted_section:
+                raise HTTPException(status_code=404, detail="Section not found")
+            versions = await reference_data.bump(self.db, "sections", "students")
+        reference_data.invalidate(versions)
         return {"message": "Section deleted"}
\ No newline at end of file
@@ -0,0 +1,120 @@
+from itertools import islice
+from typing import Dict, Iterable, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from repositories.section_repository import SectionRepository
+from repositories.student_repository import StudentRepository
+from repositories.table_version_repository import TableVersionRepository
+from schemas import StudentCreate, StudentBase
+from utils.metrics import students_created
+from utils.unit_of_work import unit_of_work
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+STUDENT_COLUMNS = list(StudentBase.__fields__)
+
+
+class StudentImportService:
+    """
+    Imports students from spreadsheet rows. Rows name their academic year, class and section
+    (academic_year, class_name, section_name columns) and carry the StudentCreate fields.
+    Rows are handled in chunks that are validated, resolved and inserted together, so memory
+    stays flat for any number of rows and a bad row only fails itself. Rows are parsed in a
+    worker thread, reading a large upload doesn't hold up other requests.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.student_repo = StudentRepository(db)
+        self.section_repo = SectionRepository(db)
+        self.versions = TableVersionRepository(db)
+
+    async def import_rows(self, rows: Iterable[Tuple[int, Dict[str, str]]]):
+        report = {"total_rows": 0, "imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+        rows = iter(rows)
+        while chunk := await run_in_threadpool(lambda: list(islice(rows, IMPORT_CHUNK_SIZE))):
+            report["total_rows"] += len(chunk)
+            students, errors = await self._prepare_chunk(chunk)
+            if students:
+                try:
+                    imported = await self._insert([student for _, student in students])
+                except HTTPException:
+                    # A row the checks let through, say a roll number taken meanwhile. Retry the
+                    # rows one by one so only the failing ones are reported
+                    imported = 0
+                    for row_number, student in students:
+                        try:
+                            imported += await self._insert([student])
+                        except HTTPException as e:
+                            errors.append((row_number, [e.detail]))
+                report["imported"] += imported
+                students_created.inc(imported)
+
+            report["failed"] += len(errors)
+            for row_number, messages in sorted(errors):
+                if len(report["errors"]) >= MAX_REPORTED_ERRORS:
+                    report["errors_truncated"] = True
+                    break
+                report["errors"].append({"row": row_number, "errors": messages})
+        return report
+
+    async def _insert(self, students):
+        # Commits on its own, a failed chunk doesn't undo the ones before it
+        async with unit_of_work(self.db):
+            imported = await self.student_repo.bulk_create(students)
+            await self.versions.bump("students")
+        return imported
+
+    async def _prepare_chunk(self, chunk):
+        """Validate a chunk of rows, returning ([(row_number, StudentCreate)], [(row_number, [errors])])"""
+        ids_by_names = await self.section_repo.get_ids_by_names(
+            {row.get("academic_year", "") for _, row in chunk},
+            {row.get("class_name", "") for _, row in chunk},
+            {row.get("section_name", "") for _, row in chunk}
+        )
+
+        candidates, errors = [], []
+        for row_number, row in chunk:
+            names = (row.get("academic_year", ""), row.get("class_name", ""), row.get("section_name", ""))
+            ids = ids_by_names.get(names)
+            if not ids:
+                errors.append((row_number, [
+                    f"Unknown academic year / class / section: {' / '.join(name or '?' for name in names)}"
+                ]))
+                continue
+
+            academic_year_id, class_id, section_id = ids
+            try:
+                student = StudentCreate(
+                    **{column: row[column] for column in STUDENT_COLUMNS if row.get(column)},
+                    class_id=class_id,
+                    section_id=section_id,
+                    academic_year_id=academic_year_id
+                )
+            except ValidationError as e:
+                errors.append((row_number, [
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                ]))
+                continue
+            candidates.append((row_number, student))
+
+        # Roll numbers must be unique within a class, both against the database and inside the file
+        taken = await self.student_repo.get_taken_roll_numbers(
+            {student.class_id for _, student in candidates if student.roll_number},
+            {student.roll_number for _, student in candidates if student.roll_number}
+        )
+        students = []
+        for row_number, student in candidates:
+            if student.roll_number:
+                key = (student.class_id, student.roll_number)
+                if key in taken:
+                    errors.append((row_number, [
+                        f"Student with roll number '{student.roll_number}' already exists in this class"
+                    ]))
+                    continue
+                taken.add(key)
+            students.append((row_number, student))
+        return students, errors
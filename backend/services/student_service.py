@@ -1,19 +1,27 @@
 from decimal import Decimal
+from typing import Optional
 from uuid import UUID
 
 from fastapi import HTTPException
 
 from repositories.class_repository import ClassRepository
+from repositories.fee_ledger_repository import FeeLedgerRepository
 from repositories.section_repository import SectionRepository
 from repositories.student_repository import StudentRepository
+from repositories.table_version_repository import TableVersionRepository
 from schemas import StudentCreate, StudentUpdate
+from utils.metrics import students_created
+from utils.unit_of_work import unit_of_work
 
 
 class StudentService:
     def __init__(self, db):
+        self.db = db
         self.student_repo = StudentRepository(db)
         self.class_repo = ClassRepository(db)
         self.section_repo = SectionRepository(db)
+        self.ledger_repo = FeeLedgerRepository(db)
+        self.versions = TableVersionRepository(db)
 
     async def get_all_students(self):
         return await self.student_repo.get_all()
@@ -24,6 +32,12 @@ class StudentService:
             raise HTTPException(status_code=404, detail="Student not found")
         return student
 
+    async def get_student_ledger(self, student_id: UUID):
+        ledger = await self.ledger_repo.get_by_student(student_id)
+        if not ledger:
+            raise HTTPException(status_code=404, detail="Fee ledger not found for student")
+        return ledger
+
     async def create_student(self, student: StudentCreate):
         # Validate fees are non-negative
         if any(fee < Decimal('0.00') for fee in [
@@ -35,7 +49,11 @@ class StudentService:
                 status_code=400,
                 detail="Fees cannot be negative"
             )
-        return await self.student_repo.create(student)
+        async with unit_of_work(self.db):
+            created_student = await self.student_repo.create(student)
+            await self.versions.bump("students")
+        students_created.inc()
+        return created_student
 
     async def update_student(self, student_id: UUID, student: StudentUpdate):
         # Validate fees if provided
@@ -55,19 +73,48 @@ class StudentService:
                 detail="Day boarding fees cannot be negative"
             )
 
-        updated_student = await self.student_repo.update(student_id, student)
-        if not updated_student:
-            raise HTTPException(status_code=404, detail="Student not found")
+        async with unit_of_work(self.db):
+            updated_student = await self.student_repo.update(student_id, student)
+            if not updated_student:
+                raise HTTPException(status_code=404, detail="Student not found")
+            await self.versions.bump("students")
         return updated_student
 
     async def delete_student(self, student_id: UUID):
-        deleted_student = await self.student_repo.delete(student_id)
-        if not deleted_student:
-            raise HTTPException(status_code=404, detail="Student not found")
+        # The student's payments and auto mappings are detached along with it
+        async with unit_of_work(self.db):
+            deleted_student = await self.student_repo.delete(student_id)
+            if not deleted_student:
+                raise HTTPException(status_code=404, detail="Student not found")
+            await self.versions.bump("students", "fee_payments", "auto_student_mapping")
         return deleted_student
 
-    async def get_students_by_class(self, class_id: UUID):
-        return await self.student_repo.get_by_class(class_id)
+    async def get_students_page(
+            self,
+            limit: int,
+            cursor: Optional[UUID] = None,
+            class_id: Optional[UUID] = None,
+            section_id: Optional[UUID] = None,
+            academic_year_id: Optional[UUID] = None,
+            name_prefix: Optional[str] = None
+    ):
+        students = await self.student_repo.get_page(
+            limit,
+            after=cursor,
+            class_id=class_id,
+            section_id=section_id,
+            academic_year_id=academic_year_id,
+            name_prefix=name_prefix
+        )
+        has_more = len(students) > limit
+        students = students[:limit]
+        return {
+            "items": students,
+            "next_cursor": students[-1]["id"] if has_more else None
+        }
+
+    async def get_students_by_class(self, class_id: UUID, limit: int, cursor: Optional[UUID] = None):
+        return await self.get_students_page(limit, cursor=cursor, class_id=class_id)
 
-    async def get_students_by_section(self, section_id: UUID):
-        return await self.student_repo.get_by_section(section_id)
\ No newline at end of file
+    async def get_students_by_section(self, section_id: UUID, limit: int, cursor: Optional[UUID] = None):
+        return await self.get_students_page(limit, cursor=cursor, section_id=section_id)
\ No newline at end of file
@@ -0,0 +1,21 @@
+def test_cached_token_skips_user_lookup(client, auth_headers, query_counter):
+    assert client.get("/auth/admin-only", headers=auth_headers).status_code == 200
+
+    query_counter.count = 0
+    response = client.get("/auth/admin-only", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert query_counter.count == 0
+
+
+def test_user_update_invalidates_cached_token(client, auth_headers):
+    client.get("/auth/admin-only", headers=auth_headers)
+
+    response = client.patch("/auth/users/me", json={"email": "head@example.com"}, headers=auth_headers)
+    assert response.status_code == 200
+
+    assert client.get("/auth/admin-only", headers=auth_headers).json() == {"message": "Welcome, head@example.com!"}
+
+
+def test_invalid_token_is_rejected(client, auth_headers):
+    assert client.get("/auth/admin-only", headers={"Authorization": "Bearer not-a-jwt"}).status_code == 401
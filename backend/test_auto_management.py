@@ -0,0 +1,75 @@
+def assign_autos(client, students, autos, students_per_auto):
+    for auto_number in range(autos):
+        auto = client.post("/auto-management/autos/", json={"name": f"Auto {auto_number}"}).json()
+        assigned = students[auto_number * students_per_auto:(auto_number + 1) * students_per_auto]
+        response = client.post(
+            f"/auto-management/autos/{auto['id']}/assign-students",
+            json=[student["id"] for student in assigned],
+        )
+        assert response.status_code == 200, response.text
+
+
+def test_autos_with_students_details_and_fees(client, school):
+    students = school(classes=2, students_per_class=2)["students"]
+    assign_autos(client, students, autos=2, students_per_auto=2)
+    client.post("/auto-management/autos/", json={"name": "Empty auto"})
+
+    response = client.get("/auto-management/autos/with-students")
+
+    assert response.status_code == 200
+    autos = {auto["name"]: auto for auto in response.json()}
+    assert autos["Empty auto"]["students"] == []
+    assert autos["Empty auto"]["total_fees"] == 0
+    assert autos["Auto 0"]["total_fees"] == 600.0
+    assert {detail["class_name"] for detail in autos["Auto 1"]["student_details"]} == {"Class 2"}
+    assert sorted(autos["Auto 1"]["students"]) == sorted(student["id"] for student in students[2:])
+
+
+def test_autos_with_students_query_count_is_constant(client, school, query_counter):
+    students = school(classes=1, students_per_class=1)["students"]
+    assign_autos(client, students, autos=1, students_per_auto=1)
+    query_counter.count = 0
+    client.get("/auto-management/autos/with-students")
+    single_auto_count = query_counter.count
+
+    students = school(classes=3, students_per_class=4, year="2025-2026")["students"]
+    assign_autos(client, students, autos=4, students_per_auto=3)
+    query_counter.count = 0
+    response = client.get("/auto-management/autos/with-students")
+
+    assert len(response.json()) == 5
+    assert query_counter.count == single_auto_count
+
+
+def test_bulk_assign_returns_diff_and_commits_once(client, school, commit_counter):
+    students = school(classes=1, students_per_class=4)["students"]
+    ids = [student["id"] for student in students]
+    auto = client.post("/auto-management/autos/", json={"name": "Route 1"}).json()
+    client.post(f"/auto-management/autos/{auto['id']}/assign-students", json=ids[:3])
+
+    commit_counter.count = 0
+    response = client.post(f"/auto-management/autos/{auto['id']}/assign-students", json=ids[1:])
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["added_student_ids"] == [ids[3]]
+    assert body["removed_student_ids"] == [ids[0]]
+    assert commit_counter.count == 1
+    autos = client.get("/auto-management/autos/with-students").json()
+    assert sorted(autos[0]["students"]) == sorted(ids[1:])
+
+
+def test_bulk_assign_rejects_unknown_students_without_changes(client, school):
+    students = school(classes=1, students_per_class=2)["students"]
+    auto = client.post("/auto-management/autos/", json={"name": "Route 1"}).json()
+    client.post(f"/auto-management/autos/{auto['id']}/assign-students", json=[students[0]["id"]])
+
+    unknown_id = "00000000-0000-0000-0000-000000000001"
+    response = client.post(
+        f"/auto-management/autos/{auto['id']}/assign-students", json=[students[1]["id"], unknown_id]
+    )
+
+    assert response.status_code == 404
+    assert unknown_id in response.json()["detail"]
+    autos = client.get("/auto-management/autos/with-students").json()
+    assert autos[0]["students"] == [students[0]["id"]]
@@ -0,0 +1,31 @@
+from benchmarks.baseline import compare
+from benchmarks.data_generator import DatasetSize, generate
+
+
+def test_generated_data_is_deterministic_and_sized():
+    size = DatasetSize(years=2, classes=3, sections=2, students=5, months=4, autos=3, seed=7)
+
+    rows = generate(size)
+
+    assert rows == generate(size)
+    assert rows != generate(DatasetSize(years=2, classes=3, sections=2, students=5, months=4, autos=3, seed=8))
+    assert len(rows["students"]) == size.student_count == 60
+    assert len(rows["fee_payments"]) == 60 * 4
+    assert [year["is_active"] for year in rows["academic_years"]] == [False, True]
+    roll_numbers = {(student["class_id"], student["roll_number"]) for student in rows["students"]}
+    assert len(roll_numbers) == 60
+
+
+def test_compare_flags_slowdowns_beyond_threshold_and_noise():
+    baseline = {"slower": {"median_ms": 10.0}, "noisy": {"median_ms": 0.1}, "same": {"median_ms": 5.0}}
+    results = {
+        "slower": {"median_ms": 13.0},
+        "noisy": {"median_ms": 0.3},
+        "same": {"median_ms": 5.1},
+        "new": {"median_ms": 1.0},
+    }
+
+    rows, regressions = compare(results, baseline, threshold=0.2, noise_ms=0.5)
+
+    assert regressions == ["slower"]
+    assert [name for name, *_ in rows] == ["slower", "noisy", "same"]
@@ -0,0 +1,60 @@
+from sqlalchemy import func, select
+
+from database import async_session_maker
+from models import AutoStudentMapping, FeePayment, Student, StudentFeeLedger
+from test_auto_management import assign_autos
+
+
+def _count(client, statement):
+    async def count():
+        async with async_session_maker() as db:
+            return (await db.execute(statement)).scalar_one()
+
+    return client.portal.call(count)
+
+
+def _pay(client, student):
+    response = client.post("/fee_payments/", json={
+        "student_id": student["id"], "month": "APR",
+        "tuition_fees": "1000.00", "auto_fees": "300.00", "day_boarding_fees": "0.00",
+    })
+    assert response.status_code == 200, response.text
+
+
+def test_deleting_a_class_detaches_students_without_loading_them(client, school, query_counter):
+    students = school(classes=1, students_per_class=3)["students"]
+    query_counter.keywords.clear()
+
+    response = client.delete(f"/classes/{students[0]['class_id']}")
+
+    assert response.status_code == 200, response.text
+    # The database clears students.class_id and sections.class_id, nothing is read back to do it
+    assert "SELECT" not in query_counter.keywords
+    assert query_counter.keywords.count("DELETE") == 1
+    assert _count(client, select(func.count()).where(Student.class_id.is_not(None))) == 0
+    assert _count(client, select(func.count()).select_from(Student)) == 3
+
+
+def test_deleting_a_student_removes_its_ledger_and_mappings_and_keeps_payments(client, school):
+    students = school(classes=1, students_per_class=2)["students"]
+    assign_autos(client, students, autos=1, students_per_auto=2)
+    _pay(client, students[0])
+
+    response = client.delete(f"/students/{students[0]['id']}")
+
+    assert response.status_code == 200, response.text
+    assert _count(client, select(func.count()).select_from(StudentFeeLedger)) == 1
+    assert _count(client, select(func.count()).select_from(AutoStudentMapping)) == 1
+    orphaned = select(func.count()).where(FeePayment.student_id.is_(None))
+    assert _count(client, orphaned) == 1
+
+
+def test_deleting_an_auto_removes_its_mappings(client, school):
+    students = school(classes=1, students_per_class=2)["students"]
+    assign_autos(client, students, autos=1, students_per_auto=2)
+    auto = client.get("/auto-management/autos/").json()[0]
+
+    assert client.delete(f"/auto-management/autos/{auto['id']}").status_code == 200
+    assert client.delete(f"/auto-management/autos/{auto['id']}").status_code == 404
+    assert _count(client, select(func.count()).select_from(AutoStudentMapping)) == 0
+    assert _count(client, select(func.count()).select_from(Student)) == 2
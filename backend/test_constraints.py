@@ -0,0 +1,62 @@
+MISSING_ID = "00000000-0000-0000-0000-000000000001"
+
+
+def test_duplicates_are_rejected_by_unique_constraints(client, school, query_counter):
+    data = school()
+    student = data["students"][0]
+
+    query_counter.keywords.clear()
+    response = client.post("/classes/", json={"name": "Class 1", "academic_year_id": data["year"]["id"]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Class with name 'Class 1' already exists in this academic year"
+    assert "SELECT" not in query_counter.keywords
+
+    response = client.post("/sections/", json={"name": "A", "class_id": student["class_id"]})
+    assert response.json()["detail"] == "Section with name 'A' already exists in this class"
+
+    response = client.post("/academic-years/", json={"year": "2024-2025"})
+    assert response.json()["detail"] == "Academic year '2024-2025' already exists"
+
+    response = client.post("/students/", json={**student, "id": None, "name": "Someone else"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Student with roll number '1' already exists in this class"
+
+
+def test_update_into_a_taken_roll_number(client, school):
+    first, second = school(students_per_class=2)["students"]
+
+    response = client.put(f"/students/{second['id']}", json={"roll_number": first["roll_number"]})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Student with roll number '1' already exists in this class"
+    roll_numbers = {student["id"]: student["roll_number"] for student in client.get("/students/").json()}
+    assert roll_numbers[second["id"]] == "2"
+
+
+def test_moving_class_onto_a_taken_roll_number(client, school):
+    first, second = school(classes=2)["students"]
+
+    response = client.put(f"/students/{second['id']}", json={"class_id": first["class_id"]})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Student with roll number '1' already exists in this class"
+
+
+def test_unknown_references_are_rejected_by_foreign_keys(client, query_counter):
+    response = client.post("/classes/", json={"name": "Class 1", "academic_year_id": MISSING_ID})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid academic_year_id: Academic year does not exist"
+    assert "SELECT" not in query_counter.keywords
+
+    response = client.post("/sections/", json={"name": "A", "class_id": MISSING_ID})
+    assert response.json()["detail"] == f"Invalid class_id: Class with id {MISSING_ID} does not exist"
+
+    response = client.post("/fee_payments/", json={
+        "student_id": MISSING_ID,
+        "month": "APR",
+        "tuition_fees": "1000.00",
+        "auto_fees": "0.00",
+        "day_boarding_fees": "0.00",
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid student_id: Student does not exist"
@@ -0,0 +1,35 @@
+from decimal import Decimal
+
+
+def _pay(client, student, tuition_fees):
+    response = client.post("/fee_payments/", json={
+        "student_id": student["id"], "month": "APR",
+        "tuition_fees": tuition_fees, "auto_fees": "0.00", "day_boarding_fees": "0.00",
+    })
+    assert response.status_code == 200, response.text
+
+
+def test_dashboard_totals_and_largest_balances(client, school):
+    # Every student owes 1000 tuition + 300 auto
+    owes_300, overpaid, owes_1000, also_owes_300, unpaid = school(classes=1, students_per_class=5)["students"]
+    _pay(client, owes_300, "1000.00")
+    _pay(client, overpaid, "1500.00")
+    _pay(client, owes_1000, "300.00")
+    _pay(client, also_owes_300, "1000.00")
+
+    dashboard = client.get("/dashboard/").json()
+
+    assert dashboard["total_students"] == 5
+    assert Decimal(dashboard["total_payments"]) == Decimal("3800.00")
+    # The overpaid student's -200 doesn't cancel out anyone's dues
+    assert Decimal(dashboard["total_dues"]) == Decimal("2900.00")
+    # The unpaid student has paid nothing so isn't listed; equal balances are ordered by id
+    ties = sorted([owes_300["id"], also_owes_300["id"]])
+    listed = dashboard["students_with_payments"]
+    assert [student["id"] for student in listed] == [owes_1000["id"], *ties, overpaid["id"]]
+    assert [(Decimal(student["total_balance"]), student["payment_status"]) for student in listed] == [
+        (Decimal("1000.00"), "Pending"), (Decimal("300.00"), "Pending"), (Decimal("300.00"), "Pending"),
+        (Decimal("-200.00"), "Paid"),
+    ]
+    top_two = client.get("/dashboard/", params={"limit": 2}).json()["students_with_payments"]
+    assert [student["id"] for student in top_two] == [owes_1000["id"], ties[0]]
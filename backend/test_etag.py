@@ -0,0 +1,107 @@
+import asyncio
+from uuid import UUID
+
+import pytest
+
+from database import async_session_maker, engine
+from repositories.fee_payment_repository import FeePaymentRepository
+from repositories.table_version_repository import TableVersionRepository
+from schemas import FeePaymentCreate
+from services.fee_payment_service import FeePaymentService
+
+
+def test_unchanged_list_is_answered_with_304_without_querying(client, school, query_counter):
+    school(classes=1, students_per_class=2)
+    first = client.get("/students/")
+    etag = first.headers["etag"]
+
+    query_counter.count = 0
+    response = client.get("/students/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    # The version lookup only, no list query
+    assert query_counter.count == 1
+
+
+def test_write_changes_the_etag(client, school):
+    students = school(classes=1, students_per_class=1)["students"]
+    etag = client.get("/students/").headers["etag"]
+
+    client.put(f"/students/{students[0]['id']}", json={"name": "Renamed"})
+    response = client.get("/students/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()[0]["name"] == "Renamed"
+
+
+def test_etag_depends_on_query_parameters(client, school):
+    school(classes=1, students_per_class=3)
+    first_page = client.get("/students/page", params={"limit": 1})
+    second_page = client.get("/students/page", params={"limit": 2})
+
+    assert first_page.headers["etag"] != second_page.headers["etag"]
+
+
+def test_payment_changes_dashboard_but_not_student_list_etag(client, school):
+    students = school(classes=1, students_per_class=1)["students"]
+    students_etag = client.get("/students/").headers["etag"]
+    dashboard_etag = client.get("/dashboard/").headers["etag"]
+
+    response = client.post("/fee_payments/", json={
+        "student_id": students[0]["id"],
+        "month": "APR",
+        "tuition_fees": "1000.00",
+        "auto_fees": "0.00",
+        "day_boarding_fees": "0.00",
+    })
+    assert response.status_code == 200, response.text
+
+    assert client.get("/students/", headers={"If-None-Match": students_etag}).status_code == 304
+    assert client.get("/dashboard/", headers={"If-None-Match": dashboard_etag}).status_code == 200
+
+
+@pytest.mark.skipif(engine.dialect.name == "sqlite", reason="SQLite lets one transaction write at a time")
+def test_an_open_payment_transaction_does_not_hold_up_the_next_payment(client, school, monkeypatch):
+    first, second = school(classes=1, students_per_class=2)["students"]
+    create = FeePaymentRepository.create
+
+    async def pay(student):
+        async with async_session_maker() as db:
+            await FeePaymentService(db).create_payment(FeePaymentCreate(
+                student_id=student["id"], month="APR", tuition_fees="1000.00", auto_fees="0.00",
+                day_boarding_fees="0.00",
+            ))
+
+    async def versions():
+        async with async_session_maker() as db:
+            return (await TableVersionRepository(db).get_versions(["fee_payments"])).get("fee_payments", 0)
+
+    async def pay_while_the_first_payment_is_open():
+        written, release = asyncio.Event(), asyncio.Event()
+
+        async def stalled_create(self, payment):
+            created = await create(self, payment)
+            if payment.student_id == UUID(first["id"]):
+                # The payment and its ledger row are written, the transaction is left open
+                written.set()
+                await release.wait()
+            return created
+
+        monkeypatch.setattr(FeePaymentRepository, "create", stalled_create)
+        before = await versions()
+        stalled = asyncio.create_task(pay(first))
+        await written.wait()
+        try:
+            await asyncio.wait_for(pay(second), timeout=5)
+        finally:
+            release.set()
+            await stalled
+        return before, await versions()
+
+    before, after = client.portal.call(pay_while_the_first_payment_is_open)
+
+    assert after == before + 2
+
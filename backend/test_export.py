@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+
+from sqlalchemy import update
+
+from database import async_session_maker
+from models import FeePayment
+from services.export_service import FEE_PAYMENT_EXPORT_COLUMNS, STUDENT_EXPORT_COLUMNS
+
+
+def _csv(response):
+    assert response.headers["content-type"].startswith("text/csv")
+    return list(csv.reader(io.StringIO(response.text)))
+
+
+def _ndjson(response):
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _pay_on(client, student, month, transaction_date):
+    payment = client.post("/fee_payments/", json={
+        "student_id": student["id"], "month": month,
+        "tuition_fees": "1000.00", "auto_fees": "0.00", "day_boarding_fees": "0.00",
+    }).json()
+
+    async def backdate():
+        async with async_session_maker() as db:
+            await db.execute(
+                update(FeePayment).where(FeePayment.id == uuid.UUID(payment["id"])).values(transaction_date=transaction_date)
+            )
+            await db.commit()
+
+    client.portal.call(backdate)
+    return payment["id"]
+
+
+def test_student_export_as_csv_and_ndjson(client, school):
+    students = school(classes=2, students_per_class=3)["students"]
+
+    rows = _csv(client.get("/students/export", params={"format": "csv"}))
+    assert rows[0] == STUDENT_EXPORT_COLUMNS
+    assert len(rows) == 1 + 6
+
+    lines = _ndjson(client.get("/students/export", params={"class_id": students[0]["class_id"]}))
+    assert sorted(line["id"] for line in lines) == sorted(student["id"] for student in students[:3])
+    assert set(lines[0]) == set(STUDENT_EXPORT_COLUMNS)
+
+
+def test_payment_export_filters_with_an_inclusive_date_to(client, school):
+    first, second = school(classes=2, students_per_class=1)["students"]
+    april = _pay_on(client, first, "APR", datetime(2024, 4, 30, 18, 0))
+    may = _pay_on(client, first, "MAY", datetime(2024, 5, 1, 9, 0))
+    other_class = _pay_on(client, second, "APR", datetime(2024, 4, 10, 9, 0))
+
+    def exported(**params):
+        return [line["id"] for line in _ndjson(client.get("/fee_payments/export", params=params))]
+
+    assert exported() == [other_class, april, may]
+    assert exported(date_from="2024-04-11", date_to="2024-04-30") == [april]
+    assert exported(month="APR") == [other_class, april]
+    assert exported(class_id=first["class_id"]) == [april, may]
+    rows = _csv(client.get("/fee_payments/export", params={"format": "csv", "date_to": "2024-04-30"}))
+    assert rows[0] == FEE_PAYMENT_EXPORT_COLUMNS
+    assert [row[0] for row in rows[1:]] == [other_class, april]
@@ -0,0 +1,66 @@
+import logging
+import sys
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import TypeAdapter
+
+import config
+from main import add_compression
+from schemas import FeePaymentResponse, StudentPage, StudentResponse
+
+
+def test_fast_student_list_matches_response_model(client, school):
+    school(classes=1, students_per_class=3)
+
+    body = client.get("/students/").json()
+
+    assert len(body) == 3
+    assert body == TypeAdapter(List[StudentResponse]).dump_python(
+        TypeAdapter(List[StudentResponse]).validate_python(body), mode="json"
+    )
+    assert body[0]["tuition_fees"] == "1000.00"
+
+
+def test_fast_page_and_payments_match_response_models(client, school):
+    students = school(classes=1, students_per_class=2)["students"]
+    client.post("/fee_payments/", json={
+        "student_id": students[0]["id"],
+        "month": "APR",
+        "tuition_fees": "1000.00",
+        "auto_fees": "300.50",
+        "day_boarding_fees": "0.00",
+    })
+
+    page = client.get("/students/page", params={"limit": 1}).json()
+    payments = client.get("/fee_payments/").json()
+
+    assert page == StudentPage.model_validate(page).model_dump(mode="json")
+    assert page["next_cursor"] == students[0]["id"]
+    assert payments == TypeAdapter(List[FeePaymentResponse]).dump_python(
+        TypeAdapter(List[FeePaymentResponse]).validate_python(payments), mode="json"
+    )
+    assert payments[0]["total_amount"] == "1300.50"
+
+
+def test_large_lists_are_compressed(client, school):
+    school(classes=2, students_per_class=10)
+
+    response = client.get("/students/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) == 20
+
+
+def test_brotli_without_the_package_falls_back_to_gzip(monkeypatch, caplog):
+    monkeypatch.setattr(config, "COMPRESSION", "brotli")
+    # A None entry makes the import fail as if the package wasn't installed
+    monkeypatch.setitem(sys.modules, "brotli_asgi", None)
+    app = FastAPI()
+
+    with caplog.at_level(logging.WARNING, logger="school.compression"):
+        add_compression(app)
+
+    assert [middleware.cls for middleware in app.user_middleware] == [GZipMiddleware]
+    assert "brotli-asgi is not installed" in caplog.text
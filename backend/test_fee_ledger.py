@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+from sqlalchemy import update
+
+from database import async_session_maker
+from models import StudentFeeLedger
+from repositories.fee_ledger_repository import FeeLedgerRepository
+
+# Students from the school fixture owe 1000 tuition + 300 auto
+EXPECTED = Decimal("1300.00")
+
+
+def _pay(client, student, tuition_fees="1000.00"):
+    response = client.post("/fee_payments/", json={
+        "student_id": student["id"], "month": "APR",
+        "tuition_fees": tuition_fees, "auto_fees": "0.00", "day_boarding_fees": "0.00",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _ledger(client, student):
+    """(expected, paid, balance) of the student's ledger row"""
+    ledger = client.get(f"/students/{student['id']}/ledger").json()
+    return tuple(Decimal(ledger[field]) for field in ("expected_amount", "paid_amount", "balance"))
+
+
+def test_payments_move_the_ledger(client, school):
+    first, second = school(classes=1, students_per_class=2)["students"]
+    assert _ledger(client, first) == (EXPECTED, 0, EXPECTED)
+
+    payment = _pay(client, first)
+    assert _ledger(client, first) == (EXPECTED, Decimal("1000.00"), Decimal("300.00"))
+
+    client.put(f"/fee_payments/{payment['id']}", json={"tuition_fees": "400.00"})
+    assert _ledger(client, first) == (EXPECTED, Decimal("400.00"), Decimal("900.00"))
+
+    client.put(f"/fee_payments/{payment['id']}", json={"student_id": second["id"]})
+    assert _ledger(client, first) == (EXPECTED, 0, EXPECTED)
+    assert _ledger(client, second) == (EXPECTED, Decimal("400.00"), Decimal("900.00"))
+
+    client.delete(f"/fee_payments/{payment['id']}")
+    assert _ledger(client, second) == (EXPECTED, 0, EXPECTED)
+    assert client.get(f"/students/{second['id']}/ledger").json()["last_payment_date"] is None
+
+
+def test_changed_fees_keep_what_was_paid(client, school):
+    student = school(classes=1, students_per_class=1)["students"][0]
+    _pay(client, student)
+
+    response = client.put(f"/students/{student['id']}", json={"auto_fees": "0.00", "day_boarding_fees": "500.00"})
+
+    assert response.status_code == 200, response.text
+    assert _ledger(client, student) == (Decimal("1500.00"), Decimal("1000.00"), Decimal("500.00"))
+
+
+def test_rebuild_recomputes_from_payments(client, school):
+    first, second = school(classes=1, students_per_class=2)["students"]
+    _pay(client, first)
+    _pay(client, first, tuition_fees="200.00")
+    before = [_ledger(client, first), _ledger(client, second)]
+
+    async def drift_then_rebuild():
+        async with async_session_maker() as db:
+            await db.execute(update(StudentFeeLedger).values(paid_amount=0, balance=0))
+            await db.commit()
+        async with async_session_maker() as db:
+            await FeeLedgerRepository(db).rebuild()
+            await db.commit()
+
+    client.portal.call(drift_then_rebuild)
+
+    assert [_ledger(client, first), _ledger(client, second)] == before
+    assert before[0] == (EXPECTED, Decimal("1200.00"), Decimal("100.00"))
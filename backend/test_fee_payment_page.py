@@ -0,0 +1,49 @@
+def _pay(client, student, month):
+    response = client.post("/fee_payments/", json={
+        "student_id": student["id"], "month": month,
+        "tuition_fees": "1000.00", "auto_fees": "300.00", "day_boarding_fees": "0.00",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _walk(client, **params):
+    """Every page for the params, as payment ids"""
+    ids, cursor = [], None
+    while True:
+        page = client.get("/fee_payments/page", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        ids += [payment["id"] for payment in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+
+def test_pages_of_a_class_in_transaction_date_order(client, school):
+    students = school(classes=2, students_per_class=2)["students"]
+    payments = [_pay(client, student, month) for month in ("APR", "MAY") for student in students]
+    first_class = [payment["id"] for payment in payments if payment["student_id"] in {s["id"] for s in students[:2]}]
+
+    assert _walk(client, class_id=students[0]["class_id"], limit=3, order="asc") == first_class
+    assert _walk(client, class_id=students[0]["class_id"], limit=3) == first_class[::-1]
+    assert _walk(client, academic_year_id=students[0]["academic_year_id"], limit=5) == [
+        payment["id"] for payment in payments[::-1]
+    ]
+
+
+def test_student_and_month_filters(client, school):
+    students = school(classes=1, students_per_class=2)["students"]
+    april, _ = _pay(client, students[0], "APR"), _pay(client, students[1], "APR")
+    may = _pay(client, students[0], "MAY")
+
+    page = client.get("/fee_payments/page", params={"student_id": students[0]["id"]}).json()
+    assert [payment["id"] for payment in page["items"]] == [may["id"], april["id"]]
+    assert page["next_cursor"] is None
+    assert page["items"][0] == may
+    assert len(_walk(client, month="APR", limit=1)) == 2
+    assert _walk(client, month="MAY", date_from="2000-01-01", date_to="2000-12-31") == []
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get("/fee_payments/page", params={"cursor": "not-a-cursor"})
+
+    assert response.status_code == 400
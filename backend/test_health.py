@@ -0,0 +1,63 @@
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database import engine_options
+from routers import health
+from utils.pool_metrics import track_checkouts
+
+
+def test_ready_reports_database_and_pool(client):
+    response = client.get("/health/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["pools"]["primary"]["checkouts"] >= 1
+
+
+def test_pool_metrics_do_not_need_auth(client):
+    client.app.dependency_overrides.clear()
+
+    response = client.get("/health/pool")
+
+    assert response.status_code == 200
+    assert "avg_checkout_wait_seconds" in response.json()["primary"]
+
+
+def test_unavailable_database_does_not_leak_driver_errors(client, monkeypatch, tmp_path, caplog):
+    missing = tmp_path / "no-such-dir" / "secret-name.db"
+    broken = create_async_engine(f"sqlite+aiosqlite:///{missing}")
+    monkeypatch.setattr(health, "engine", broken)
+
+    response = client.get("/health/ready")
+    client.portal.call(broken.dispose)
+
+    assert response.status_code == 503
+    assert response.json()["database"] == "unavailable"
+    assert "secret-name" not in response.text
+    assert "primary database unavailable" in caplog.text
+
+
+def test_each_pool_reports_its_own_checkouts(client, monkeypatch, tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path}/replica.db"
+    replica = create_async_engine(url, **engine_options(url))
+    track_checkouts(replica, "replica")
+    monkeypatch.setattr(health, "read_engine", replica)
+    replica_waits = {"database": "replica"}
+    observed_before = REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", replica_waits) or 0
+
+    async def query_replica_twice():
+        for _ in range(2):
+            async with replica.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            # The counters outlive the pool dispose() replaces
+        await replica.dispose()
+
+    primary_before = client.get("/health/pool").json()["primary"]["checkouts"]
+    client.portal.call(query_replica_twice)
+    pools = client.get("/health/pool").json()
+
+    assert pools["replica"]["checkouts"] == 2
+    assert pools["primary"]["checkouts"] == primary_before
+    assert REGISTRY.get_sample_value("db_pool_checkout_wait_seconds_count", replica_waits) == observed_before + 2
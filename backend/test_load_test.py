@@ -0,0 +1,32 @@
+import httpx
+
+from benchmarks.load_test import SCENARIOS_DIR, LoadPlan, fill, load_plan, run
+from main import app
+
+
+def test_whole_placeholders_keep_their_type():
+    values = {"student_ids": ["a", "b"], "n": 7, "student_id": "s1"}
+
+    assert fill({"ids": "{student_ids}", "roll_number": "L{n}", "path": "/students/{student_id}"}, values) == {
+        "ids": ["a", "b"], "roll_number": "L7", "path": "/students/s1",
+    }
+
+
+def test_peak_scenarios_run_without_errors(client, school):
+    school(classes=2, students_per_class=6)
+    client.post("/auto-management/autos/", json={"name": "Route 1"})
+    peak = load_plan(SCENARIOS_DIR / "peak.json")
+    plan = LoadPlan(scenarios=peak.scenarios, clerks=3, duration_seconds=1, think_time_ms=[0, 20])
+
+    async def load():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as http:
+            return await run(http, plan, "load-test@example.com", "load-test-password")
+
+    routes = client.portal.call(load)
+
+    assert routes["POST /auth/jwt/login"]["requests"] == 3
+    assert routes["ALL"]["requests"] > 3
+    assert {route: stats["errors"] for route, stats in routes.items() if stats["errors"]} == {}
+    for stats in routes.values():
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
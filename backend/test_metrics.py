@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+
+
+def _samples(text):
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+def test_metrics_cover_requests_repositories_and_payments(client, school):
+    student = school(classes=1, students_per_class=1)["students"][0]
+    payments_before = REGISTRY.get_sample_value("fee_payments_created_total") or 0
+
+    created = client.post("/fee_payments/", json={
+        "student_id": student["id"], "month": "APR",
+        "tuition_fees": "1000.00", "auto_fees": "300.00", "day_boarding_fees": "0.00",
+    })
+    assert created.status_code == 200, created.text
+    client.get("/no-such-page")
+    client.app.dependency_overrides.clear()
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    samples = _samples(response.text)
+    assert samples[("fee_payments_created_total", ())] == payments_before + 1
+    assert samples[("http_requests_total", (("method", "POST"), ("route", "/fee_payments/"), ("status", "200")))] >= 1
+    assert samples[("http_requests_total", (("method", "GET"), ("route", "<unmatched>"), ("status", "404")))] >= 1
+    assert samples[(
+        "repository_method_duration_seconds_count", (("method", "create"), ("repository", "FeePaymentRepository"))
+    )] >= 1
+    assert ("db_pool_checked_out", (("database", "primary"),)) in samples
+    assert samples[("http_requests_in_progress", ())] == 1
+
+
+def test_multiprocess_mode_sums_workers(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    record = "from utils.metrics import fee_payments_created; fee_payments_created.inc()"
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", record], env=env, check=True, cwd=os.path.dirname(__file__))
+
+    scrape = "from utils.metrics import metrics_response; print(metrics_response().body.decode())"
+    output = subprocess.run(
+        [sys.executable, "-c", scrape], env=env, check=True, capture_output=True, text=True,
+        cwd=os.path.dirname(__file__),
+    ).stdout
+
+    assert _samples(output)[("fee_payments_created_total", ())] == 2
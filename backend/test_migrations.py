@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from sqlalchemy import insert, text
+
+from auth.auth_model import Base
+from database import ALEMBIC_INI, engine, init_db
+from models import AcademicYear, FeePayment, Month, Student
+from services.reference_data_cache import reference_data
+
+
+def _upgrade_to_baseline(connection):
+    alembic_config = AlembicConfig(str(ALEMBIC_INI))
+    alembic_config.set_main_option("script_location", str(ALEMBIC_INI.parent / "migrations"))
+    alembic_config.attributes["connection"] = connection
+    command.upgrade(alembic_config, "0001")
+
+
+async def _pre_migration_database():
+    """The schema create_all made before migrations, holding a student who paid twice and one who didn't"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade_to_baseline)
+        await conn.execute(text("DROP TABLE alembic_version"))
+        year_id, paid_id, unpaid_id = uuid.uuid1(), uuid.uuid1(), uuid.uuid1()
+        await conn.execute(insert(AcademicYear.__table__), [{"id": year_id, "year": "2024-2025", "is_active": True}])
+        await conn.execute(insert(Student.__table__), [
+            {"id": student_id, "name": name, "roll_number": roll_number, "academic_year_id": year_id,
+             "tuition_fees": Decimal("1000.00"), "auto_fees": Decimal("300.00"), "day_boarding_fees": None}
+            for student_id, name, roll_number in ((paid_id, "Paid", "1"), (unpaid_id, "Unpaid", "2"))
+        ])
+        await conn.execute(insert(FeePayment.__table__), [
+            {"id": uuid.uuid1(), "student_id": paid_id, "month": month, "tuition_fees": Decimal("500.00"),
+             "auto_fees": Decimal("0.00"), "day_boarding_fees": Decimal("0.00"), "total_amount": Decimal("500.00"),
+             "transaction_date": datetime(2024, day, 1)}
+            for month, day in ((Month.APR, 4), (Month.MAY, 5))
+        ])
+    reference_data.clear()
+
+
+def test_pre_migration_database_gets_its_ledger(client):
+    client.portal.call(_pre_migration_database)
+
+    client.portal.call(init_db)
+
+    dashboard = client.get("/dashboard/").json()
+    assert dashboard["total_students"] == 2
+    assert Decimal(dashboard["total_payments"]) == Decimal("1000.00")
+    assert Decimal(dashboard["total_dues"]) == Decimal("1600.00")
+    paid = next(student for student in client.get("/students/").json() if student["name"] == "Paid")
+    ledger = client.get(f"/students/{paid['id']}/ledger").json()
+    assert Decimal(ledger["balance"]) == Decimal("300.00")
+    assert ledger["last_payment_date"].startswith("2024-05-01")
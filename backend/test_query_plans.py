@@ -0,0 +1,118 @@
+import re
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import event, text
+
+from benchmarks.data_generator import DatasetSize, load
+from database import async_session_maker, engine
+from models import Month
+from repositories.auto_management_repository import AutoStudentMappingRepository
+from repositories.class_repository import ClassRepository
+from repositories.fee_ledger_repository import FeeLedgerRepository
+from repositories.fee_payment_repository import FeePaymentRepository
+from repositories.section_repository import SectionRepository
+from repositories.student_repository import StudentRepository
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "sqlite", reason="reads SQLite's EXPLAIN QUERY PLAN")
+
+# 5760 students and 23040 payments over two academic years
+DATASET = DatasetSize(years=2, classes=12, sections=4, students=60, months=4, autos=20)
+# A plain "SCAN students" reads the whole table, "SCAN ... USING INDEX" walks an index in order
+FULL_SCAN = re.compile(r"^SCAN \w+( AS \w+)?$")
+
+
+async def _seed():
+    async with async_session_maker() as db:
+        rows = await load(db, DATASET)
+        await db.execute(text("ANALYZE"))
+    return {
+        "year": rows["academic_years"][0],
+        "class": rows["classes"][0],
+        "section": rows["sections"][0],
+        "student": rows["students"][0],
+        "auto": rows["auto_management"][0],
+    }
+
+
+async def _consume(stream):
+    async for _ in stream:
+        pass
+
+
+def _cases(data):
+    """Repository calls backing the hot filters, each run against the seeded data"""
+    year_id, class_id = data["year"]["id"], data["class"]["id"]
+    return {
+        "students page of a class": lambda db: StudentRepository(db).get_page(50, class_id=class_id),
+        "students page of a class after a cursor": lambda db: StudentRepository(db).get_page(
+            50, after=data["student"]["id"], class_id=class_id
+        ),
+        "students page of a section": lambda db: StudentRepository(db).get_page(50, section_id=data["section"]["id"]),
+        "students page of a year": lambda db: StudentRepository(db).get_page(50, academic_year_id=year_id),
+        "student export of a class": lambda db: _consume(StudentRepository(db).stream(class_id=class_id)),
+        "roll number in class": lambda db: StudentRepository(db).get_by_roll_number_in_class("7", class_id),
+        "taken roll numbers": lambda db: StudentRepository(db).get_taken_roll_numbers([class_id], ["1", "2"]),
+        "sections of a class": lambda db: SectionRepository(db).get_sections_by_class_id(class_id),
+        "class by name and year": lambda db: ClassRepository(db).get_by_name_and_year("Class 1", year_id),
+        "payment export of a month": lambda db: _consume(FeePaymentRepository(db).stream(month=Month.APR)),
+        "payment export of a date range": lambda db: _consume(
+            FeePaymentRepository(db).stream(date_from=date(2024, 5, 1), date_to=date(2024, 5, 31))
+        ),
+        "payments page of a student": lambda db: FeePaymentRepository(db).get_page(
+            50, student_id=data["student"]["id"]
+        ),
+        "payments page of a student after a cursor, newest first": lambda db: FeePaymentRepository(db).get_page(
+            50, after=(datetime(2024, 6, 1), data["student"]["id"]), descending=True, student_id=data["student"]["id"]
+        ),
+        "payments page of a month": lambda db: FeePaymentRepository(db).get_page(50, month=Month.APR),
+        "payments page of a date range": lambda db: FeePaymentRepository(db).get_page(
+            50, date_from=date(2024, 5, 1), date_to=date(2024, 5, 31)
+        ),
+        "latest payment of a student": lambda db: FeeLedgerRepository(db).refresh_last_payment_date(
+            data["student"]["id"]
+        ),
+        "students of an auto": lambda db: AutoStudentMappingRepository(db).get_students_by_auto(data["auto"]["id"]),
+    }
+
+
+async def _plans(call):
+    """EXPLAIN QUERY PLAN of every statement the call sends, the call itself is rolled back"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.split()[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with async_session_maker() as db:
+            await call(db)
+            await db.rollback()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append([row.detail for row in result])
+    return plans
+
+
+def test_repository_queries_use_indexes(client):
+    data = client.portal.call(_seed)
+
+    problems = {}
+    for name, call in _cases(data).items():
+        plans = client.portal.call(_plans, call)
+        assert plans, f"{name} sent no query"
+        details = [detail for plan in plans for detail in plan]
+        bad = [
+            detail for detail in details
+            if FULL_SCAN.match(detail) or detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail
+        ]
+        if bad:
+            problems[name] = details
+
+    assert not problems, problems
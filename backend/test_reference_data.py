@@ -0,0 +1,49 @@
+import uuid
+
+from database import async_session_maker
+from models import Class
+from repositories.table_version_repository import TableVersionRepository
+from services.reference_data_cache import reference_data
+
+
+def test_cached_lists_skip_the_database(client, school, query_counter):
+    school(classes=2)
+    client.get("/classes/")
+    client.get("/sections/")
+
+    query_counter.count = 0
+    classes = client.get("/classes/").json()
+    sections = client.get("/sections/").json()
+
+    assert len(classes) == 2 and len(sections) == 2
+    # Only the ETag version lookups, one per request
+    assert query_counter.count == 2
+
+
+def test_writes_invalidate_the_cache(client, school):
+    year = school(classes=1)["year"]
+    class_ = client.get("/classes/").json()[0]
+    client.get("/academic-years/")
+
+    client.put(f"/classes/{class_['id']}", json={"name": "Renamed"})
+    client.post(f"/academic-years/{year['id']}/deactivate")
+
+    assert client.get("/classes/").json()[0]["name"] == "Renamed"
+    assert client.get("/academic-years/").json() == []
+
+
+def test_change_by_another_worker_is_picked_up_after_version_check(client, school):
+    year = school(classes=1)["year"]
+    assert len(client.get("/classes/").json()) == 1
+
+    async def write_as_other_worker():
+        async with async_session_maker() as db:
+            db.add(Class(name="Added elsewhere", academic_year_id=uuid.UUID(year["id"])))
+            await TableVersionRepository(db).bump("classes")
+            await db.commit()
+
+    client.portal.call(write_as_other_worker)
+    assert len(client.get("/classes/").json()) == 1
+
+    reference_data._checked_at = 0
+    assert len(client.get("/classes/").json()) == 2
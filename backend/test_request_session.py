@@ -0,0 +1,39 @@
+from auth.user_cache import user_cache
+
+
+def test_authenticated_read_checks_out_one_connection(client, school, auth_headers, checkout_counter):
+    client.headers.update(auth_headers)
+    school(classes=1, students_per_class=2)
+    user_cache.clear()
+    checkout_counter.count = 0
+
+    response = client.get("/students/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    # User lookup, ETag versions and the list all ran on the same connection
+    assert checkout_counter.count == 1
+
+
+def test_authenticated_write_checks_out_one_connection(client, school, auth_headers, checkout_counter):
+    client.headers.update(auth_headers)
+    student = school(classes=1, students_per_class=1)["students"][0]
+    user_cache.clear()
+    checkout_counter.count = 0
+
+    response = client.post("/fee_payments/", json={
+        "student_id": student["id"], "month": "APR",
+        "tuition_fees": "1000.00", "auto_fees": "0.00", "day_boarding_fees": "0.00",
+    })
+
+    assert response.status_code == 200, response.text
+    assert checkout_counter.count == 1
+
+
+def test_cached_request_does_not_touch_the_pool(client, auth_headers, checkout_counter):
+    assert client.get("/auth/admin-only", headers=auth_headers).status_code == 200
+    checkout_counter.count = 0
+
+    assert client.get("/auth/admin-only", headers=auth_headers).status_code == 200
+
+    assert checkout_counter.count == 0
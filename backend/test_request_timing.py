@@ -0,0 +1,54 @@
+import json
+import re
+
+import pytest
+
+import config
+from utils.request_timing import logger
+
+SERVER_TIMING = re.compile(
+    r'^db;dur=[\d.]+;desc="(\d+) statements", db-wait;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$'
+)
+
+
+@pytest.fixture
+def request_log(caplog):
+    """Request log records while the test runs, the logger doesn't propagate to caplog's root handler"""
+    logger.addHandler(caplog.handler)
+    yield caplog
+    logger.removeHandler(caplog.handler)
+
+
+def test_server_timing_counts_statements(client, school, query_counter):
+    school(classes=1, students_per_class=3)
+    query_counter.count = 0
+
+    response = client.get("/students/")
+
+    match = SERVER_TIMING.match(response.headers["server-timing"])
+    assert match, response.headers["server-timing"]
+    assert int(match.group(1)) == query_counter.count > 0
+
+
+def test_request_log_line_uses_route_template(client, school, request_log):
+    student = school(classes=1, students_per_class=1)["students"][0]
+
+    client.put(f"/students/{student['id']}", json={"tuition_fees": "1200.00"})
+
+    entries = [json.loads(record.getMessage()) for record in request_log.records if record.levelname == "INFO"]
+    entry = entries[-1]
+    assert entry["method"] == "PUT"
+    assert entry["route"] == "/students/{student_id}"
+    assert entry["status"] == 200
+    assert entry["db_statements"] > 0
+    assert entry["db_ms"] <= entry["duration_ms"]
+
+
+def test_statement_budget_warns_about_chatty_requests(client, school, request_log, monkeypatch):
+    school(classes=1, students_per_class=1)
+    monkeypatch.setattr(config, "SQL_STATEMENT_BUDGET", 1)
+
+    client.get("/dashboard/")
+
+    warnings = [record.getMessage() for record in request_log.records if record.levelname == "WARNING"]
+    assert warnings and "GET /dashboard/ sent" in warnings[-1]
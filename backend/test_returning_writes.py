@@ -0,0 +1,45 @@
+def test_update_returns_row_without_select(client, query_counter):
+    auto = client.post("/auto-management/autos/", json={"name": "Route 1"}).json()
+
+    query_counter.keywords.clear()
+    response = client.put(f"/auto-management/autos/{auto['id']}", json={"name": "Route 2"})
+
+    assert response.status_code == 200
+    assert response.json() == {"id": auto["id"], "name": "Route 2"}
+    assert "SELECT" not in query_counter.keywords
+
+
+def test_update_of_missing_row_is_404_without_select(client, query_counter):
+    response = client.put("/auto-management/autos/00000000-0000-0000-0000-000000000001", json={"name": "Nope"})
+
+    assert response.status_code == 404
+    assert "SELECT" not in query_counter.keywords
+
+
+def test_student_fee_update_keeps_ledger_without_reading_student(client, school, query_counter):
+    student = school()["students"][0]
+
+    query_counter.keywords.clear()
+    response = client.put(f"/students/{student['id']}", json={"tuition_fees": "1500.00"})
+
+    assert response.status_code == 200
+    assert response.json()["tuition_fees"] == "1500.00"
+    assert "SELECT" not in query_counter.keywords
+    assert client.get(f"/students/{student['id']}/ledger").json()["balance"] == "1800.00"
+
+
+def test_create_returns_generated_columns(client, school):
+    student = school()["students"][0]
+
+    response = client.post("/fee_payments/", json={
+        "student_id": student["id"],
+        "month": "APR",
+        "tuition_fees": "1000.00",
+        "auto_fees": "0.00",
+        "day_boarding_fees": "0.00",
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["id"] and body["transaction_date"]
+    assert body["total_amount"] == "1000.00"
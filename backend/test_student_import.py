@@ -0,0 +1,77 @@
+import csv
+import io
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from repositories import student_repository
+from repositories.student_repository import StudentRepository
+
+HEADER = [
+    "name", "roll_number", "father_name", "mother_name", "date_of_birth", "contact", "address",
+    "enrollment_date", "tuition_fees", "auto_fees", "day_boarding_fees", "academic_year", "class_name",
+    "section_name",
+]
+
+
+def _row(name, roll_number, class_name="Class 1", tuition_fees="1000.00"):
+    return [
+        name, roll_number, "Father", "Mother", "2015-06-01", "9876543210", "1 School Road", "2024-04-01",
+        tuition_fees, "300.00", "0.00", "2024-2025", class_name, "A",
+    ]
+
+
+def _upload(client, rows):
+    text = io.StringIO()
+    csv.writer(text).writerows([HEADER, *rows])
+    return client.post(
+        "/students/import", files={"file": ("students.csv", text.getvalue().encode(), "text/csv")}
+    )
+
+
+def _names(client):
+    return sorted(student["name"] for student in client.get("/students/").json())
+
+
+def test_import_reports_bad_rows_and_keeps_good_ones(client, school):
+    school(classes=1, students_per_class=0)
+
+    response = _upload(client, [
+        _row("Asha", "1"),
+        _row("Bad fees", "2", tuition_fees="lots"),
+        _row("Nowhere", "3", class_name="Class 9"),
+        _row("Ravi", "4"),
+    ])
+
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["total_rows"], report["imported"], report["failed"]) == (4, 2, 2)
+    assert [error["row"] for error in report["errors"]] == [3, 4]
+    assert report["errors"][1]["errors"] == ["Unknown academic year / class / section: 2024-2025 / Class 9 / A"]
+    assert _names(client) == ["Asha", "Ravi"]
+
+
+def test_a_row_failing_on_insert_only_fails_itself(client, school, monkeypatch):
+    school(classes=1, students_per_class=1)
+
+    # As if the existing roll number 1 was taken after the check, the unique constraint catches it
+    async def nothing_taken(self, class_ids, roll_numbers):
+        return set()
+
+    monkeypatch.setattr(StudentRepository, "get_taken_roll_numbers", nothing_taken)
+    report = _upload(client, [_row("Asha", "5"), _row("Duplicate", "1"), _row("Ravi", "6")]).json()
+
+    assert (report["imported"], report["failed"]) == (2, 1)
+    assert report["errors"] == [{"row": 3, "errors": ["Student with roll number '1' already exists in this class"]}]
+    assert _names(client) == ["Asha", "Ravi", "Student 1-1"]
+
+
+def test_database_failures_are_not_reported_as_bad_rows(client, school, monkeypatch):
+    school(classes=1, students_per_class=0)
+
+    async def connection_lost(db, model, rows):
+        raise OperationalError("INSERT INTO students", {}, Exception("server closed the connection"))
+
+    monkeypatch.setattr(student_repository, "bulk_insert", connection_lost)
+    with pytest.raises(OperationalError):
+        _upload(client, [_row("Asha", "1")])
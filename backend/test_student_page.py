@@ -0,0 +1,67 @@
+import uuid
+
+import pytest
+
+from database import async_session_maker
+from repositories.student_repository import StudentRepository
+from schemas import MAX_PAGE_SIZE
+
+
+def _walk(client, path, **params):
+    """Every page from path, as student ids, checking that only the last page has no next_cursor"""
+    ids, cursor = [], None
+    while True:
+        page = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        ids += [student["id"] for student in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+        assert cursor == page["items"][-1]["id"]
+
+
+def test_pages_walk_every_student_once_in_id_order(client, school):
+    students = school(classes=2, students_per_class=4)["students"]
+    ids = sorted(student["id"] for student in students)
+
+    for limit in (1, 3, 8, MAX_PAGE_SIZE):
+        assert _walk(client, "/students/page", limit=limit) == ids
+
+    last = client.get("/students/page", params={"limit": 3, "cursor": ids[4]}).json()
+    assert [student["id"] for student in last["items"]] == ids[5:]
+    assert last["next_cursor"] is None
+
+
+def test_class_section_and_name_filters(client, school):
+    students = school(classes=2, students_per_class=3)["students"]
+    first_class = sorted(student["id"] for student in students[:3])
+
+    assert _walk(client, "/students/page", class_id=students[0]["class_id"], limit=2) == first_class
+    assert _walk(client, f"/students/by-class/{students[0]['class_id']}", limit=2) == first_class
+    assert _walk(client, f"/students/by-section/{students[0]['section_id']}", limit=2) == first_class
+    assert _walk(client, "/students/page", name_prefix="Student 2-", limit=2) == sorted(
+        student["id"] for student in students[3:]
+    )
+    # The prefix is matched literally, not as a LIKE pattern
+    assert _walk(client, "/students/page", name_prefix="Student _") == []
+
+
+def test_get_page_fetches_one_extra_row(client, school):
+    students = school(classes=1, students_per_class=3)["students"]
+    ids = sorted(uuid.UUID(student["id"]) for student in students)
+
+    async def pages():
+        async with async_session_maker() as db:
+            repository = StudentRepository(db)
+            return [await repository.get_page(2), await repository.get_page(2, after=ids[0])]
+
+    first, rest = client.portal.call(pages)
+
+    assert [student["id"] for student in first] == ids
+    assert [student["id"] for student in rest] == ids[1:]
+
+
+@pytest.mark.parametrize("path", ["/students/page", f"/students/by-class/{uuid.uuid4()}",
+                                  f"/students/by-section/{uuid.uuid4()}"])
+@pytest.mark.parametrize("limit", [0, MAX_PAGE_SIZE + 1])
+def test_limit_out_of_bounds_is_rejected(client, path, limit):
+    assert client.get(path, params={"limit": limit}).status_code == 422
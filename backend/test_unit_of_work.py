@@ -0,0 +1,51 @@
+import pytest
+
+from database import async_session_maker
+from repositories.table_version_repository import TableVersionRepository
+from utils.unit_of_work import unit_of_work
+
+
+def test_activating_a_year_commits_once(client, school, commit_counter):
+    older = school(year="2023-2024")["year"]
+    school(year="2024-2025")
+    commit_counter.count = 0
+
+    response = client.post(f"/academic-years/{older['id']}/activate")
+
+    assert response.status_code == 200, response.text
+    # Deactivating the others, activating this one and bumping the version land in one transaction
+    assert commit_counter.count == 1
+    assert [year["id"] for year in client.get("/academic-years/").json()] == [older["id"]]
+
+
+def test_failed_operation_leaves_nothing_behind(client):
+    async def bump_then_fail():
+        async with async_session_maker() as db:
+            with pytest.raises(RuntimeError):
+                async with unit_of_work(db):
+                    await TableVersionRepository(db).bump("students")
+                    raise RuntimeError("second step failed")
+        async with async_session_maker() as db:
+            return await TableVersionRepository(db).get_versions(["students"])
+
+    before = client.portal.call(_versions)
+    assert client.portal.call(bump_then_fail) == before
+
+
+def test_nested_blocks_commit_once_at_the_outermost(client, commit_counter):
+    async def nested():
+        async with async_session_maker() as db:
+            async with unit_of_work(db):
+                await TableVersionRepository(db).bump("students")
+                async with unit_of_work(db):
+                    await TableVersionRepository(db).bump("fee_payments")
+                assert commit_counter.count == 0
+
+    client.portal.call(nested)
+
+    assert commit_counter.count == 1
+
+
+async def _versions():
+    async with async_session_maker() as db:
+        return await TableVersionRepository(db).get_versions(["students"])
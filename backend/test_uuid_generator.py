@@ -0,0 +1,36 @@
+import uuid
+
+from utils import uuid_generator
+from utils.uuid_generator import generate_uuid7, uuid7_at
+
+
+def test_uuid7_layout():
+    value = uuid7_at(0x0123456789AB, (1 << 74) - 1)
+
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    assert value.hex.startswith("0123456789ab7fff")
+    assert uuid7_at(1, 0) < uuid7_at(2, 0) < uuid7_at(2, 1)
+
+
+def test_ids_sort_in_creation_order_when_the_clock_stalls_or_steps_back(monkeypatch):
+    clock = iter([5_000_000_000, 5_000_000_000, 4_000_000_000] + [5_000_000_000] * 5000)
+    monkeypatch.setattr(uuid_generator.time, "time_ns", lambda: next(clock))
+    monkeypatch.setattr(uuid_generator, "_last_ms", 0)
+
+    ids = [generate_uuid7() for _ in range(5003)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    # The counter ran out within the stalled millisecond, the ids moved on to the next one
+    assert int(ids[-1].hex[:12], 16) == 5001
+
+
+def test_students_page_in_creation_order(client, school):
+    students = school(classes=2, students_per_class=3)["students"]
+
+    first = client.get("/students/page", params={"limit": 4}).json()
+    second = client.get("/students/page", params={"limit": 4, "cursor": first["next_cursor"]}).json()
+
+    pages = [student["id"] for student in first["items"] + second["items"]]
+    assert pages == [student["id"] for student in students]
@@ -0,0 +1,30 @@
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def bulk_insert(db: AsyncSession, model, rows: List[Dict]):
+    """
+    Insert rows inside the session's current transaction. On PostgreSQL they are streamed
+    with COPY, elsewhere they go out as one multi-row INSERT. Rows must already carry their
+    primary keys since column defaults are not applied by COPY.
+    """
+    if not rows:
+        return
+    connection = await db.connection()
+    if connection.dialect.name != "postgresql" or connection.dialect.driver != "asyncpg":
+        await db.execute(insert(model), rows)
+        return
+
+    columns = list(rows[0].keys())
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+    if not driver_connection.is_in_transaction():
+        # The asyncpg adapter begins its transaction lazily, COPY has to run inside it
+        await connection.exec_driver_sql("SELECT 1")
+    await driver_connection.copy_records_to_table(
+        model.__tablename__,
+        records=[tuple(row[column] for column in columns) for row in rows],
+        columns=columns
+    )
@@ -0,0 +1,52 @@
+import csv
+import enum
+import io
+from datetime import date, datetime
+from typing import AsyncIterator, List, Sequence
+
+import orjson
+
+from utils.fast_json import json_default
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def encode_rows(batches: AsyncIterator[Sequence], export_format: str, columns: List[str]):
+    """
+    Turn batches of row mappings into NDJSON or CSV byte chunks, one chunk per batch,
+    so a response can be streamed without ever holding more than a batch
+    """
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        async for batch in batches:
+            for row in batch:
+                writer.writerow([_csv_value(row[column]) for column in columns])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+
+    async for batch in batches:
+        yield b"".join(
+            orjson.dumps({column: row[column] for column in columns}, default=json_default) + b"\n"
+            for row in batch
+        )
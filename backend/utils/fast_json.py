@@ -0,0 +1,34 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+from utils.request_timing import timed_render
+
+
+def json_default(value):
+    # Amounts keep the string form Pydantic gives them in the rest of the API
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def dumps(content: Any) -> bytes:
+    """orjson encodes UUID, datetime, date and enums itself, only Decimal needs help"""
+    return orjson.dumps(content, default=json_default)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    For routes returning plain dicts built straight from result rows. Returning a response
+    skips FastAPI's response_model validation and jsonable_encoder, the route's response_model
+    still documents the shape, so rows must already match it.
+
+    Headers dependencies set (the ETag) are not copied onto a returned response, pass the
+    route's injected Response headers along: FastJSONResponse(rows, headers=response.headers)
+    """
+
+    def render(self, content: Any) -> bytes:
+        with timed_render():
+            return dumps(content)
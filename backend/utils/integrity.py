@@ -0,0 +1,66 @@
+import re
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Index, UniqueConstraint
+from sqlalchemy.exc import IntegrityError
+
+from auth.auth_model import Base
+
+_SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: (.+)")
+
+
+def violated_constraint(error: IntegrityError) -> Optional[str]:
+    """
+    Name of the constraint an IntegrityError violated. PostgreSQL reports it, SQLite only names
+    the columns of a unique violation, so those are looked up in the models' metadata.
+    SQLite says nothing about which foreign key failed, that gives None.
+    """
+    cause = error.orig.__cause__ or error.orig
+    # asyncpg, then psycopg
+    name = getattr(cause, "constraint_name", None) or getattr(getattr(cause, "diag", None), "constraint_name", None)
+    if name:
+        return name
+
+    match = _SQLITE_UNIQUE.search(str(error.orig))
+    if not match:
+        return None
+    columns = [column.strip().split(".") for column in match.group(1).split(",")]
+    table_name = columns[0][0]
+    return _unique_constraints().get((table_name, frozenset(column for _, column in columns)))
+
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    cause = error.orig.__cause__ or error.orig
+    return getattr(cause, "sqlstate", None) == "23503" or "FOREIGN KEY constraint failed" in str(error.orig)
+
+
+def integrity_http_error(
+        error: IntegrityError,
+        messages: Dict[str, Tuple[int, str]],
+        default: Tuple[int, str]
+) -> HTTPException:
+    """
+    Translate a constraint violation into the HTTPException its pre-check used to raise.
+    messages maps constraint names to (status_code, detail). When the database can't say which
+    foreign key failed, the single fk_ entry in messages is used.
+    """
+    name = violated_constraint(error)
+    if name is None and is_foreign_key_violation(error):
+        foreign_keys = [key for key in messages if key.startswith("fk_")]
+        if len(foreign_keys) == 1:
+            name = foreign_keys[0]
+    status_code, detail = messages.get(name, default)
+    return HTTPException(status_code=status_code, detail=detail)
+
+
+@lru_cache(maxsize=None)
+def _unique_constraints():
+    """(table, columns) -> name of every unique constraint and unique index in the models"""
+    constraints = {}
+    for table in Base.metadata.tables.values():
+        for item in list(table.constraints) + list(table.indexes):
+            if isinstance(item, UniqueConstraint) or (isinstance(item, Index) and item.unique):
+                constraints[(table.name, frozenset(column.name for column in item.columns))] = item.name
+    return constraints
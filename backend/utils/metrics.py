@@ -0,0 +1,130 @@
+"""
+Prometheus metrics served at /metrics. With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR
+to an empty directory before starting them: each worker then writes its samples there and any
+worker answering the scrape reports the sum of all of them.
+"""
+import functools
+import inspect
+import os
+import time
+
+from fastapi import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+# Requests to paths no route matched share one label, raw paths would grow the series without bound
+UNMATCHED_ROUTE = "<unmatched>"
+
+http_requests = Counter(
+    "http_requests_total", "Requests answered", ["method", "route", "status"]
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Time to answer a request", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "Requests being answered", multiprocess_mode="livesum"
+)
+
+db_pool_size = Gauge("db_pool_size", "Connections the pool keeps open", ["database"], multiprocess_mode="livesum")
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out", "Connections in use", ["database"], multiprocess_mode="livesum"
+)
+db_pool_idle = Gauge("db_pool_idle", "Open connections waiting in the pool", ["database"], multiprocess_mode="livesum")
+db_pool_overflow = Gauge(
+    "db_pool_overflow", "Connections open beyond the pool size", ["database"], multiprocess_mode="livesum"
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time waited for a free connection", ["database"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+repository_duration = Histogram(
+    "repository_method_duration_seconds", "Time spent in a repository method, its queries included",
+    ["repository", "method"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+
+fee_payments_created = Counter("fee_payments_created_total", "Fee payments recorded")
+fee_payment_amount = Counter("fee_payment_amount_total", "Sum of the fee payments recorded, in rupees")
+students_created = Counter("students_created_total", "Students added, one by one or by import")
+
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    http_requests.labels(method, route, str(status)).inc()
+    http_request_duration.labels(method, route).observe(seconds)
+
+
+def instrument_pool(async_engine, database: str):
+    """Keep the pool gauges current as connections are handed out and returned"""
+    # NullPool/StaticPool (in-memory SQLite) don't track sizes
+    if not isinstance(async_engine.pool, AsyncAdaptedQueuePool):
+        return
+
+    def update(*args):
+        # engine.dispose() swaps in a new pool
+        pool = async_engine.pool
+        db_pool_size.labels(database).set(pool.size())
+        db_pool_checked_out.labels(database).set(pool.checkedout())
+        db_pool_idle.labels(database).set(pool.checkedin())
+        db_pool_overflow.labels(database).set(max(pool.overflow(), 0))
+
+    event.listen(async_engine.sync_engine, "checkout", update)
+    event.listen(async_engine.sync_engine, "checkin", update)
+    update()
+
+
+def instrument_repository(cls):
+    """Class decorator timing every public async method of a repository"""
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_"):
+            continue
+        histogram = repository_duration.labels(cls.__name__, name)
+        if inspect.isasyncgenfunction(method):
+            setattr(cls, name, _timed_generator(method, histogram))
+        elif inspect.iscoroutinefunction(method):
+            setattr(cls, name, _timed_coroutine(method, histogram))
+    return cls
+
+
+def _timed_coroutine(method, histogram):
+    @functools.wraps(method)
+    async def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+    return timed
+
+
+def _timed_generator(method, histogram):
+    # Exports stream their rows, the time covers the whole stream
+    @functools.wraps(method)
+    async def timed(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            async for item in method(*args, **kwargs):
+                yield item
+        finally:
+            histogram.observe(time.perf_counter() - started)
+    return timed
+
+
+def mark_worker_stopped():
+    """Drop this worker's live gauges from the shared directory"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+def metrics_response() -> Response:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from utils.metrics import db_pool_checkout_wait
+from utils.request_timing import record_checkout
+
+
+class PoolStats:
+    """Connection checkout waits of one pool in this worker process"""
+
+    def __init__(self, database: str):
+        self._lock = threading.Lock()
+        self.database = database
+        self.checkouts = 0
+        self.failed_checkouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_checkout(self, wait_seconds: float, failed: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            if failed:
+                self.failed_checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+        db_pool_checkout_wait.labels(self.database).observe(wait_seconds)
+
+    def snapshot(self, pool):
+        with self._lock:
+            stats = {
+                "pool_class": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "failed_checkouts": self.failed_checkouts,
+                "total_checkout_wait_seconds": round(self.total_wait_seconds, 6),
+                "avg_checkout_wait_seconds": round(self.total_wait_seconds / self.checkouts, 6) if self.checkouts else 0.0,
+                "max_checkout_wait_seconds": round(self.max_wait_seconds, 6),
+            }
+        # NullPool/StaticPool (used for SQLite) don't track sizes
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            stats.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            })
+        return stats
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a free connection in its stats"""
+
+    stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        failed = True
+        try:
+            connection = super()._do_get()
+            failed = False
+            return connection
+        finally:
+            wait_seconds = time.perf_counter() - started
+            if self.stats:
+                self.stats.record_checkout(wait_seconds, failed)
+            record_checkout(wait_seconds)
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool, the counters carry over
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def track_checkouts(async_engine, database: str):
+    """Give the engine's pool its own PoolStats, named like the pool gauges"""
+    if isinstance(async_engine.pool, TimedAsyncAdaptedQueuePool):
+        async_engine.pool.stats = PoolStats(database)
+
+
+def pool_snapshot(async_engine) -> dict:
+    pool = async_engine.pool
+    if getattr(pool, "stats", None) is None:
+        # In-memory SQLite shares one connection, there are no checkouts to report
+        return {"pool_class": type(pool).__name__}
+    return pool.stats.snapshot(pool)
@@ -0,0 +1,151 @@
+"""
+Per-request database statements, database time, connection checkout wait and response rendering
+time. Sent back as a Server-Timing header (shown in the browser's network tab) and logged as one
+JSON line per request with the route template.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+
+import config
+from utils import metrics
+
+logger = logging.getLogger("school.requests")
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(levelname)s:     %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class RequestTiming:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.checkout_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def server_timing(self) -> str:
+        total = time.perf_counter() - self.started
+        return ", ".join([
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.statements} statements"',
+            f"db-wait;dur={self.checkout_seconds * 1000:.1f}",
+            f"render;dur={self.render_seconds * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+
+
+# SQLAlchemy's async engine runs its sync events in greenlets sharing the request task's context
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def current_timing() -> Optional[RequestTiming]:
+    return _current.get()
+
+
+def record_checkout(wait_seconds: float):
+    timing = _current.get()
+    if timing is not None:
+        timing.checkout_seconds += wait_seconds
+
+
+@contextmanager
+def timed_render():
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = _current.get()
+        if timing is not None:
+            timing.render_seconds += time.perf_counter() - started
+
+
+class TimedJSONResponse(JSONResponse):
+    """FastAPI's default response, with the JSON encoding counted as render time"""
+
+    def render(self, content) -> bytes:
+        with timed_render():
+            return super().render(content)
+
+
+def instrument_engine(async_engine):
+    """Count each statement and its time against the request that sent it"""
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def _started(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(async_engine.sync_engine, "after_cursor_execute")
+    def _finished(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["statement_started"].pop()
+        timing = _current.get()
+        if timing is not None:
+            timing.statements += 1
+            timing.db_seconds += time.perf_counter() - started
+
+
+class RequestTimingMiddleware:
+    """Outermost middleware, so the total covers compression and every other middleware too"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+        status = 500
+        metrics.http_requests_in_progress.inc()
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if config.SERVER_TIMING:
+                    message["headers"] = [
+                        *message.get("headers", []), (b"server-timing", timing.server_timing().encode())
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            metrics.http_requests_in_progress.dec()
+            # FastAPI leaves the matched route in the scope
+            route = getattr(scope.get("route"), "path", None)
+            metrics.observe_request(
+                scope["method"], route or metrics.UNMATCHED_ROUTE, status, time.perf_counter() - timing.started
+            )
+            _log(scope, route or scope["path"], status, timing)
+
+
+def _log(scope, path: str, status: int, timing: RequestTiming):
+    entry = {
+        "method": scope["method"],
+        "route": path,
+        "status": status,
+        "duration_ms": round((time.perf_counter() - timing.started) * 1000, 2),
+        "db_statements": timing.statements,
+        "db_ms": round(timing.db_seconds * 1000, 2),
+        "db_wait_ms": round(timing.checkout_seconds * 1000, 2),
+        "render_ms": round(timing.render_seconds * 1000, 2),
+    }
+    if config.REQUEST_LOG:
+        logger.info(orjson.dumps(entry).decode())
+    if config.SQL_STATEMENT_BUDGET and timing.statements > config.SQL_STATEMENT_BUDGET:
+        logger.warning(
+            "%s %s sent %d SQL statements, over the budget of %d: look for a query per row (N+1)",
+            entry["method"], path, timing.statements, config.SQL_STATEMENT_BUDGET,
+        )
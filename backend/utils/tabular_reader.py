@@ -0,0 +1,65 @@
+import csv
+import io
+from datetime import date, datetime
+from typing import BinaryIO, Dict, Iterator, Tuple
+
+from fastapi import HTTPException
+
+SUPPORTED_FORMATS = ("csv", "xlsx")
+
+
+def detect_format(filename: str) -> str:
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail="Only .csv and .xlsx files can be imported")
+    return extension
+
+
+def iter_rows(file: BinaryIO, file_format: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Yield (row_number, {header: value}) one row at a time, so files of any size are read
+    with constant memory. Row numbers match what a spreadsheet shows, the header being row 1.
+    """
+    if file_format == "xlsx":
+        return _iter_xlsx_rows(file)
+    return _iter_csv_rows(file)
+
+
+def _iter_csv_rows(file: BinaryIO):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        for row_number, row in enumerate(csv.DictReader(text), start=2):
+            yield row_number, {_clean(key): _clean(value) for key, value in row.items() if key}
+    finally:
+        text.detach()
+
+
+def _iter_xlsx_rows(file: BinaryIO):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise HTTPException(status_code=400, detail="XLSX import needs the openpyxl package installed")
+
+    # read_only streams rows from the zipped sheet instead of loading the whole workbook
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        headers = [_clean(header) for header in next(rows, ())]
+        for row_number, values in enumerate(rows, start=2):
+            if all(value is None for value in values):
+                continue
+            yield row_number, {
+                header: _clean(value) for header, value in zip(headers, values) if header
+            }
+    finally:
+        workbook.close()
+
+
+def _clean(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).strip()
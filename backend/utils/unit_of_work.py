@@ -0,0 +1,30 @@
+from contextlib import asynccontextmanager
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession):
+    """
+    Transaction boundary of a service operation. Repositories only flush, the block commits once
+    when it finishes and rolls back if it raises, so a multi-step operation is one transaction
+    and one fsync and never leaves part of its writes behind. A block opened inside another one
+    on the same session joins it, only the outermost block commits.
+
+        async with unit_of_work(self.db):
+            created_class = await self.class_repo.create(class_)
+            versions = await reference_data.bump(self.db, "classes")
+        reference_data.invalidate(versions)
+    """
+    depth = db.info.get("unit_of_work_depth", 0)
+    db.info["unit_of_work_depth"] = depth + 1
+    try:
+        yield db
+        if depth == 0:
+            await db.commit()
+    except BaseException:
+        if depth == 0:
+            await db.rollback()
+        raise
+    finally:
+        db.info["unit_of_work_depth"] = depth
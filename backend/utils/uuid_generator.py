@@ -1,6 +1,46 @@
+import os
+import threading
+import time
 import uuid
-from datetime import datetime
+from typing import Optional
 
-def generate_time_based_uuid():
-    """Generate a time-based UUID (UUID v1)"""
-    return uuid.uuid1()  # UUID v1 is time-based 
\ No newline at end of file
+_RAND_B_BITS = 62
+_COUNTER_MAX = 0xFFF
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7_at(unix_ms: int, random_bits: Optional[int] = None) -> uuid.UUID:
+    """
+    UUID version 7 (RFC 9562) for a Unix time in milliseconds: the timestamp takes the leading 48
+    bits, so ids sort by creation time and new rows land at the right edge of a primary key index.
+    random_bits fills the remaining 74 bits, fresh random ones if not given.
+    """
+    if random_bits is None:
+        random_bits = int.from_bytes(os.urandom(10), "big") >> 6
+    rand_a, rand_b = random_bits >> _RAND_B_BITS & _COUNTER_MAX, random_bits & ((1 << _RAND_B_BITS) - 1)
+    return uuid.UUID(int=(unix_ms & (1 << 48) - 1) << 80 | 7 << 76 | rand_a << 64 | 0b10 << 62 | rand_b)
+
+
+def generate_uuid7() -> uuid.UUID:
+    """
+    Time-ordered primary key (UUID v7). Ids made in the same millisecond count up in the 12 bits
+    after the timestamp, so they still sort in the order this process created them, also when
+    the clock steps back.
+    """
+    global _last_ms, _counter
+    random_bits = int.from_bytes(os.urandom(10), "big")
+    rand_b = random_bits & ((1 << _RAND_B_BITS) - 1)
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            # Start low in the counter's range, leaving room to count up within the millisecond
+            _last_ms, _counter = now_ms, random_bits >> 69
+        elif _counter < _COUNTER_MAX:
+            _counter += 1
+        else:
+            _last_ms, _counter = _last_ms + 1, 0
+        unix_ms, counter = _last_ms, _counter
+    return uuid7_at(unix_ms, counter << _RAND_B_BITS | rand_b)
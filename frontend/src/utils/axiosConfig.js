@@ -1,6 +1,7 @@
 import axios from 'axios';
 
-const axiosInstance = axios.create();
+// Cookies carry the backend's read-your-writes window from one request to the next
+const axiosInstance = axios.create({ withCredentials: true });
 
 axiosInstance.interceptors.request.use(
   (config) => {